@@ -0,0 +1,120 @@
+"""Compare HTML parser backends on saved publisher pages.
+
+Pages come either from a fixtures directory laid out as <dir>/<publisher>/*.html
+or from a page cache recorded with `main.py --page-cache record`. Each page is
+parsed and run through the scraper's real extraction code, with and without the
+subtree restriction, and the mean/median time and peak memory are reported.
+
+    python benchmarks/parse_bench.py --fixtures tests_pages/
+    python benchmarks/parse_bench.py --page-cache output/page_cache --repeat 5
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from unittest import mock
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_collectors import acm_scrap, elsevier_scrap, html_parser, springer_scrap  # noqa: E402
+from journal_collectors.page_cache import PageCache  # noqa: E402
+
+
+def _extract_elsevier(page_source):
+    details = elsevier_scrap.ScienceDirectScraperDetails
+    data = details.extract_article(html_parser.make_soup(page_source, elsevier_scrap.ARTICLE_SUBTREES))
+    data.update(details.extract_banner_details(html_parser.make_soup(page_source, elsevier_scrap.BANNER_SUBTREES)))
+    return data
+
+
+# publisher -> (extract function, module whose *_SUBTREES constants it reads, host marker, detail path marker)
+EXTRACTORS = {
+    "ACM": (acm_scrap.AcmScraper.parse_article, acm_scrap, "acm.org", "/doi/"),
+    "SPRINGER": (springer_scrap.SpringerScraper.parse_detail_page, springer_scrap, "springer.com", "/journal/"),
+    "ELSEVIER": (_extract_elsevier, elsevier_scrap, "sciencedirect.com", "/science/article/"),
+}
+
+
+def load_fixtures(directory):
+    pages = {}
+    for publisher in EXTRACTORS:
+        for path in sorted(glob.glob(os.path.join(directory, publisher.lower(), "*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages.setdefault(publisher, []).append(f.read())
+    return pages
+
+
+def load_page_cache(directory):
+    cache = PageCache(directory)
+    pages = {}
+    try:
+        for url in cache.urls():
+            parsed = urlparse(url)
+            for publisher, (_, _, host, path) in EXTRACTORS.items():
+                if parsed.netloc.endswith(host) and path in parsed.path:
+                    html = cache.get(url)
+                    if html:
+                        pages.setdefault(publisher, []).append(html)
+    finally:
+        cache.close()
+    return pages
+
+
+def unrestricted(module):
+    # Patch every subtree filter in the scraper module to None so make_soup builds the whole document.
+    stack = ExitStack()
+    for name in dir(module):
+        if name.endswith("_SUBTREES"):
+            stack.enter_context(mock.patch.object(module, name, None))
+    return stack
+
+
+def measure(extract, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        for html in pages:
+            started = time.perf_counter()
+            extract(html)
+            timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    for html in pages:
+        extract(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.mean(timings), statistics.median(timings), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixtures", help="directory with <publisher>/*.html pages")
+    source.add_argument("--page-cache", help="page cache directory recorded by main.py")
+    parser.add_argument("--backend", action="append", choices=html_parser.available_backends(),
+                        help="backend to include (repeatable, default: all installed)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pages = load_fixtures(args.fixtures) if args.fixtures else load_page_cache(args.page_cache)
+    if not pages:
+        parser.error("no publisher pages found")
+    backends = args.backend or html_parser.available_backends()
+
+    print(f"{'publisher':<10} {'pages':>5} {'backend':<12} {'subtrees':<8} {'mean ms':>9} {'median ms':>9} {'peak KiB':>9}")
+    for publisher, publisher_pages in pages.items():
+        extract, module, _, _ = EXTRACTORS[publisher]
+        for backend in backends:
+            html_parser.set_backend(backend)
+            for restricted in (True, False):
+                with ExitStack() if restricted else unrestricted(module):
+                    mean, median, peak = measure(extract, publisher_pages, args.repeat)
+                print(f"{publisher:<10} {len(publisher_pages):>5} {backend:<12} {'yes' if restricted else 'no':<8} "
+                      f"{mean * 1000:>9.2f} {median * 1000:>9.2f} {peak / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the old dict rows with records.Record on a synthetic Elsevier crawl.
+
+Builds N articles with long reference lists both ways, then reports retained
+memory per record and the time to serialize them to CSV and Arrow.
+
+    python benchmarks/record_bench.py --articles 20000 --references 60
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_collectors import records  # noqa: E402
+from journal_collectors.elsevier_scrap import ARTICLE_HEADERS  # noqa: E402
+
+HOSTS = [f"Journal of Applied Topic {i}, Elsevier" for i in range(200)]
+KEYWORDS = [f"keyword {i}" for i in range(500)]
+
+
+def _article(i, references, rng):
+    # Fresh string objects per article, as the parser produces them.
+    refs = [("".join(["A. Author", str(j)]), f"Reference title {i}-{j}", "".join([rng.choice(HOSTS)]))
+            for j in range(references)]
+    return dict(
+        title=f"Article {i}", writers="A. Author, B. Author", affiliation="Some University",
+        publish_date=f"Available online {rng.randint(1, 28)} March {rng.randint(2000, 2020)}",
+        abstract="An abstract. " * 40, keywords=["".join([rng.choice(KEYWORDS)]) for _ in range(6)],
+        references=refs,
+    )
+
+
+def build_dicts(articles):
+    return [{
+        "title": a["title"], "writers": a["writers"], "affiliation": a["affiliation"],
+        "publish_date": a["publish_date"], "abstract": a["abstract"], "keywords": list(a["keywords"]),
+        "references": [{"authors": r[0], "title": r[1], "host": r[2]} for r in a["references"]],
+    } for a in articles]
+
+
+def build_records(articles):
+    return [records.Record(
+        title=a["title"], authors=a["writers"], publisher="ELSEVIER",
+        year=records.number(records.match(records.YEAR, a["publish_date"])), abstract=a["abstract"],
+        affiliation=a["affiliation"], publish_date=a["publish_date"], keywords=a["keywords"],
+        references=a["references"],
+    ) for a in articles]
+
+
+def measure(build, articles):
+    tracemalloc.start()
+    built = build(articles)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, retained
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def dict_csv(rows):
+    buffer = io.StringIO()
+    import csv
+    writer = csv.DictWriter(buffer, fieldnames=ARTICLE_HEADERS)
+    writer.writerows({
+        "Title": d["title"], "Authors": d["writers"], "Affiliation": d["affiliation"],
+        "Publish Date": d["publish_date"], "Abstract": d["abstract"], "Keywords": ", ".join(d["keywords"]),
+        "References": "; ".join(f"{r['authors']} - {r['title']} ({r['host']})" for r in d["references"]),
+    } for d in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--references", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    articles = [_article(i, args.references, rng) for i in range(args.articles)]
+    dicts, dict_bytes = measure(build_dicts, articles)
+    recs, record_bytes = measure(build_records, articles)
+
+    print(f"{args.articles} articles x {args.references} references")
+    print(f"  memory/record   dict {dict_bytes / args.articles:9.0f} B   Record {record_bytes / args.articles:9.0f} B")
+    print(f"  csv             dict {timed(lambda: dict_csv(dicts)):9.2f} s   "
+          f"Record {timed(lambda: records.write_csv(io.StringIO(), recs, ARTICLE_HEADERS)):9.2f} s")
+    try:
+        print(f"  arrow                          Record {timed(lambda: records.to_arrow(recs)):9.2f} s")
+    except RuntimeError as e:
+        print(f"  arrow           skipped: {e}")
+
+
+if __name__ == "__main__":
+    main()
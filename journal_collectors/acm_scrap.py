@@ -1,130 +1,252 @@
-import os
-import csv
 import time
 import logging
-import undetected_chromedriver as uc
+import threading
+from functools import partial
+from itertools import chain
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+import requests
+from journal_collectors.driver_pool import PROFILES, create_driver
+from journal_collectors import metrics, pipeline
+from journal_collectors.detail_fetcher import DetailFetcher
+from journal_collectors.http_fetch import BlockedError, HttpFetcher
+from journal_collectors.html_parser import Subtrees, make_soup
+from journal_collectors.output_sink import HEADERS, SCRAPED_DATA_CSV, get_sink
+from journal_collectors.pagination import PageFetchError, fetch_pages, parse_hit_count, plan_pages
+from journal_collectors.readiness import SelectorPresent, wait_until
+from journal_collectors.records import Record, number
 
-logging.basicConfig(
-    filename='debug.log',  # or use 'logs/ieee_scraper.log' in a logs folder
-    filemode='a',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+SEARCH_SUBTREES = Subtrees(("h3", {"class": "issue-item__title"}), ("span", {"class": "hitsLength"}))
+SEARCH_READY = (SelectorPresent("h3.issue-item__title, span.hitsLength, .search-result__no-result"),)
+ARTICLE_SUBTREES = Subtrees(
+    ("h1", {"property": "name"}),
+    ("span", {"property": "author"}),
+    ("section", {"id": "abstract"}),
+    ("div", {"class": "core-published"}),
+    ("div", {"class": "core-enumeration"}),
+)
+
 
-class AcmScraper:
+class AcmScraper(pipeline.RecordSource):
     BASE_URL = "https://dl.acm.org"
-    CSV_FILE = "/home/darkside/PycharmProjects/journal-collectors/output/scraped_data.csv"
-    HEADERS = ["Title", "Authors", "Publisher", "Year", "Abstract", "Journal", "Volume/Issue", "Cited By"]
+    PAGE_SIZE = 20
+    MAX_PAGES = 300
+    CSV_FILE = SCRAPED_DATA_CSV
+    HEADERS = HEADERS
 
-    def __init__(self, queries: list[str]):
+    def __init__(self, queries: list[str], driver=None, fetch_mode: str = "browser", http: HttpFetcher = None,
+                 detail_concurrency: int = 8, sink=None, seen_index=None, checkpoints=None):
         self.queries = queries
+        self.checkpoints = checkpoints
+        self.seen_index = seen_index
+        self._sink = sink
         self.scraped_count = 0
-        self.driver = self._setup_driver()
-        self.logger = self._setup_logger()
-
-    def _setup_logger(self):
-        logging.basicConfig(
-            filename='debug.log',
-            filemode='a',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        self._owns_driver = driver is None
+        self.driver = driver or self._setup_driver()
+        # "http" reads article pages with a keep-alive session and only falls back to the driver when needed
+        self.fetch_mode = fetch_mode
+        self._owns_http = http is None
+        self.http = http or (HttpFetcher(pool_size=detail_concurrency) if fetch_mode == "http" else None)
+        # Only HTTP fetches run concurrently; the browser fallback is serialized on one driver.
+        self._driver_lock = threading.Lock()
+        self.details = DetailFetcher(
+            self._fetch_article, concurrency=detail_concurrency if fetch_mode == "http" else 1, per_host=detail_concurrency,
+            publisher="ACM",
         )
-        return logging.getLogger(__name__)
 
     def _setup_driver(self):
-        options = uc.ChromeOptions()
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("user-agent=Mozilla/5.0 ...")
-        return uc.Chrome(options=options)
+        return create_driver(PROFILES["ACM"])
 
-    def scrape(self):
-        for query in self.queries:
-            scraped_count = 0
-            for page in range(1, 300):  # First 30 pages
+    def _search_url(self, query, page):
+        return (
+            f"{self.BASE_URL}/action/doSearch?"
+            f"AllField={query}&pageSize={self.PAGE_SIZE}&startPage={page}&AfterYear=2000&BeforeYear=2020&ContentItemType=research-article&SeriesKey=todaes"
+        )
 
-                search_url = (
-                    f"{self.BASE_URL}/action/doSearch?"
-                    f"AllField={query}&pageSize=20&startPage={page}&AfterYear=2000&BeforeYear=2020&ContentItemType=research-article&SeriesKey=todaes"
-                )
-                self.driver.get(search_url)
-
-                try:
-                    WebDriverWait(self.driver, 20).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "h3.issue-item__title"))
-                    )
-                    soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                    titles = soup.select("h3.issue-item__title")
-
-                    for h3 in titles:
-                        title = h3.get_text(strip=True)
-                        link = self.BASE_URL + h3.find('a')['href']
-                        self._scrape_article(link)
-
-                    print()
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to load search page {page} for query '{query}': {e}")
-                    continue
-
-    def _scrape_article(self, url):
-        try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "h1[property='name']"))
-            )
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
-
-            paper_title = soup.select_one("h1[property='name']").text.strip()
-            authors = [a.get_text(strip=True) for a in soup.select(
-                "span[property='author'] span[property='givenName'], span[property='author'] span[property='familyName']")]
-            abstract_section = soup.select_one("section#abstract > div[role='paragraph']")
-            published_span = soup.select_one("div.core-published span.core-date-published")
-            published_date = published_span.get_text(strip=True) if published_span else "Unknown"
-            published_year = published_date.split()[-1] if published_date != "Unknown" else "Unknown"
-            abstract = abstract_section.get_text(strip=True) if abstract_section else "No abstract found"
-            journal_info = soup.select_one("div.core-enumeration a")
-
-            journal = volume = issue = "Unknown"
-            if journal_info:
-                journal = journal_info.select_one("span[property='name']").get_text(
-                    strip=True) if journal_info.select_one("span[property='name']") else "Unknown"
-                volume = journal_info.select_one("span[property='volumeNumber']").get_text(
-                    strip=True) if journal_info.select_one("span[property='volumeNumber']") else "N/A"
-                issue = journal_info.select_one("span[property='issueNumber']").get_text(
-                    strip=True) if journal_info.select_one("span[property='issueNumber']") else "N/A"
-
-            data = {
-                "Title": paper_title,
-                "Authors": ", ".join(authors),
-                "Publisher": "ACM",
-                "Year": f"Year:{published_year}",
-                "Abstract": abstract,
-                "Journal": journal,
-                "Volume/Issue": f"Volume:{volume}/Issue:{issue}",
-                "Cited By": "N/A"
-            }
+    @staticmethod
+    def parse_search_page(page_source):
+        soup = make_soup(page_source, SEARCH_SUBTREES)
+        titles = [(AcmScraper.BASE_URL + h3.find('a')['href'], h3.get_text(strip=True))
+                  for h3 in soup.select("h3.issue-item__title") if h3.find('a')]
+        hits = soup.select_one("span.hitsLength")
+        return titles, parse_hit_count(hits.get_text() if hits else None)
+
+    def _search_page(self, query, page):
+        url = self._search_url(query, page)
+        if self.fetch_mode == "http":
+            try:
+                with metrics.timed("ACM", "search_load"):
+                    page_source = self.http.get(url)
+                with metrics.timed("ACM", "parse"):
+                    return self.parse_search_page(page_source)
+            except (BlockedError, requests.RequestException) as e:
+                metrics.increment("ACM", "retries", "search_load")
+                logger.info(f"HTTP fetch failed for {url} ({e}), falling back to browser")
+        with self._driver_lock:
+            with metrics.timed("ACM", "search_load"):
+                self.driver.get(url)
+            # Empty pages show the hit count but no titles, so either one means the page is done;
+            # neither (an error page, a bot wall) is a failed page, not the end of the results.
+            if not wait_until(self.driver, "acm.search", SEARCH_READY, timeout=20):
+                raise TimeoutException(f"ACM results page never loaded: {url}")
+            page_source = self.driver.page_source
+        with metrics.timed("ACM", "parse"):
+            return self.parse_search_page(page_source)
+
+    def _search_pages(self, query, pages):
+        # Search pages are plain HTML, so in http mode a window of them is fetched at once.
+        concurrency = self.details.concurrency if self.fetch_mode == "http" else 1
+        pages = list(pages)
+        for start in range(0, len(pages), concurrency):
+            window = pages[start:start + concurrency]
+            results = fetch_pages(partial(self._search_page, query), window, concurrency, publisher="ACM")
+            yield from zip(window, results)
+
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = get_sink(self.CSV_FILE, self.HEADERS)
+        return self._sink
+
+    def scrape(self):
+        for _ in pipeline.compose(self.iter_records(), pipeline.write_to(self.sink, self.seen_index)):
             self.scraped_count += 1
             print(f"✅ Scraped item {self.scraped_count}")
-            self._save_to_csv(data)
-
-        except Exception as e:
-            logger.warning(f"⚠️ Error scraping article: {e}")
 
-    def _save_to_csv(self, row_data):
-        file_exists = os.path.exists(self.CSV_FILE)
-        with open(self.CSV_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(row_data)
+    def iter_records(self):
+        for query in self.queries:
+            checkpoint = self.checkpoints.for_query("ACM", query, self.sink) if self.checkpoints else None
+            if checkpoint and checkpoint.failed:
+                yield from self._retry_failed(checkpoint)
+            if checkpoint and checkpoint.done:
+                logger.info(f"⏭️ Query '{query}' already completed")
+                continue
+            start_page = checkpoint.next_page if checkpoint else 1
+
+            # Every results page carries the total hit count, so the first one fetched plans the rest.
+            first = fetch_pages(partial(self._search_page, query), [start_page], publisher="ACM")[0]
+            total_hits = None if isinstance(first, PageFetchError) else first[1]
+            pages = plan_pages(total_hits, self.PAGE_SIZE, start_page + 1, self.MAX_PAGES)
+            logger.info(f"📄 ACM '{query}': {total_hits} hits, pages {start_page}-{pages.stop - 1}")
+
+            for page, result in chain([(start_page, first)], self._search_pages(query, pages)):
+                if isinstance(result, PageFetchError):
+                    # The checkpoint stays on the last complete page, so --resume starts again here.
+                    raise result
+                if not result[0]:
+                    logger.info(f"No results on page {page} for query '{query}', stopping")
+                    break
+                yield from self._results_page_records(page, result[0], checkpoint)
+
+            if checkpoint:
+                checkpoint.finish()
+
+    def _results_page_records(self, page, titles, checkpoint):
+        skip = checkpoint.skip_items(page) if checkpoint else 0
+        items = [(index, link, title) for index, (link, title) in enumerate(titles) if index >= skip]
+        items = [item for item in items if not self._already_seen(item[1], item[2])]
+        links = [link for _, link, _ in items]
+        for (index, link, _), data in zip(items, self.details.run(links)):
+            if data:
+                data.url, data.source = link, "ACM"
+                yield data
+                if checkpoint:
+                    checkpoint.item_done(page, index + 1)
+            elif checkpoint:
+                checkpoint.item_failed(page, index + 1, link)
+
+        if checkpoint:
+            checkpoint.page_done(page)
+
+    def _retry_failed(self, checkpoint):
+        # Articles an earlier run could not read; any that fail again stay in the checkpoint.
+        links = list(checkpoint.failed)
+        logger.info(f"🔁 Retrying {len(links)} ACM articles that failed last time")
+        for link, data in zip(links, self.details.run(links)):
+            if data:
+                data.url, data.source = link, "ACM"
+                yield data
+                checkpoint.retried(link)
+
+    def _already_seen(self, url, title):
+        if self.seen_index and self.seen_index.seen(url=url, title=title):
+            logger.info(f"⏭️ Already scraped: {url}")
+            return True
+        return False
+
+    def _fetch_article(self, url):
+        if self.fetch_mode == "http":
+            try:
+                with metrics.timed("ACM", "detail_load"):
+                    page_source = self.http.get(url)
+                with metrics.timed("ACM", "parse"):
+                    data = self.parse_article(page_source)
+                if data:
+                    return data
+                logger.info(f"No title in HTTP response for {url}, falling back to browser")
+            except (BlockedError, requests.RequestException) as e:
+                logger.info(f"HTTP fetch failed for {url} ({e}), falling back to browser")
+            metrics.increment("ACM", "retries", "detail_load")
+
+        with self._driver_lock:
+            with metrics.timed("ACM", "detail_load"):
+                self.driver.get(url)
+            with metrics.timed("ACM", "wait"):
+                WebDriverWait(self.driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "h1[property='name']"))
+                )
+            page_source = self.driver.page_source
+        with metrics.timed("ACM", "parse"):
+            data = self.parse_article(page_source)
+        if not data:
+            raise ValueError(f"No article title found at {url}")
+        return data
+
+    @staticmethod
+    def parse_article(page_source):
+        soup = make_soup(page_source, ARTICLE_SUBTREES)
+
+        title_tag = soup.select_one("h1[property='name']")
+        if not title_tag:
+            return None
+        paper_title = title_tag.text.strip()
+        authors = [a.get_text(strip=True) for a in soup.select(
+            "span[property='author'] span[property='givenName'], span[property='author'] span[property='familyName']")]
+        abstract_section = soup.select_one("section#abstract > div[role='paragraph']")
+        published_span = soup.select_one("div.core-published span.core-date-published")
+        published_date = published_span.get_text(strip=True) if published_span else "Unknown"
+        published_year = published_date.split()[-1] if published_date != "Unknown" else "Unknown"
+        abstract = abstract_section.get_text(strip=True) if abstract_section else "No abstract found"
+        journal_info = soup.select_one("div.core-enumeration a")
+
+        journal = volume = issue = "Unknown"
+        if journal_info:
+            journal = journal_info.select_one("span[property='name']").get_text(
+                strip=True) if journal_info.select_one("span[property='name']") else "Unknown"
+            volume = journal_info.select_one("span[property='volumeNumber']").get_text(
+                strip=True) if journal_info.select_one("span[property='volumeNumber']") else "N/A"
+            issue = journal_info.select_one("span[property='issueNumber']").get_text(
+                strip=True) if journal_info.select_one("span[property='issueNumber']") else "N/A"
+
+        return Record(
+            title=paper_title,
+            authors=", ".join(authors),
+            publisher="ACM",
+            year=number(published_year),
+            abstract=abstract,
+            journal=journal,
+            volume=number(volume),
+            issue=number(issue),
+        )
 
     def cleanup(self):
-        self.driver.quit()
+        if self._sink:
+            self._sink.flush()
+        if self.http and self._owns_http:
+            self.http.close()
+        if self._owns_driver:
+            self.driver.quit()
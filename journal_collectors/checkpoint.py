@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+
+from journal_collectors.output_sink import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, "checkpoints")
+
+
+def write_json_atomic(path: str, data: dict):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Checkpoint:
+    # `page` is the last fully completed results page; `item` counts the items
+    # finished on the page after it, so a resume restarts exactly there. `failed`
+    # lists the detail pages (by URL) passed over because they could not be read;
+    # the next run retries them before walking on.
+    def __init__(self, path: str, publisher: str, query: str, page: int = 0, item: int = 0, done: bool = False,
+                 sink=None, failed=()):
+        self.path = path
+        self.publisher = publisher
+        self.query = query
+        self.page = page
+        self.item = item
+        self.done = done
+        self.failed = list(failed)
+        self._failed = list(failed)
+        # With a sink, progress is only persisted once the rows it covers are flushed.
+        self.sink = sink
+        self._pending = (page, item, done)
+
+    @property
+    def next_page(self) -> int:
+        return self.page + 1
+
+    def skip_items(self, page: int) -> int:
+        # Items already handled on `page` by an earlier, interrupted run.
+        return self.item if page == self.next_page else 0
+
+    def item_done(self, page: int, item: int):
+        self._advance(page - 1, item, False)
+
+    def item_failed(self, page: int, item: int, url: str):
+        # The walk moves past the item, but it is kept for the next run to retry.
+        if url not in self._failed:
+            self._failed.append(url)
+        self.item_done(page, item)
+
+    def retried(self, url: str):
+        # A failed item has been read after all.
+        if url in self._failed:
+            self._failed.remove(url)
+            self._advance(*self._pending)
+
+    def page_done(self, page: int):
+        self._advance(page, 0, False)
+
+    def finish(self):
+        page, item, _ = self._pending
+        self._advance(page, item, True)
+
+    def _advance(self, page: int, item: int, done: bool):
+        self._pending = (page, item, done)
+        failed = list(self._failed)
+        if self.sink is None:
+            self._commit(page, item, done, failed)
+        else:
+            self.sink.after_flush(lambda: self._commit(page, item, done, failed), key=("checkpoint", self.path))
+
+    def _commit(self, page: int, item: int, done: bool, failed: list):
+        self.page, self.item, self.done, self.failed = page, item, done, failed
+        self.save()
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "publisher": self.publisher,
+            "query": self.query,
+            "page": self.page,
+            "item": self.item,
+            "done": self.done,
+            "failed": self.failed,
+            "updated_at": time.time(),
+        })
+
+
+class CheckpointStore:
+    def __init__(self, directory: str = CHECKPOINT_DIR, resume: bool = False):
+        self.directory = directory
+        self.resume = resume
+
+    def path_for(self, publisher: str, query: str) -> str:
+        slug = re.sub(r"[^0-9a-z]+", "-", query.lower()).strip("-")[:60]
+        digest = hashlib.sha1(f"{publisher}:{query}".encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.directory, f"{publisher.lower()}-{slug}-{digest}.json")
+
+    def for_query(self, publisher: str, query: str, sink=None) -> Checkpoint:
+        path = self.path_for(publisher, query)
+        if self.resume and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    state = json.load(f)
+                checkpoint = Checkpoint(path, publisher, query, state["page"], state["item"], state["done"], sink,
+                                        state.get("failed", ()))
+                retrying = f", retrying {len(checkpoint.failed)} failed" if checkpoint.failed else ""
+                logger.info(f"↩️ Resuming {publisher} '{query}' after page {checkpoint.page}, "
+                            f"item {checkpoint.item}{retrying}")
+                return checkpoint
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        checkpoint = Checkpoint(path, publisher, query, sink=sink)
+        checkpoint.save()
+        return checkpoint
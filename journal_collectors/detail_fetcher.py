@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from journal_collectors import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Fetches a results page's detail links with bounded concurrency. `fetch` is a
+# blocking url -> page callable run on a thread pool, `parse` optionally turns the
+# page into a record. Results keep the order of `links`, with None for failures.
+class DetailFetcher:
+    def __init__(self, fetch, parse=None, concurrency: int = 8, per_host: int = 4, publisher: str = None):
+        self.fetch = fetch
+        self.parse = parse
+        self.publisher = publisher
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+
+    async def _fetch_one(self, url, limit, host_limits, executor):
+        host = urlparse(url).netloc
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(self.per_host)
+        loop = asyncio.get_running_loop()
+        async with limit, host_limits[host]:
+            try:
+                page = await loop.run_in_executor(executor, self.fetch, url)
+                if self.parse is not None:
+                    page = await loop.run_in_executor(executor, self.parse, page)
+                return page
+            except Exception as e:
+                logger.warning(f"⚠️ Detail fetch failed for {url}: {e}")
+                metrics.increment(self.publisher, "failures", "detail_load")
+                return None
+
+    async def fetch_all(self, links: list) -> list:
+        limit = asyncio.Semaphore(self.concurrency)
+        host_limits = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return await asyncio.gather(
+                *(self._fetch_one(url, limit, host_limits, executor) for url in links)
+            )
+
+    def run(self, links: list) -> list:
+        if not links:
+            return []
+        if self.concurrency == 1:
+            return [self._fetch_sync(url) for url in links]
+        return asyncio.run(self.fetch_all(list(links)))
+
+    def _fetch_sync(self, url):
+        try:
+            page = self.fetch(url)
+            return self.parse(page) if self.parse is not None else page
+        except Exception as e:
+            logger.warning(f"⚠️ Detail fetch failed for {url}: {e}")
+            metrics.increment(self.publisher, "failures", "detail_load")
+            return None
@@ -0,0 +1,280 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+from journal_collectors import page_cache, rate_control
+from journal_collectors.output_sink import OUTPUT_DIR
+from journal_collectors.resource_blocking import (
+    FONTS, IMAGES, MEDIA, STYLESHEETS, TRACKERS, MeteredDriver, apply_blocking,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DriverProfile:
+    name: str
+    undetected: bool = False
+    headless: bool = False
+    block_images: bool = False
+    use_driver_manager: bool = False
+    user_agent: str = None
+    arguments: tuple = ()
+    # "eager" returns from driver.get() at DOMContentLoaded; readiness waits cover the rest.
+    page_load_strategy: str = "normal"
+    blocked_urls: tuple = ()
+    report_resources: bool = False
+
+
+PROFILES = {
+    "ACM": DriverProfile(
+        name="ACM",
+        undetected=True,
+        user_agent="Mozilla/5.0 ...",
+        arguments=("--window-size=1920,1080", "--disable-gpu", "--no-sandbox"),
+        page_load_strategy="eager",
+        blocked_urls=IMAGES + FONTS + MEDIA + STYLESHEETS + TRACKERS,
+    ),
+    "IEEE": DriverProfile(
+        name="IEEE",
+        arguments=("--window-size=1920,1080", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"),
+        page_load_strategy="eager",
+        blocked_urls=IMAGES + FONTS + MEDIA + STYLESHEETS + TRACKERS,
+    ),
+    "SPRINGER": DriverProfile(
+        name="SPRINGER",
+        headless=True,
+        block_images=True,
+        use_driver_manager=True,
+        arguments=("--disable-gpu", "--no-sandbox"),
+        page_load_strategy="eager",
+        blocked_urls=IMAGES + FONTS + MEDIA + STYLESHEETS + TRACKERS,
+    ),
+    "ELSEVIER": DriverProfile(
+        name="ELSEVIER",
+        undetected=True,
+        arguments=("--no-sandbox", "--disable-blink-features", "--disable-blink-features=AutomationControlled"),
+        # Stylesheets stay: the "Show more" and cookie buttons are clicked, which needs a real layout.
+        page_load_strategy="eager",
+        blocked_urls=IMAGES + FONTS + MEDIA + TRACKERS,
+    ),
+}
+
+# The resolved chromedriver is remembered across runs; a stale or missing binary is resolved again.
+DRIVER_PATH_CACHE = os.path.join(OUTPUT_DIR, "chromedriver.json")
+DRIVER_PATH_TTL = 7 * 24 * 3600
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def _cached_driver_path():
+    try:
+        with open(DRIVER_PATH_CACHE, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = cached.get("path")
+    if path and os.path.isfile(path) and time.time() - cached.get("resolved", 0) < DRIVER_PATH_TTL:
+        return path
+    return None
+
+
+def chromedriver_path(refresh: bool = False):
+    # ChromeDriverManager().install() does a network version check, so it runs at most once a week.
+    global _driver_path
+    with _driver_path_lock:
+        if refresh:
+            _driver_path = None
+        elif _driver_path is None:
+            _driver_path = _cached_driver_path()
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+            try:
+                os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+                with open(DRIVER_PATH_CACHE, "w", encoding="utf-8") as f:
+                    json.dump({"path": _driver_path, "resolved": time.time()}, f)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not cache chromedriver path: {e}")
+        return _driver_path
+
+
+def build_options(profile: DriverProfile, options):
+    for argument in profile.arguments:
+        options.add_argument(argument)
+    if profile.headless:
+        options.add_argument("--headless=new")
+    if profile.block_images:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if profile.user_agent:
+        options.add_argument(f"user-agent={profile.user_agent}")
+    options.page_load_strategy = profile.page_load_strategy
+    if profile.report_resources:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def create_driver(profile: DriverProfile):
+    if page_cache.mode() == "replay":
+        return page_cache.ReplayDriver(page_cache.get_cache())
+    driver = _launch_chrome(profile)
+    apply_blocking(driver, profile.blocked_urls)
+    if profile.report_resources:
+        driver = MeteredDriver(driver, profile.name)
+    if page_cache.mode() == "record":
+        driver = page_cache.CachingDriver(driver, page_cache.get_cache())
+    return rate_control.PacedDriver(driver)
+
+
+def _launch_chrome(profile: DriverProfile):
+    if profile.undetected:
+        import undetected_chromedriver as uc
+        return uc.Chrome(options=build_options(profile, uc.ChromeOptions()))
+
+    from selenium import webdriver
+    options = build_options(profile, webdriver.ChromeOptions())
+    if profile.use_driver_manager:
+        from selenium.common.exceptions import SessionNotCreatedException
+        from selenium.webdriver.chrome.service import Service
+        try:
+            return webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+        except SessionNotCreatedException as e:
+            # Chrome updated since the cached driver was resolved.
+            logger.info(f"Cached chromedriver rejected ({e.msg}), resolving it again")
+            return webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=options)
+    return webdriver.Chrome(options=options)
+
+
+def is_healthy(driver) -> bool:
+    try:
+        handles = driver.window_handles
+        if not handles:
+            return False
+        # Drop any tabs a scraper left open so the next borrower starts clean.
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_script("return 1;")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Discarding unhealthy driver: {e}")
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"⚠️ Error while quitting driver: {e}")
+
+
+class DriverPool:
+    def __init__(self, max_per_profile: int = 1, profiles: dict = None, **overrides):
+        self.max_per_profile = max_per_profile
+        self.profiles = dict(PROFILES)
+        if profiles:
+            self.profiles.update(profiles)
+        if overrides:
+            # e.g. DriverPool(headless=True) forces every profile headless
+            self.profiles = {name: replace(p, **overrides) for name, p in self.profiles.items()}
+        self._idle = {}
+        self._created = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    def profile(self, publisher: str) -> DriverProfile:
+        try:
+            return self.profiles[publisher.upper()]
+        except KeyError:
+            raise ValueError(f"No driver profile for publisher '{publisher}'")
+
+    def acquire(self, publisher: str, timeout: float = None):
+        profile = self.profile(publisher)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            driver = self._claim(profile, deadline, timeout)
+            if driver is None:
+                break
+            # Health checks talk to Chrome, so they run outside the lock: a hung browser only
+            # stalls the thread that picked it.
+            if is_healthy(driver):
+                return driver
+            self._retire(profile, driver)
+
+        started = time.monotonic()
+        try:
+            driver = create_driver(profile)
+        except Exception:
+            with self._cond:
+                self._created[profile.name] -= 1
+                self._cond.notify()
+            raise
+        logger.info(f"🚀 Started {profile.name} driver in {time.monotonic() - started:.1f}s")
+        return driver
+
+    def _claim(self, profile: DriverProfile, deadline: float, timeout: float):
+        # An idle driver, or None once a slot for a new one is reserved; waits while the profile is full.
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                idle = self._idle.setdefault(profile.name, [])
+                if idle:
+                    return idle.pop()
+                if self._created.get(profile.name, 0) < self.max_per_profile:
+                    self._created[profile.name] = self._created.get(profile.name, 0) + 1
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No {profile.name} driver available after {timeout}s")
+                self._cond.wait(remaining)
+
+    def _retire(self, profile: DriverProfile, driver):
+        # Quit outside the lock; the slot is only freed once the browser is gone.
+        quit_driver(driver)
+        with self._cond:
+            self._created[profile.name] -= 1
+            self._cond.notify()
+
+    def release(self, publisher: str, driver, discard: bool = False):
+        profile = self.profile(publisher)
+        with self._cond:
+            if not (discard or self._closed):
+                self._idle.setdefault(profile.name, []).append(driver)
+                self._cond.notify()
+                return
+        self._retire(profile, driver)
+
+    @contextmanager
+    def borrow(self, publisher: str, timeout: float = None):
+        # Borrowed drivers go back to the pool on exit; scrapers given one never quit it.
+        driver = self.acquire(publisher, timeout)
+        discard = False
+        try:
+            yield driver
+        except BaseException:
+            discard = not is_healthy(driver)
+            raise
+        finally:
+            self.release(publisher, driver, discard=discard)
+
+    def warm(self, *publishers: str):
+        for publisher in publishers:
+            self.release(publisher, self.acquire(publisher))
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            idle = [d for drivers in self._idle.values() for d in drivers]
+            self._idle.clear()
+            self._cond.notify_all()
+        for driver in idle:
+            quit_driver(driver)
@@ -1,53 +1,75 @@
-import csv
 import os
-import time
-import pandas as pd 
-        
-        
-        
-from bs4 import BeautifulSoup
-import undetected_chromedriver as uc
+import sys
+from journal_collectors import metrics, pipeline
+from journal_collectors.driver_pool import PROFILES, create_driver
+from journal_collectors.detail_fetcher import DetailFetcher
+from journal_collectors.html_parser import Subtrees, make_soup
+from journal_collectors.output_sink import OUTPUT_DIR, get_sink
+from journal_collectors.readiness import DomStable, LazyLoaded, SelectorPresent, wait_until
+from journal_collectors.records import YEAR, Record, Reference, match, number
+from journal_collectors.reference_store import open_reference_store
+from journal_collectors.query_file import read_queries
 # Ensure dependencies
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
     from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
 except ImportError:
     os.system('pip install selenium webdriver-manager beautifulsoup4')
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
     from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
+
+
+ARTICLES_CSV = os.path.join(OUTPUT_DIR, "articles.csv")
+# References go to reference_store (one row each) once the article row is written; the CSV column
+# is kept so existing files still line up.
+ARTICLE_HEADERS = [
+    "Title", "Authors", "Affiliation",
+    "Publish Date", "Abstract", "Keywords", "References"
+]
+
+ARTICLE_SUBTREES = Subtrees(
+    ("h1", {"id": "screen-reader-main-title"}),
+    ("div", {"id": "banner"}),
+    ("div", {"class": "abstract author"}),
+    ("div", {"id": "aep-keywords-id4"}),
+    ("li", {"class": "bib-reference"}),
+)
+BANNER_SUBTREES = Subtrees(("div", {"id": "banner"}))
+SEARCH_SUBTREES = Subtrees(("div", {"class": "result-item-container"}))
+
+ARTICLE_READY = (SelectorPresent("h1#screen-reader-main-title"), DomStable())
+REFERENCES_READY = (LazyLoaded("li.bib-reference"),)
+BANNER_READY = (SelectorPresent("#banner dl.affiliation"),)
+SEARCH_READY = (SelectorPresent("div.result-item-container"), DomStable())
 
 
 class ScienceDirectScraperDetails:
     BASE_URL = "https://www.sciencedirect.com/search"
-    def __init__(self, url, shared_driver):
+    def __init__(self, url, shared_driver, sink=None, references=None):
         self.url = url
         self.driver = shared_driver
+        self.sink = sink
+        self._references = references
         self.article_data = {
             "title": "", "writers": "", "affiliation": "",
             "publish_date": "", "abstract": "",
-            "keywords": [], "references": []
+            "keywords": [], "references": ()
         }
+        self.reference_count = 0
         self.soup = None
-        
-    
+
+    @property
+    def references(self):
+        if self._references is None:
+            self._references = open_reference_store()
+        return self._references
+
 
     def load_page(self):
-        self.driver.get(self.url)
-        time.sleep(3)
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        for i in range(3):
-            scroll_point = self.driver.execute_script("return document.body.scrollHeight") * (i+1) / 3
-            self.driver.execute_script(f"window.scrollTo(0, {scroll_point});")
-            time.sleep(1)
+        with metrics.timed("ELSEVIER", "detail_load"):
+            self.driver.get(self.url)
+        wait_until(self.driver, "elsevier.article", ARTICLE_READY, timeout=5)
+        # References are rendered as the page is scrolled
+        wait_until(self.driver, "elsevier.references", REFERENCES_READY, timeout=4)
         self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
 
     def handle_cookie_consent(self):
         try:
@@ -55,156 +77,172 @@ class ScienceDirectScraperDetails:
             if cookie_buttons:
                 print("Clicking cookie consent button...")
                 cookie_buttons[0].click()
-                time.sleep(2)
+                wait_until(self.driver, "elsevier.cookies", (DomStable(),), timeout=2)
         except Exception as e:
             print(f"No cookie dialog or error: {e}")
 
     def parse_article(self):
-        if "Your browser is outdated" in self.driver.page_source:
+        page_source = self.driver.page_source
+        if "Your browser is outdated" in page_source:
             print("Still detected as automation. Taking screenshot...")
             self.driver.save_screenshot("browser_detection.png")
             return False
 
-        self.soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        with metrics.timed("ELSEVIER", "parse"):
+            self.soup = make_soup(page_source, ARTICLE_SUBTREES)
+            self.article_data.update(self.extract_article(self.soup))
+            self.article_data["references"] = tuple(self.iter_references(self.soup))
+            self.reference_count = len(self.article_data["references"])
+        print(f"title: {self.article_data['title']}")
+        print(f" publisher: {self.article_data['writers']}")
+
+        # Affiliation and publish date only render after "Show more", so re-parse just the banner
+        try:
+            show_more_btn = self.driver.find_element(By.ID, "show-more-btn")
+            show_more_btn.click()
+            wait_until(self.driver, "elsevier.show_more", BANNER_READY, timeout=2)
+            page_source = self.driver.page_source
+            with metrics.timed("ELSEVIER", "parse"):
+                self.article_data.update(self.extract_banner_details(make_soup(page_source, BANNER_SUBTREES)))
+        except Exception as e:
+            print(f"Note: Could not click 'Show more' button: {e}")
+            self.article_data.update(self.extract_banner_details(self.soup))
+
+        print(f" affiliation: {self.article_data['affiliation']}")
+        print(f" publish date: {self.article_data['publish_date']}")
+        print(f"abstract ({len(self.article_data['abstract'])} characters)")
+        print(f"Found keywords: {self.article_data['keywords']}")
+        print(f"Found {self.reference_count} references")
+        return True
+
+    @staticmethod
+    def extract_article(soup):
+        data = {"title": "", "writers": "", "abstract": "", "keywords": []}
 
         # Title
-        title_elem = self.soup.find('h1', id='screen-reader-main-title')
-        if title_elem:
-            title_span = title_elem.find('span', class_='title-text')
-            if title_span:
-                self.article_data["title"] = title_span.text.strip()
-                print(f"title: {self.article_data['title']}")
-
-        banner = self.soup.find('div', id='banner')
-        if banner:
-            wrapper = banner.find('div', class_='wrapper')
-            if wrapper:
-                # Writers
-                writer_spans = wrapper.find_all('span', class_='react-xocs-alternative-link')
-                writers = []
-                for span in writer_spans:
-                    writer_text = span.get_text().strip()
-                    if writer_text:
-                        writers.append(writer_text)
-                if writers:
-                    self.article_data['writers'] = ', '.join(writers)
-                    print(f" publisher: {self.article_data['writers']}")
-
-                # Try click show more
-                try:
-                    show_more_btn = self.driver.find_element(By.ID, "show-more-btn")
-                    show_more_btn.click()
-                    time.sleep(2)
-                    self.soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                    banner = self.soup.find('div', id='banner')
-                    wrapper = banner.find('div', class_='wrapper') if banner else None
-                except Exception as e:
-                    print(f"Note: Could not click 'Show more' button: {e}")
-
-                # Affiliation
-                if wrapper:
-                    aff_dl = wrapper.find('dl', class_='affiliation')
-                    if aff_dl:
-                        self.article_data["affiliation"] = aff_dl.get_text().strip()
-                        print(f" affiliation: {self.article_data['affiliation']}")
-
-                    pub_p = wrapper.find('p', class_='u-margin-s-bottom')
-                    if pub_p:
-                        self.article_data["publish_date"] = pub_p.get_text().strip()
-                        print(f" publish date: {self.article_data['publish_date']}")
+        title_elem = soup.find('h1', id='screen-reader-main-title')
+        title_span = title_elem.find('span', class_='title-text') if title_elem else None
+        if title_span:
+            data["title"] = title_span.text.strip()
+
+        # Writers
+        wrapper = ScienceDirectScraperDetails._banner_wrapper(soup)
+        if wrapper:
+            writers = [span.get_text().strip() for span in wrapper.find_all('span', class_='react-xocs-alternative-link')]
+            data["writers"] = ', '.join(w for w in writers if w)
 
         # Abstract
-        abstract_elem = self.soup.find('div', class_='abstract author')
-        if abstract_elem:
-            abstract_content = abstract_elem.find('div', class_='u-margin-s-bottom')
-            if abstract_content:
-                self.article_data["abstract"] = abstract_content.get_text().strip()
-                print(f"abstract ({self.article_data['abstract']} characters)")
-        self.article_data["references"] = []
+        abstract_elem = soup.find('div', class_='abstract author')
+        abstract_content = abstract_elem.find('div', class_='u-margin-s-bottom') if abstract_elem else None
+        if abstract_content:
+            data["abstract"] = abstract_content.get_text().strip()
+
         # Keywords
-        keywords_div = self.soup.find('div', id='aep-keywords-id4')
+        keywords_div = soup.find('div', id='aep-keywords-id4')
         if keywords_div:
-            keyword_divs = keywords_div.find_all('div', class_='keyword')
-            keywords = []
-            for kw_div in keyword_divs:
-                keyword_text = kw_div.get_text().strip()
-                if keyword_text:
-                    keywords.append(keyword_text)
-            self.article_data["keywords"] = keywords
-            print(f"Found keywords: {self.article_data['keywords']}")
-
-        # References
-# References
-        references_li = self.soup.find_all('li', class_='bib-reference')
-        for item in references_li:
+            keywords = [kw_div.get_text().strip() for kw_div in keywords_div.find_all('div', class_='keyword')]
+            data["keywords"] = [k for k in keywords if k]
+        return data
+
+    @staticmethod
+    def iter_references(soup):
+        # One Reference per li.bib-reference.
+        for item in soup.find_all('li', class_='bib-reference'):
             authors = item.find('span', class_='author')
             title_tag = item.find('a', class_='title')
             host = item.find('span', class_='host')
+            yield Reference(
+                authors.get_text(strip=True) if authors else "",
+                title_tag.get_text(strip=True) if title_tag else "",
+                sys.intern(host.get_text(strip=True)) if host else "",
+            )
+
+    @staticmethod
+    def extract_banner_details(soup):
+        data = {}
+        wrapper = ScienceDirectScraperDetails._banner_wrapper(soup)
+        if wrapper:
+            aff_dl = wrapper.find('dl', class_='affiliation')
+            if aff_dl:
+                data["affiliation"] = aff_dl.get_text().strip()
+            pub_p = wrapper.find('p', class_='u-margin-s-bottom')
+            if pub_p:
+                data["publish_date"] = pub_p.get_text().strip()
+        return data
 
-            ref = {
-                "authors": authors.get_text(strip=True) if authors else "",
-                "title": title_tag.get_text(strip=True) if title_tag else "",
-                "host": host.get_text(strip=True) if host else "",
-            }
-
-            self.article_data["references"].append(ref)
-
-        print(f"Found {self.article_data['references']} references")
-
+    @staticmethod
+    def _banner_wrapper(soup):
+        banner = soup.find('div', id='banner')
+        return banner.find('div', class_='wrapper') if banner else None
+
+    def record(self):
+        return Record(
+            title=self.article_data["title"],
+            authors=self.article_data["writers"],
+            publisher="ELSEVIER",
+            year=number(match(YEAR, self.article_data["publish_date"])),
+            abstract=self.article_data["abstract"],
+            url=self.url,
+            source="ELSEVIER",
+            affiliation=self.article_data["affiliation"],
+            publish_date=self.article_data["publish_date"],
+            keywords=self.article_data["keywords"],
+            references=self.article_data["references"],
+        )
 
+    def save_data(self):
+            sink = self.sink or get_sink(ARTICLES_CSV, ARTICLE_HEADERS)
+            pipeline.drain(pipeline.write_to(sink, reference_store=self.references)([self.record()]))
 
-        return True
+            print(f"Data queued for {sink.path}")
 
-    def save_data(self):
-            csv_file = "../output/articles.csv"
-            fieldnames = [
-                "Title", "Authors", "Affiliation",
-                "Publish Date", "Abstract", "Keywords", "References"
-            ]
-
-            row_data = {
-                "Title": self.article_data["title"],
-                "Authors": self.article_data["writers"],
-                "Affiliation": self.article_data["affiliation"],
-                "Publish Date": self.article_data["publish_date"],
-                "Abstract": self.article_data["abstract"],
-                "Keywords": ", ".join(self.article_data["keywords"]),
-                "References": "; ".join([
-                    f"{ref['authors']} - {ref['title']} ({ref['host']})"
-                    for ref in self.article_data["references"]
-                ])
-            }
-
-            file_exists = os.path.isfile(csv_file)
-
-            with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(row_data)
-
-            print(f"Data appended to {csv_file}")
 
+    def fetch(self):
+        self.load_page()
+        self.handle_cookie_consent()
+        return self.parse_article()
 
-    def run(self):
+    def fetch_record(self):
         try:
-            self.load_page()
-            self.handle_cookie_consent()
-            if self.parse_article():
-                self.save_data()
+            if self.fetch():
+                return self.record()
         except Exception as e:
             print(f"Error scraping details: {e}")
+            metrics.increment("ELSEVIER", "failures", "detail_load")
+        return None
+
+    def run(self):
+        if self.fetch_record() is None:
+            return False
+        self.save_data()
+        return True
 
-class ScienceDirectScraper:
+class ScienceDirectScraper(pipeline.RecordSource):
     BASE_URL = "https://www.sciencedirect.com/search"
 
-    def __init__(self, journal=None, start_year=None, end_year=None, offset=0, show=25):
+    def __init__(self, journal=None, start_year=None, end_year=None, offset=0, show=25, driver=None,
+                 detail_pool=None, detail_concurrency=1, seen_index=None, checkpoints=None, reference_store=None):
         self.journal = journal
         self.start_year = start_year
         self.end_year = end_year
         self.offset = offset
         self.show = show
-        self.driver = self._setup_driver()
+        self._owns_driver = driver is None
+        self.driver = driver or self._setup_driver()
+        # Article pages need a real browser, so concurrency means borrowing extra drivers from a pool
+        self.detail_pool = detail_pool
+        self.seen_index = seen_index
+        self.checkpoints = checkpoints
+        self.checkpoint = None
+        self._reference_store = reference_store
+        self.details = DetailFetcher(self._fetch_details, concurrency=detail_concurrency, per_host=detail_concurrency,
+                                     publisher="ELSEVIER")
+
+    @property
+    def reference_store(self):
+        if self._reference_store is None:
+            self._reference_store = open_reference_store()
+        return self._reference_store
 
     @classmethod
     def build_query_url(cls, journal, start_year, end_year, offset=0, show=25):
@@ -212,11 +250,7 @@ class ScienceDirectScraper:
         return f"{cls.BASE_URL}?pub={journal}&date={start_year}-{end_year}&show={show}&offset={offset}"
 
     def _setup_driver(self):
-        options = uc.ChromeOptions()
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-blink-features')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        return uc.Chrome(options=options)
+        return create_driver(PROFILES["ELSEVIER"])
 
     def get_dynamic_url(self):
         final_url = self.build_query_url(
@@ -230,10 +264,13 @@ class ScienceDirectScraper:
 
     def scrape(self):
         url = self.get_dynamic_url()
-        self.driver.get(url)
-        time.sleep(5)
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-        results = soup.find_all("div", class_="result-item-container")
+        with metrics.timed("ELSEVIER", "search_load"):
+            self.driver.get(url)
+        wait_until(self.driver, "elsevier.search", SEARCH_READY, timeout=5)
+        page_source = self.driver.page_source
+        with metrics.timed("ELSEVIER", "parse"):
+            soup = make_soup(page_source, SEARCH_SUBTREES)
+            results = soup.find_all("div", class_="result-item-container")
 
         data = []
         for item in results:
@@ -244,18 +281,86 @@ class ScienceDirectScraper:
                 data.append({'title': title, 'url': link})
         return data
 
-    def open_each_url_sequentially(self, articles, wait_time=5):
-        for article in articles:
+    def already_seen(self, article):
+        if self.seen_index and self.seen_index.seen(url=article['url'], title=article['title']):
+            print(f"⏭️ Already scraped: {article['title']}")
+            return True
+        return False
+
+    @property
+    def page(self):
+        return self.offset // self.show + 1
+
+    def skip_items(self):
+        return self.checkpoint.skip_items(self.page) if self.checkpoint else 0
+
+    def item_done(self, index):
+        if self.checkpoint:
+            self.checkpoint.item_done(self.page, index + 1)
+
+    def item_failed(self, index, url):
+        if self.checkpoint:
+            self.checkpoint.item_failed(self.page, index + 1, url)
+
+    def open_each_url_sequentially(self, articles):
+        for index, article in enumerate(articles):
+            if index < self.skip_items():
+                continue
+            if self.already_seen(article):
+                self.item_done(index)
+                continue
             print(f"Opening: {article['title']}")
             print(f"Link: {article['url']}")
-            scraper = ScienceDirectScraperDetails(article['url'], self.driver)
-            scraper.run()
+            record = ScienceDirectScraperDetails(article['url'], self.driver).fetch_record()
+            if record:
+                yield record
+                self.item_done(index)
+            else:
+                self.item_failed(index, article['url'])
             print("-" * 50)
-            time.sleep(wait_time)
-        self.driver.quit()
 
-    def run(self):
+    def _fetch_details(self, url):
+        with self.detail_pool.borrow("ELSEVIER") as driver:
+            scraper = ScienceDirectScraperDetails(url, driver)
+            return scraper.record() if scraper.fetch() else None
+
+    def open_each_url_concurrently(self, articles):
+        pending = [(index, article) for index, article in enumerate(articles)
+                   if index >= self.skip_items() and not self.already_seen(article)]
+        details = self.details.run([article['url'] for _, article in pending])
+        for (index, article), record in zip(pending, details):
+            print(f"Opened: {article['title']}")
+            if record:
+                yield record
+                self.item_done(index)
+            else:
+                self.item_failed(index, article['url'])
+
+    def retry_failed(self):
+        # Articles an earlier run could not read; any that fail again stay in the checkpoint.
+        urls = list(self.checkpoint.failed)
+        print(f"🔁 Retrying {len(urls)} articles that failed last time")
+        if self.detail_pool and self.details.concurrency > 1:
+            records = self.details.run(urls)
+        else:
+            records = (ScienceDirectScraperDetails(url, self.driver).fetch_record() for url in urls)
+        for url, record in zip(urls, records):
+            if record:
+                yield record
+                self.checkpoint.retried(url)
+
+    def iter_records(self):
+        # Walks the search pages from self.offset and yields one record per article; the
+        # checkpoint only advances past an article once the consumer has taken it.
         total_scraped = 0
+        if self.checkpoints:
+            self.checkpoint = self.checkpoints.for_query("ELSEVIER", self.journal, get_sink(ARTICLES_CSV, ARTICLE_HEADERS))
+            if self.checkpoint.failed:
+                yield from self.retry_failed()
+            if self.checkpoint.done:
+                print(f"⏭️ {self.journal} already completed")
+                return
+            self.offset = max(self.offset, self.checkpoint.page * self.show)
         while True:
             articles = self.scrape()
             if not articles:
@@ -264,20 +369,38 @@ class ScienceDirectScraper:
 
             print(f"Offset: {self.offset} | Articles scraped: {len(articles)}")
             total_scraped += len(articles)
-            self.open_each_url_sequentially(articles)
+            if self.detail_pool and self.details.concurrency > 1:
+                yield from self.open_each_url_concurrently(articles)
+            else:
+                yield from self.open_each_url_sequentially(articles)
 
+            if self.checkpoint:
+                self.checkpoint.page_done(self.page)
             self.offset += self.show  # move to next page
+        if self.checkpoint:
+            self.checkpoint.finish()
         print(f"✅ Total articles scraped: {total_scraped}")
 
+    def run(self):
+        sink = get_sink(ARTICLES_CSV, ARTICLE_HEADERS)
+        for _ in pipeline.compose(self.iter_records(), pipeline.write_to(sink, self.seen_index, self.reference_store)):
+            print(f"Data queued for {sink.path}")
+        self.cleanup()
+
+    def cleanup(self):
+        get_sink(ARTICLES_CSV, ARTICLE_HEADERS).flush()
+        if self._owns_driver:
+            self.driver.quit()
+
 
         
 QUERY_FILE = "../input.csv"
 
 def load_queries(file_path):
-    return pd.read_csv(file_path, skiprows=1)  # skipping header row (assumed row 1 is headers)
+    return read_queries(file_path, header_rows=2)  # skipping header row (assumed row 1 is headers)
 
 def process_query(row):
-    journal = row[1] if not pd.isna(row[1]) else "Unknown Journal"
+    journal = row[1] or "Unknown Journal"
     publisher = str(row[4]).strip().upper()
 
     if "ELSEVIER" in publisher:
@@ -294,6 +417,7 @@ def process_query(row):
         print(f"Skipping non-ELSEVIER journal: {journal}")
 
 if __name__ == "__main__":
-    df = load_queries(QUERY_FILE)
-    for _, row in df.iterrows():
+    from journal_collectors.log_config import configure_logging
+    configure_logging()
+    for row in load_queries(QUERY_FILE):
         process_query(row)
\ No newline at end of file
@@ -0,0 +1,58 @@
+import importlib.util
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("lxml", "html.parser", "html5lib")
+
+
+def available_backends() -> list:
+    return [b for b in BACKENDS if b == "html.parser" or importlib.util.find_spec(b) is not None]
+
+
+_backend = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+def set_backend(name: str):
+    global _backend
+    if name not in available_backends():
+        raise ValueError(f"HTML parser backend '{name}' is not installed (available: {available_backends()})")
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+class Subtrees(SoupStrainer):
+    # Only builds the parts of a page we read. Each rule is (tag name or None, attrs);
+    # a "class" value may list several classes, all of which must be present.
+    def __init__(self, *rules):
+        super().__init__()
+        self.rules = [(name, dict(attrs)) for name, attrs in rules]
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        attrs = attrs or {}
+        return any(
+            rule_name in (None, name) and all(self._attr_matches(attrs, k, v) for k, v in rule_attrs.items())
+            for rule_name, rule_attrs in self.rules
+        )
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    @staticmethod
+    def _attr_matches(attrs, key, expected) -> bool:
+        value = attrs.get(key)
+        if value is None:
+            return False
+        if key == "class":
+            classes = value.split() if isinstance(value, str) else value
+            return all(c in classes for c in expected.split())
+        return value == expected
+
+
+def make_soup(page_source: str, only: Subtrees = None, backend: str = None) -> BeautifulSoup:
+    return BeautifulSoup(page_source, backend or _backend, parse_only=only)
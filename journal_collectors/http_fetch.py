@@ -0,0 +1,71 @@
+import json
+import logging
+from urllib.parse import urlencode
+import requests
+from journal_collectors import page_cache, rate_control
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class BlockedError(Exception):
+    pass
+
+
+class HttpFetcher:
+    def __init__(self, pool_size: int = 10, timeout: float = 20, headers: dict = None, session=None):
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 504)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str) -> str:
+        return self._fetch(url, url, lambda: self.session.get(url, timeout=self.timeout))
+
+    def post_json(self, url: str, payload: dict, headers: dict = None) -> dict:
+        # POST bodies are folded into the cache key so recorded searches replay by query.
+        key = f"{url}?{urlencode({'json': json.dumps(payload, sort_keys=True)})}"
+        body = self._fetch(key, url, lambda: self.session.post(
+            url, json=payload, timeout=self.timeout,
+            headers={"Accept": "application/json, text/plain, */*", **(headers or {})}))
+        return json.loads(body)
+
+    def _fetch(self, key: str, url: str, send) -> str:
+        cache = page_cache.get_cache()
+        if page_cache.mode() == "replay":
+            html = cache.get(key)
+            if html is None:
+                raise BlockedError(f"{url} is not in the replay cache")
+            return html
+
+        rate = rate_control.for_url(url)
+        rate.acquire()
+        response = send()
+        reason = rate_control.classify(response.status_code, response.text)
+        if reason is not None:
+            rate.report(reason)
+            raise BlockedError(f"Bot wall at {url}: {reason}")
+        response.raise_for_status()
+        rate.report()
+        if cache is not None:
+            cache.put(key, response.text)
+        return response.text
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from journal_collectors.output_sink import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_DB = os.path.join(OUTPUT_DIR, "jobs.sqlite3")
+
+PENDING, LEASED, DONE, DEAD = "pending", "leased", "done", "dead"
+STATES = (PENDING, LEASED, DONE, DEAD)
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    publisher: str
+    query: str
+    row: tuple
+    attempts: int
+    max_attempts: int
+
+
+class LeaseLost(Exception):
+    # The job's lease expired and it may already be running on another worker.
+    pass
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """input.csv rows as durable jobs in SQLite, shared by any number of worker processes on one host.
+
+    A worker leases one job at a time and must heartbeat before the lease expires; a job whose
+    lease runs out (the worker died or hung) goes back to pending. Each lease counts as an
+    attempt, failures are retried with exponential backoff, and a job that has used up
+    `max_attempts` is dead-lettered with its last error.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_DB, lease_seconds: float = 900, retry_delay: float = 60):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit, so lease() can take the write lock up front with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                publisher TEXT NOT NULL,
+                query TEXT NOT NULL,
+                issn TEXT,
+                row TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                created_at REAL,
+                finished_at REAL,
+                UNIQUE (publisher, query)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, available_at)")
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, jobs, max_attempts: int = 3) -> int:
+        # Loading the same rows again is a no-op, so every worker may load input.csv on start.
+        now = time.time()
+        rows = [(job.publisher, job.query, job.row[2] if len(job.row) > 2 else None, json.dumps(list(job.row)),
+                 max_attempts, now) for job in jobs]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (publisher, query, issn, row, max_attempts, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+        added = self._transaction(insert)
+        logger.info(f"Queued {added} new jobs ({len(rows) - added} already in {self.path})")
+        return added
+
+    @staticmethod
+    def _expire_leases(conn, now: float):
+        conn.execute("UPDATE jobs SET state = ?, last_error = 'lease expired', finished_at = ?, lease_owner = NULL "
+                     "WHERE state = ? AND lease_expires < ? AND attempts >= max_attempts", (DEAD, now, LEASED, now))
+        conn.execute("UPDATE jobs SET state = ?, last_error = 'lease expired', lease_owner = NULL "
+                     "WHERE state = ? AND lease_expires < ?", (PENDING, LEASED, now))
+
+    def lease(self, worker_id: str, limits: dict = None) -> QueuedJob:
+        """Claim the next runnable job for `worker_id`, or None.
+
+        `limits` caps live leases per publisher across every worker (publisher -> max), the
+        queue-wide counterpart of the scheduler's host limits.
+        """
+        def claim(conn):
+            now = time.time()
+            self._expire_leases(conn, now)
+            busy = dict(conn.execute("SELECT publisher, COUNT(*) FROM jobs WHERE state = ? GROUP BY publisher",
+                                     (LEASED,)).fetchall())
+            full = [p for p, limit in (limits or {}).items() if busy.get(p, 0) >= limit]
+            placeholders = ",".join("?" * len(full))
+            row = conn.execute(
+                "SELECT id, publisher, query, row, attempts, max_attempts FROM jobs "
+                f"WHERE state = ? AND available_at <= ? {f'AND publisher NOT IN ({placeholders})' if full else ''} "
+                "ORDER BY attempts, id LIMIT 1", (PENDING, now, *full)).fetchone()
+            if row is None:
+                return None
+            job_id, publisher, query, data, attempts, max_attempts = row
+            conn.execute("UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                         "WHERE id = ?", (LEASED, worker_id, now + self.lease_seconds, job_id))
+            return QueuedJob(job_id, publisher, query, tuple(json.loads(data)), attempts + 1, max_attempts)
+        return self._transaction(claim)
+
+    def heartbeat(self, job: QueuedJob, worker_id: str) -> bool:
+        # False means the lease was lost: it expired and the job went back to the queue.
+        def extend(conn):
+            return conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                                (time.time() + self.lease_seconds, job.id, LEASED, worker_id)).rowcount == 1
+        return self._transaction(extend)
+
+    def complete(self, job: QueuedJob, worker_id: str) -> bool:
+        def finish(conn):
+            return conn.execute("UPDATE jobs SET state = ?, finished_at = ?, lease_owner = NULL, last_error = NULL "
+                                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                                (DONE, time.time(), job.id, LEASED, worker_id)).rowcount == 1
+        return self._transaction(finish)
+
+    def fail(self, job: QueuedJob, worker_id: str, error: str) -> str:
+        # Returns the job's new state: pending (retried after a backoff) or dead.
+        def record(conn):
+            now = time.time()
+            if job.attempts >= job.max_attempts:
+                state, available_at = DEAD, 0
+            else:
+                state, available_at = PENDING, now + self.retry_delay * 2 ** (job.attempts - 1)
+            changed = conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, last_error = ?, lease_owner = NULL, finished_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (state, available_at, error, now if state == DEAD else None, job.id, LEASED, worker_id)).rowcount
+            return state if changed else None
+        return self._transaction(record)
+
+    def release(self, job: QueuedJob, worker_id: str):
+        # Hand a job back untried (e.g. on Ctrl+C); the attempt it was leased with is not counted.
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = ?, attempts = attempts - 1, lease_owner = NULL "
+            "WHERE id = ? AND state = ? AND lease_owner = ?", (PENDING, job.id, LEASED, worker_id)))
+
+    def requeue_dead(self, publisher: str = None) -> int:
+        def revive(conn):
+            query = "UPDATE jobs SET state = ?, attempts = 0, available_at = 0, finished_at = NULL WHERE state = ?"
+            args = [PENDING, DEAD]
+            if publisher:
+                query += " AND publisher = ?"
+                args.append(publisher)
+            return conn.execute(query, args).rowcount
+        return self._transaction(revive)
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: dict(rows).get(state, 0) for state in STATES}
+
+    def unfinished(self) -> bool:
+        counts = self.counts()
+        return counts[PENDING] + counts[LEASED] > 0
+
+    def dead_letters(self) -> list:
+        with self._lock:
+            return self._conn.execute("SELECT publisher, query, attempts, last_error FROM jobs WHERE state = ? "
+                                      "ORDER BY finished_at", (DEAD,)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Heartbeat:
+    # Keeps a lease alive from a background thread while the job runs; check_lease() reads `lost`.
+    def __init__(self, queue: JobQueue, job: QueuedJob, worker_id: str, interval: float = None):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self.interval = interval or queue.lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job, self.worker_id):
+                    self.lost = True
+                    logger.warning(f"⚠️ Lost the lease on {self.job.publisher} '{self.job.query}'")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat for {self.job.publisher} '{self.job.query}' failed: {e}")
+
+    def __enter__(self):
+        global _active
+        _active = self
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = None
+        self._stop.set()
+        self._thread.join()
+
+
+# Heartbeat of the job this process is running, if any; work() runs one job at a time.
+_active = None
+
+
+def check_lease():
+    """Raise LeaseLost if the running job's lease is gone.
+
+    pipeline.write_to() calls it before every record, so a worker that lost its job stops writing
+    instead of producing the same records as the worker that picked the job up.
+    """
+    heartbeat = _active
+    if heartbeat is not None and heartbeat.lost:
+        raise LeaseLost(f"Lost the lease on {heartbeat.job.publisher} '{heartbeat.job.query}'")
+
+
+def work(queue: JobQueue, run, worker_id: str = None, limits: dict = None, poll_interval: float = 5.0) -> dict:
+    """Lease and run jobs until none are pending or leased anywhere; returns {state: count} for this worker.
+
+    `run(job)` raises to fail the job. Jobs leased by other workers, or waiting out a retry
+    backoff, keep this worker polling, since they may come back to the queue.
+    """
+    worker_id = worker_id or default_worker_id()
+    handled = {DONE: 0, PENDING: 0, DEAD: 0}
+    while True:
+        job = queue.lease(worker_id, limits)
+        if job is None:
+            if not queue.unfinished():
+                return handled
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"▶️ {worker_id} leased {job.publisher} '{job.query}' (attempt {job.attempts}/{job.max_attempts})")
+        try:
+            with Heartbeat(queue, job, worker_id) as heartbeat:
+                run(job)
+            if heartbeat.lost:
+                raise LeaseLost(f"Lost the lease on {job.publisher} '{job.query}'")
+        except KeyboardInterrupt:
+            queue.release(job, worker_id)
+            raise
+        except LeaseLost:
+            # The job is someone else's now: neither complete() nor fail() it.
+            logger.warning(f"⚠️ Abandoned {job.publisher} '{job.query}' after losing its lease")
+        except Exception as e:
+            logger.exception(f"❌ {job.publisher} query '{job.query}' failed")
+            state = queue.fail(job, worker_id, f"{type(e).__name__}: {e}")
+            if state:
+                handled[state] += 1
+            if state == DEAD:
+                logger.error(f"☠️ {job.publisher} '{job.query}' dead-lettered after {job.attempts} attempts")
+        else:
+            if queue.complete(job, worker_id):
+                handled[DONE] += 1
+
+
+def print_queue_status(queue: JobQueue):
+    counts = queue.counts()
+    print(f"\n🗂️ Job queue {queue.path}")
+    print("  " + "  ".join(f"{state} {n}" for state, n in counts.items()))
+    for publisher, query, attempts, error in queue.dead_letters():
+        print(f"      ☠️ {publisher} {query} ({attempts} attempts): {error}")
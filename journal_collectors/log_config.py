@@ -0,0 +1,10 @@
+import logging
+
+LOG_FILE = "debug.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def configure_logging(filename: str = LOG_FILE, level: int = logging.INFO):
+    # Called by entry points (main, scheduler workers) rather than at import time, so importing a
+    # scraper as a library leaves the caller's logging alone. Does nothing once handlers exist.
+    logging.basicConfig(filename=filename, filemode="a", level=level, format=LOG_FORMAT)
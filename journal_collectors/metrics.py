@@ -0,0 +1,200 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Every scraper times the stages search_load, detail_load and parse itself; "wait" comes from
+# readiness.wait_until, "write" from pipeline.write_to and "pacing" from rate_control.
+
+# Histogram bucket upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DEFAULT_HOST = "127.0.0.1"
+
+
+@dataclass
+class Histogram:
+    counts: list = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation, as Prometheus' histogram_quantile would.
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound if bound != float("inf") else BUCKETS[-1]
+        return BUCKETS[-1]
+
+
+_histograms = {}  # (publisher, stage) -> Histogram
+_counters = {}  # (publisher, event, stage) -> int
+_lock = threading.Lock()
+_started = time.time()
+
+
+def observe(publisher: str, stage: str, seconds: float):
+    with _lock:
+        _histograms.setdefault((publisher or "UNKNOWN", stage), Histogram()).observe(seconds)
+
+
+def increment(publisher: str, event: str, stage: str = "", amount: int = 1):
+    # Events: "records", "failures", "retries" (an HTTP fetch that fell back to the browser) and
+    # "blocks" (a captcha, 429, bot wall or empty page seen by rate_control).
+    with _lock:
+        key = (publisher or "UNKNOWN", event, stage)
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def timed(publisher: str, stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        increment(publisher, "failures", stage)
+        raise
+    finally:
+        observe(publisher, stage, time.perf_counter() - started)
+
+
+def snapshot() -> dict:
+    with _lock:
+        histograms = {key: Histogram(list(h.counts), h.count, h.total) for key, h in _histograms.items()}
+        counters = dict(_counters)
+    elapsed = time.time() - _started
+    publishers = {}
+    for (publisher, stage), h in sorted(histograms.items()):
+        entry = publishers.setdefault(publisher, {"stages": {}, "events": {}})
+        entry["stages"][stage] = {"count": h.count, "seconds": round(h.total, 3),
+                                  "p50": h.quantile(0.5), "p95": h.quantile(0.95)}
+    for (publisher, event, stage), n in sorted(counters.items()):
+        events = publishers.setdefault(publisher, {"stages": {}, "events": {}})["events"]
+        events[f"{event}.{stage}" if stage else event] = n
+    for entry in publishers.values():
+        pages = sum(entry["stages"].get(s, {}).get("count", 0) for s in ("search_load", "detail_load"))
+        entry["pages_per_minute"] = round(pages / elapsed * 60, 2) if elapsed else 0.0
+    return {"pid": os.getpid(), "started": _started, "elapsed_seconds": round(elapsed, 1), "publishers": publishers}
+
+
+def prometheus_text() -> str:
+    with _lock:
+        histograms = {key: Histogram(list(h.counts), h.count, h.total) for key, h in _histograms.items()}
+        counters = dict(_counters)
+    lines = [
+        "# HELP scraper_stage_seconds Time spent per publisher and scraping stage.",
+        "# TYPE scraper_stage_seconds histogram",
+    ]
+    for (publisher, stage), h in sorted(histograms.items()):
+        labels = f'publisher="{publisher}",stage="{stage}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+            cumulative += n
+            lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"scraper_stage_seconds_sum{{{labels}}} {h.total:.6f}")
+        lines.append(f"scraper_stage_seconds_count{{{labels}}} {h.count}")
+    lines += ["# HELP scraper_events_total Records written, failures and retries.",
+              "# TYPE scraper_events_total counter"]
+    for (publisher, event, stage), n in sorted(counters.items()):
+        lines.append(f'scraper_events_total{{publisher="{publisher}",event="{event}",stage="{stage}"}} {n}')
+    lines += ["# TYPE scraper_start_time_seconds gauge", f"scraper_start_time_seconds {_started:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(snapshot()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = prometheus_text().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, tries: int = 1, host: str = DEFAULT_HOST):
+    """Serve /metrics (Prometheus text) and /metrics.json on the first free port from `port`.
+
+    Each scheduler worker process has its own metrics, so workers pass `tries` and take consecutive ports.
+    Only this machine can connect unless `host` says otherwise (e.g. "0.0.0.0").
+    """
+    for candidate in range(port, port + max(tries, 1)):
+        try:
+            server = ThreadingHTTPServer((host, candidate), _MetricsHandler)
+        except OSError:
+            continue
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"📈 Metrics on http://{host}:{candidate}/metrics")
+        return server
+    logger.warning(f"⚠️ No free port for metrics in {port}-{port + tries - 1}")
+    return None
+
+
+def write_snapshot(path: str):
+    # Written under a temporary name and renamed, so a reader never sees half a file.
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def snapshot_periodically(path: str, interval: float = 30.0):
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot(path)
+            except OSError as e:
+                logger.error(f"Metrics snapshot to {path} failed: {e}")
+    threading.Thread(target=run, daemon=True).start()
+
+
+def start_export(port: int = None, json_path: str = None, interval: float = 30.0, port_tries: int = 1,
+                 host: str = DEFAULT_HOST):
+    if port:
+        serve(port, port_tries, host)
+    if json_path:
+        snapshot_periodically(json_path, interval)
+
+
+def print_metrics_summary(data: dict = None):
+    data = snapshot() if data is None else data
+    if not data["publishers"]:
+        return
+    minutes = max(data["elapsed_seconds"] / 60, 1e-9)
+    print(f"\n📈 Stage timings ({data['elapsed_seconds']:.0f}s)")
+    for publisher, entry in data["publishers"].items():
+        events = entry["events"]
+        failures = sum(n for name, n in events.items() if name.startswith("failures"))
+        retries = sum(n for name, n in events.items() if name.startswith("retries"))
+        print(f"  {publisher:<9} {entry['pages_per_minute']:7.1f} pages/min  "
+              f"{events.get('records', 0) / minutes:7.1f} records/min  ❌ {failures}  🔁 {retries}")
+        busy = sum(stage["seconds"] for stage in entry["stages"].values()) or 1
+        for name in sorted(entry["stages"], key=lambda s: -entry["stages"][s]["seconds"]):
+            stage = entry["stages"][name]
+            mean = stage["seconds"] / max(stage["count"], 1)
+            print(f"      {name:<12} {stage['count']:>6}x  mean {mean:6.2f}s  p95 ≤{stage['p95']:5.2f}s  "
+                  f"{stage['seconds']:8.1f}s ({stage['seconds'] / busy:4.0%})")
@@ -0,0 +1,174 @@
+import atexit
+import csv
+import io
+import logging
+import os
+import threading
+import time
+
+from journal_collectors import records
+
+try:
+    import fcntl
+except ImportError:  # Windows: batches are still single O_APPEND writes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+SCRAPED_DATA_CSV = os.path.join(OUTPUT_DIR, "scraped_data.csv")
+HEADERS = ["Title", "Authors", "Publisher", "Year", "Abstract", "Journal", "Volume/Issue", "Cited By"]
+PARQUET_DIR = os.path.join(OUTPUT_DIR, "parquet")
+OUTPUT_FORMATS = ("csv", "parquet")
+
+
+class BufferedSink:
+    # Buffers rows and hands them to _write_batch() in batches; subclasses decide the file format.
+    def __init__(self, path: str, fieldnames: list, batch_size: int = 200, flush_interval: float = 5.0):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._rows = []
+        self._after_flush = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def write(self, row: dict):
+        with self._lock:
+            if self._closed.is_set():
+                raise ValueError(f"Sink for {self.path} is closed")
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def after_flush(self, callback, key=None):
+        # Runs `callback` once every row written so far is on disk, so progress markers
+        # (seen index, checkpoints) never get ahead of the data. A later callback with
+        # the same key replaces a pending one.
+        with self._lock:
+            if not self._rows:
+                callback()
+                return
+            self._after_flush[key if key is not None else object()] = callback
+
+    def close(self):
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self._flush_locked()
+            self._close_output()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Background flush of {self.path} failed: {e}")
+
+    def _flush_locked(self):
+        if not self._rows:
+            return
+        self._write_batch(self._rows)
+        self.rows_written += len(self._rows)
+        self._rows = []
+        callbacks, self._after_flush = self._after_flush, {}
+        for callback in callbacks.values():
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"After-flush callback for {self.path} failed: {e}")
+
+    def _write_batch(self, rows: list):
+        raise NotImplementedError
+
+    def _close_output(self):
+        pass
+
+
+class CsvSink(BufferedSink):
+    def __init__(self, path: str, fieldnames: list, batch_size: int = 200, flush_interval: float = 5.0):
+        self._file = None
+        super().__init__(path, fieldnames, batch_size, flush_interval)
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, mode="a", newline="", encoding="utf-8")
+        return self._file
+
+    def _write_batch(self, rows: list):
+        f = self._open()
+        if fcntl:
+            # Other worker processes may append to the same file.
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            buffer = io.StringIO()
+            if f.tell() == 0:
+                csv.writer(buffer).writerow(self.fieldnames)
+            records.write_csv(buffer, rows, self.fieldnames)
+            f.write(buffer.getvalue())
+            f.flush()
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _close_output(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+_settings = {"format": "csv", "parquet_dir": PARQUET_DIR}
+
+
+def configure(output_format: str = "csv", parquet_dir: str = PARQUET_DIR):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+    with _sinks_lock:
+        _settings.update(format=output_format, parquet_dir=parquet_dir)
+
+
+def get_sink(path: str = SCRAPED_DATA_CSV, fieldnames: list = HEADERS, **kwargs) -> BufferedSink:
+    # One sink per output file per process, shared by every scraper that writes to it.
+    # In parquet mode `path` names the dataset: output/scraped_data.csv -> <parquet_dir>/scraped_data/
+    path = os.path.abspath(path)
+    with _sinks_lock:
+        output_format = _settings["format"]
+        key = (output_format, path)
+        sink = _sinks.get(key)
+        if sink is None or sink._closed.is_set():
+            if output_format == "parquet":
+                from journal_collectors.parquet_sink import ParquetSink
+                dataset = os.path.splitext(os.path.basename(path))[0]
+                sink = ParquetSink(os.path.join(_settings["parquet_dir"], dataset), fieldnames, **kwargs)
+            else:
+                sink = CsvSink(path, fieldnames, **kwargs)
+            _sinks[key] = sink
+        return sink
+
+
+def close_all():
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            logger.error(f"Failed to close sink for {sink.path}: {e}")
+
+
+atexit.register(close_all)
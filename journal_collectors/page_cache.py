@@ -0,0 +1,334 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from selenium.common.exceptions import NoSuchWindowException, TimeoutException
+from selenium.webdriver.common.by import By
+
+from journal_collectors.html_parser import make_soup
+from journal_collectors.output_sink import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = os.path.join(OUTPUT_DIR, "page_cache")
+CACHE_MODES = ("off", "record", "replay")
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+TRACKING_PARAMS = re.compile(r"^(utm_|_ga|fbclid|gclid)")
+
+
+def normalize_url(url: str) -> str:
+    parsed = urlparse(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                   if not TRACKING_PARAMS.match(k))
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", urlencode(query), ""))
+
+
+class PageCache:
+    def __init__(self, directory: str = PAGE_CACHE_DIR, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._puts = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url_key TEXT PRIMARY KEY, url TEXT, digest TEXT, fetched_at REAL, accessed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER);
+            CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+        """)
+        self._conn.commit()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], f"{digest}.html.gz")
+
+    def get(self, url: str, max_age: float = None) -> str:
+        # Pages older than `max_age` (the cache's ttl by default) are misses; evict() only frees their space.
+        key = normalize_url(url)
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute("SELECT digest, fetched_at FROM pages WHERE url_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            digest, fetched_at = row
+            if max_age is not None and time.time() - fetched_at > max_age:
+                logger.debug(f"Cached page for {url} is older than {max_age:.0f}s")
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url_key = ?", (time.time(), key))
+            self._conn.commit()
+        try:
+            with gzip.open(self._blob_path(digest), "rt", encoding="utf-8") as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"⚠️ Cached page for {url} is unreadable: {e}")
+            return None
+
+    def put(self, url: str, content: str):
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            # Identical pages share one blob; write it atomically so readers never see half a file.
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (digest, os.path.getsize(path)))
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                               (normalize_url(url), url, digest, now, now))
+            self._conn.commit()
+            self._puts += 1
+            evict = self._puts % 200 == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        with self._lock:
+            removed = 0
+            if self.ttl is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.ttl,)
+                ).rowcount
+            total = self._referenced_bytes()
+            if self.max_bytes is not None and total > self.max_bytes:
+                for url_key, size in self._conn.execute("""
+                    SELECT p.url_key, b.size FROM pages p JOIN blobs b ON b.digest = p.digest
+                    ORDER BY p.accessed_at
+                """).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM pages WHERE url_key = ?", (url_key,))
+                    total -= size
+                    removed += 1
+            orphans = self._conn.execute(
+                "SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM pages)"
+            ).fetchall()
+            for (digest,) in orphans:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._conn.commit()
+        if removed:
+            logger.info(f"🧹 Evicted {removed} cached pages")
+        return removed
+
+    def urls(self) -> list:
+        with self._lock:
+            return [url for (url,) in self._conn.execute("SELECT url FROM pages ORDER BY url")]
+
+    def _referenced_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs WHERE digest IN (SELECT digest FROM pages)"
+        ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachingDriver:
+    # Wraps a live driver and stores every page_source it hands out, keyed by the
+    # URL that was requested (and the final URL, if it redirected).
+    def __init__(self, driver, cache: PageCache):
+        self._driver = driver
+        self._cache = cache
+        self._requested = {}
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        self._driver.get(url)
+        self._requested[self._driver.current_window_handle] = url
+
+    @property
+    def page_source(self):
+        html = self._driver.page_source
+        current = self._driver.current_url
+        requested = self._requested.get(self._driver.current_window_handle, current)
+        self._cache.put(requested, html)
+        if normalize_url(current) != normalize_url(requested):
+            self._cache.put(current, html)
+        return html
+
+
+class ReplayElement:
+    def __init__(self, tag, driver):
+        self._tag = tag
+        self._driver = driver
+
+    @property
+    def text(self):
+        return " ".join(self._tag.get_text(" ").split())
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        if isinstance(value, list):
+            value = " ".join(value)
+        if name == "href" and value:
+            return self._driver.absolute(value)
+        return value
+
+    def find_element(self, by=By.ID, value=None):
+        return _find(self._tag, self._driver, by, value)[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return _find(self._tag, self._driver, by, value)
+
+    def click(self):
+        pass
+
+    def is_displayed(self):
+        return True
+
+
+def _select(root, by, value):
+    if by == By.CSS_SELECTOR:
+        return root.select(value)
+    if by == By.ID:
+        return root.select(f"[id='{value}']")
+    if by == By.CLASS_NAME:
+        return root.select(f".{value}")
+    if by == By.TAG_NAME:
+        return root.find_all(value)
+    if by == By.NAME:
+        return root.select(f"[name='{value}']")
+    raise TimeoutException(f"Replay mode cannot evaluate {by} selectors: {value}")
+
+
+def _find(root, driver, by, value):
+    found = _select(root, by, value)
+    if not found:
+        raise TimeoutException(f"Replay page has no element matching {by}={value}")
+    return [ReplayElement(tag, driver) for tag in found]
+
+
+class ReplayDriver:
+    # Browser stand-in that serves pages from the cache. The DOM is static, so a
+    # selector that doesn't match now never will: lookups fail like an expired
+    # WebDriverWait instead of letting it poll until its timeout.
+    is_static = True
+
+    def __init__(self, cache: PageCache):
+        self._cache = cache
+        self._windows = {"replay-0": ("about:blank", "<html></html>")}
+        self._soups = {}
+        self._next_window = 1
+        self.current_window_handle = "replay-0"
+
+    class _SwitchTo:
+        def __init__(self, driver):
+            self._driver = driver
+
+        def window(self, handle):
+            if handle not in self._driver._windows:
+                raise NoSuchWindowException(handle)
+            self._driver.current_window_handle = handle
+
+    @property
+    def switch_to(self):
+        return ReplayDriver._SwitchTo(self)
+
+    @property
+    def window_handles(self):
+        return list(self._windows)
+
+    @property
+    def current_url(self):
+        return self._windows[self.current_window_handle][0]
+
+    @property
+    def page_source(self):
+        return self._windows[self.current_window_handle][1]
+
+    def absolute(self, href):
+        return urljoin(self.current_url, href)
+
+    def get(self, url):
+        html = self._cache.get(url)
+        if html is None:
+            logger.warning(f"⚠️ Replay cache miss: {url}")
+            html = "<html><body></body></html>"
+        self._windows[self.current_window_handle] = (url, html)
+
+    def _soup(self):
+        url, html = self._windows[self.current_window_handle]
+        key = (self.current_window_handle, url)
+        if key not in self._soups:
+            self._soups = {key: make_soup(html)}
+        return self._soups[key]
+
+    def find_element(self, by=By.ID, value=None):
+        return _find(self._soup(), self, by, value)[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return _find(self._soup(), self, by, value)
+
+    def execute_script(self, script, *args):
+        if "window.open" in script:
+            handle = f"replay-{self._next_window}"
+            self._next_window += 1
+            self._windows[handle] = ("about:blank", "<html></html>")
+            if args and args[0]:
+                previous, self.current_window_handle = self.current_window_handle, handle
+                self.get(args[0])
+                self.current_window_handle = previous
+            return None
+        if "scrollHeight" in script:
+            return 0
+        return None
+
+    def close(self):
+        self._windows.pop(self.current_window_handle, None)
+
+    def save_screenshot(self, filename):
+        return False
+
+    def quit(self):
+        self._windows.clear()
+
+
+_settings = {"mode": "off", "directory": PAGE_CACHE_DIR, "ttl": DEFAULT_TTL, "max_bytes": DEFAULT_MAX_BYTES}
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configure(mode: str = "off", directory: str = PAGE_CACHE_DIR, ttl: float = DEFAULT_TTL,
+              max_bytes: int = DEFAULT_MAX_BYTES):
+    global _cache
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown page cache mode '{mode}', expected one of {CACHE_MODES}")
+    settings = {"mode": mode, "directory": directory, "ttl": ttl, "max_bytes": max_bytes}
+    with _cache_lock:
+        if settings != _settings:
+            _settings.update(settings)
+            _cache = None
+
+
+def mode() -> str:
+    return _settings["mode"]
+
+
+def get_cache() -> PageCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None and _settings["mode"] != "off":
+            _cache = PageCache(_settings["directory"], _settings["ttl"], _settings["max_bytes"])
+        return _cache
@@ -0,0 +1,57 @@
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from journal_collectors import metrics
+
+logger = logging.getLogger(__name__)
+
+HIT_COUNT = re.compile(r"(\d[\d,]*)")
+
+
+def parse_hit_count(text, pattern=HIT_COUNT) -> int:
+    # `pattern`'s first group picks the total out of e.g. "Showing 1-25 of 1,234 results"
+    match = pattern.search(str(text)) if text is not None else None
+    return int(match.group(1).replace(",", "")) if match else None
+
+
+def last_page(total_hits: int, page_size: int, max_pages: int = None) -> int:
+    # Without a hit count the caller has to walk pages until the first empty one, up to max_pages.
+    if total_hits is None:
+        return max_pages
+    pages = math.ceil(total_hits / page_size)
+    return pages if max_pages is None else min(pages, max_pages)
+
+
+def plan_pages(total_hits: int, page_size: int, start_page: int = 1, max_pages: int = None) -> range:
+    return range(start_page, (last_page(total_hits, page_size, max_pages) or start_page) + 1)
+
+
+class PageFetchError(Exception):
+    # A results page that could not be read, as opposed to one that came back empty.
+    def __init__(self, page: int, error: Exception):
+        super().__init__(f"Results page {page} failed: {error}")
+        self.page = page
+        self.error = error
+
+
+def fetch_pages(fetch, pages, concurrency: int = 4, publisher: str = None) -> list:
+    """Fetch several result pages at once; results keep the order of `pages`.
+
+    A page whose fetch raised is a PageFetchError in the results, for the caller to raise; an
+    empty page is whatever `fetch` returned for it.
+    """
+    def fetch_one(page):
+        try:
+            return fetch(page)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to fetch results page {page}: {e}")
+            metrics.increment(publisher, "failures", "search_load")
+            return PageFetchError(page, e)
+
+    pages = list(pages)
+    if concurrency <= 1 or len(pages) <= 1:
+        return [fetch_one(page) for page in pages]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(pages))) as executor:
+        return list(executor.map(fetch_one, pages))
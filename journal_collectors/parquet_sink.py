@@ -0,0 +1,131 @@
+import argparse
+import glob
+import logging
+import os
+import time
+import uuid
+
+from journal_collectors import records
+from journal_collectors.output_sink import PARQUET_DIR, BufferedSink
+from journal_collectors.records import Record, number
+from journal_collectors.scheduler import publisher_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for --output-format parquet
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Rows without a year land in Hive's null partition, which readers load as year = null.
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# Datasets whose rows carry no Publisher column.
+DEFAULT_SOURCES = {"articles": "ELSEVIER"}
+# Hive partition directories: source=<Record.source>/year=<Record.year>. Record.publisher stays a
+# data column: titles found through one source (e.g. IET journals on IEEE) keep their own publisher.
+PARTITION_COLUMNS = ("source", "year")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def dataset_schema():
+    # records.arrow_schema() without the partition columns, which live in the directory names.
+    schema = records.arrow_schema()
+    for name in PARTITION_COLUMNS:
+        schema = schema.remove(schema.get_field_index(name))
+    return schema
+
+
+def partition_of(record: Record, default_source: str = None) -> tuple:
+    source = record.source or publisher_key(record.publisher or "") or default_source or "UNKNOWN"
+    return source, record.year
+
+
+def conform(table, schema):
+    """Cast an older file's columns to `schema` before merging it with newer files.
+
+    Volume and issue used to be stored as strings; they are parsed the way Record parses them.
+    """
+    for name in table.column_names:
+        if name not in schema.names or table.schema.field(name).type == schema.field(name).type:
+            continue
+        target = schema.field(name).type
+        column = table.column(name)
+        if pa.types.is_integer(target) and pa.types.is_string(column.type):
+            column = pa.array([number(value) for value in column.to_pylist()], type=target)
+        else:
+            column = column.cast(target)
+        table = table.set_column(table.schema.get_field_index(name), name, column)
+    return table
+
+
+def _write_file(table, directory: str, prefix: str = "part", row_group_size: int = None):
+    # Written under a temporary name and renamed, so readers and compaction only ever see whole files.
+    os.makedirs(directory, exist_ok=True)
+    name = f"{prefix}-{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd", row_group_size=row_group_size)
+    os.replace(tmp_path, os.path.join(directory, name))
+    return os.path.join(directory, name)
+
+
+class ParquetSink(BufferedSink):
+    # Every flush becomes one zstd-compressed file (a single row group) per source/year
+    # partition. Finished files are never rewritten, so a crash can't corrupt earlier
+    # batches; compact() later merges the small files. Columns follow records.arrow_schema().
+    def __init__(self, path: str, fieldnames: list, batch_size: int = 1000, flush_interval: float = 30.0):
+        _require_pyarrow()
+        self.default_source = DEFAULT_SOURCES.get(os.path.basename(path))
+        super().__init__(path, fieldnames, batch_size, flush_interval)
+
+    def _write_batch(self, rows: list):
+        partitions = {}
+        for row in rows:
+            record = row if isinstance(row, Record) else Record.from_row(row)
+            partitions.setdefault(partition_of(record, self.default_source), []).append(record)
+        for (source, year), batch in partitions.items():
+            directory = os.path.join(self.path, f"source={source}",
+                                     f"year={NULL_PARTITION if year is None else year}")
+            # Parquet dictionary-encodes repeated strings itself.
+            table = records.to_arrow(batch, dictionary_encode=False).drop_columns(list(PARTITION_COLUMNS))
+            _write_file(table, directory)
+
+
+def compact(dataset_dir: str, min_files: int = 2, row_group_size: int = 100_000) -> int:
+    """Merge each partition's files into one; returns how many files were merged away.
+
+    Run it while no scraper is writing to the dataset, or readers may briefly see rows twice.
+    """
+    _require_pyarrow()
+    merged = 0
+    for directory, _, files in os.walk(dataset_dir):
+        parts = sorted(os.path.join(directory, f) for f in files if f.endswith(".parquet"))
+        if len(parts) < min_files:
+            continue
+        schema = dataset_schema()
+        table = pa.concat_tables([conform(pq.read_table(part), schema) for part in parts], promote_options="default")
+        _write_file(table, directory, prefix="compacted", row_group_size=row_group_size)
+        for part in parts:
+            os.remove(part)
+        merged += len(parts) - 1
+        logger.info(f"🗜️ Compacted {len(parts)} files ({table.num_rows} rows) in {directory}")
+    return merged
+
+
+def compact_all(parquet_dir: str = PARQUET_DIR) -> int:
+    return sum(compact(dataset) for dataset in sorted(glob.glob(os.path.join(parquet_dir, "*")))
+               if os.path.isdir(dataset))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge small Parquet files in each source/year partition")
+    parser.add_argument("dataset", nargs="?", help="one dataset directory (default: every dataset in --parquet-dir)")
+    parser.add_argument("--parquet-dir", default=PARQUET_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    removed = compact(args.dataset) if args.dataset else compact_all(args.parquet_dir)
+    print(f"🗜️ Merged away {removed} files")
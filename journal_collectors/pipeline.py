@@ -0,0 +1,141 @@
+# Scrapers expose iter_records(), a generator of records.Record objects, which read
+# like the output row (HEADERS keys) plus "url" and "source" (publisher key); plain
+# dicts with those keys work in every stage too. Stages take an iterable of records
+# and return a lazy iterator, so nothing is fetched until the consumer pulls the next
+# record; that pull is the backpressure. A scraper records checkpoint progress for an
+# item only when the consumer comes back for more, and opens its output sink on first
+# use, so iter_records() alone never touches the output files.
+#
+#     records = pipeline.compose(AcmScraper(["graphs"]).iter_records(), pipeline.normalize, pipeline.dedup())
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from functools import reduce
+
+from journal_collectors import job_queue, metrics
+from journal_collectors.records import Record
+from journal_collectors.seen_index import canonical_key, title_key
+
+
+def compose(records, *stages):
+    return reduce(lambda stream, stage: stage(stream), stages, records)
+
+
+def normalize(records):
+    # Collapse runs of whitespace left over from the page markup.
+    for record in records:
+        if isinstance(record, Record):
+            yield record.normalized()
+        else:
+            yield {key: " ".join(value.split()) if isinstance(value, str) else value for key, value in record.items()}
+
+
+def dedup(seen_index=None, window: int = 100_000):
+    """Drop records already in `seen_index`, or already yielded in this run.
+
+    In-run keys are kept in a bounded LRU of `window` entries, so memory stays flat on long crawls.
+    """
+    def stage(records):
+        recent = OrderedDict()
+        for record in records:
+            keys = [k for k in (canonical_key(record.get("url") or ""), title_key(record.get("Title") or "")) if k]
+            if any(k in recent for k in keys):
+                continue
+            if seen_index is not None and seen_index.seen(url=record.get("url"), title=record.get("Title")):
+                continue
+            for k in keys:
+                recent[k] = None
+                recent.move_to_end(k)
+            while len(recent) > window:
+                recent.popitem(last=False)
+            yield record
+    return stage
+
+
+def enrich(function):
+    # `function` returns the (possibly updated) record, or None to drop it.
+    def stage(records):
+        for record in records:
+            record = function(record)
+            if record is not None:
+                yield record
+    return stage
+
+
+def write_to(sink, seen_index=None, reference_store=None):
+    # Writes each record and marks it seen once the sink has flushed it to disk. With a
+    # reference_store, a record's references go there instead of the row, also only once the
+    # row is on disk. A queued job whose lease was lost stops here (job_queue.check_lease).
+    def stage(records):
+        for record in records:
+            job_queue.check_lease()
+            source = record.get("source")
+            references = ()
+            if reference_store is not None and isinstance(record, Record) and record.references:
+                references, record = record.references, replace(record, references=())
+            with metrics.timed(source, "write"):
+                sink.write(record)
+            metrics.increment(source, "records")
+            if references:
+                sink.after_flush(lambda r=record, refs=references: reference_store.replace(r.url, r.title, refs))
+            if seen_index is not None and record.get("url"):
+                sink.after_flush(lambda r=record: seen_index.add(url=r["url"], title=r.get("Title"),
+                                                                 publisher=r.get("source")))
+            yield record
+    return stage
+
+
+def drain(records) -> int:
+    count = 0
+    for _ in records:
+        count += 1
+    return count
+
+
+async def aiterate(records, maxsize: int = 64):
+    """Run a blocking record iterator on a thread and yield its records asynchronously.
+
+    The producer blocks once `maxsize` records are waiting, so a slow consumer throttles the crawl.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for record in records:
+                if stop.is_set():
+                    break
+                asyncio.run_coroutine_threadsafe(queue.put(record), loop).result()
+        except BaseException as e:
+            asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue so it can see `stop` and exit.
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+class RecordSource:
+    # Base of the scrapers, which implement iter_records(); aiter_records() serves it to asyncio consumers.
+    def iter_records(self):
+        raise NotImplementedError
+
+    def aiter_records(self, maxsize: int = 64):
+        return aiterate(self.iter_records(), maxsize)
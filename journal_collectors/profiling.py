@@ -0,0 +1,201 @@
+import cProfile
+import glob
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from journal_collectors.output_sink import OUTPUT_DIR
+
+try:
+    import psutil
+except ImportError:  # Chrome memory sampling is skipped without it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")
+# Allocations made by the profiling machinery itself are not interesting.
+IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+MB = 1024 * 1024
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^0-9A-Za-z]+", "-", label).strip("-")[:80] or "query"
+
+
+def chrome_rss() -> tuple:
+    """(resident bytes, process count) of every Chrome/chromedriver process started by this one."""
+    if psutil is None:
+        return 0, 0
+    total = count = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if "chrom" in child.name().lower():
+                total += child.memory_info().rss
+                count += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total, count
+
+
+class RssSampler:
+    # Samples chrome_rss() on a background thread until stopped.
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        started = time.monotonic()
+        while True:
+            rss, processes = chrome_rss()
+            self.samples.append((round(time.monotonic() - started, 2), rss, processes))
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if psutil is not None:
+            rss, processes = chrome_rss()
+            self.samples.append((self.samples[-1][0] if self.samples else 0.0, rss, processes))
+
+
+def _hot_functions(stats: pstats.Stats, top: int) -> list:
+    ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [{"function": f"{path}:{line}({name})", "calls": calls, "own_seconds": round(own, 4),
+             "cumulative_seconds": round(cumulative, 4)}
+            for (path, line, name), (_, calls, own, cumulative, _) in ranked]
+
+
+def _allocation_sites(before, after, top: int) -> list:
+    diff = after.filter_traces(IGNORED_ALLOCATIONS).compare_to(before.filter_traces(IGNORED_ALLOCATIONS), "lineno")
+    return [{"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "size_diff": stat.size_diff,
+             "count_diff": stat.count_diff, "size": stat.size}
+            for stat in sorted(diff, key=lambda s: s.size_diff, reverse=True)[:top] if stat.size_diff > 0]
+
+
+def _write_report(path: str, summary: dict, stats: pstats.Stats, top: int):
+    rss = summary["chrome_rss"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Query: {summary['label']}\n")
+        f.write(f"Wall {summary['wall_seconds']:.1f}s\n")
+        f.write(f"Python heap: {summary['heap_growth'] / MB:+.1f} MB retained, peak {summary['heap_peak'] / MB:.1f} MB\n")
+        if rss["samples"]:
+            f.write(f"Chrome RSS: start {rss['start'] / MB:.0f} MB, peak {rss['peak'] / MB:.0f} MB, "
+                    f"end {rss['end'] / MB:.0f} MB ({rss['processes']} processes)\n")
+        else:
+            f.write("Chrome RSS: not sampled (pip install psutil)\n")
+        f.write(f"\nTop {top} functions by own time (main thread only; detail fetch threads show up as waits)\n")
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats("tottime").print_stats(top)
+        f.write(buffer.getvalue())
+        f.write("\nTop allocation sites by retained growth\n")
+        for site in summary["allocation_sites"]:
+            f.write(f"  {site['size_diff'] / 1024:10.1f} KB  {site['count_diff']:+8d} blocks  {site['site']}\n")
+
+
+@contextmanager
+def profile(label: str, directory: str = PROFILE_DIR, top: int = 25, rss_interval: float = 1.0):
+    """Profile one query: CPU (cProfile), Python allocations (tracemalloc) and Chrome RSS.
+
+    Writes <slug>.prof (load with pstats or snakeviz), <slug>.txt (ranked report) and <slug>.json
+    (summary read by write_summary) to `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{_slug(label)}-{os.getpid()}-{time.time_ns() % 10 ** 9}")
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    heap_before = tracemalloc.get_traced_memory()[0]
+    before = tracemalloc.take_snapshot()
+    sampler = RssSampler(rss_interval).start()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall = time.perf_counter() - started
+        sampler.stop()
+        after = tracemalloc.take_snapshot()
+        heap_now, heap_peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        profiler.dump_stats(f"{base}.prof")
+        stats = pstats.Stats(profiler)
+        rss_values = [rss for _, rss, _ in sampler.samples]
+        summary = {
+            "label": label,
+            "wall_seconds": round(wall, 2),
+            "heap_growth": heap_now - heap_before,
+            "heap_peak": heap_peak,
+            "chrome_rss": {
+                "samples": sampler.samples,
+                "start": rss_values[0] if rss_values else 0,
+                "peak": max(rss_values, default=0),
+                "end": rss_values[-1] if rss_values else 0,
+                "processes": max((n for _, _, n in sampler.samples), default=0),
+            },
+            "hot_functions": _hot_functions(stats, top),
+            "allocation_sites": _allocation_sites(before, after, top),
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        _write_report(f"{base}.txt", summary, stats, top)
+        logger.info(f"🔬 Profile for '{label}' written to {base}.txt")
+
+
+def write_summary(directory: str, top: int = 30) -> str:
+    """Rank hot functions over every query profiled in `directory`, and the queries by time and memory."""
+    profiles = sorted(glob.glob(os.path.join(directory, "*.prof")))
+    if not profiles:
+        return None
+    summaries = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            summaries.append(json.load(f))
+    stats = pstats.Stats(*profiles, stream=io.StringIO())
+
+    path = os.path.join(directory, "summary.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{len(summaries)} queries profiled\n\nTop {top} functions by own time, all queries\n")
+        for entry in _hot_functions(stats, top):
+            f.write(f"  {entry['own_seconds']:9.2f}s own {entry['cumulative_seconds']:9.2f}s cum "
+                    f"{entry['calls']:>9} calls  {entry['function']}\n")
+        f.write("\nQueries by wall time\n")
+        for s in sorted(summaries, key=lambda s: -s["wall_seconds"]):
+            rss = s["chrome_rss"]
+            f.write(f"  {s['wall_seconds']:8.1f}s  heap {s['heap_growth'] / MB:+7.1f} MB (peak {s['heap_peak'] / MB:6.1f})"
+                    f"  chrome {rss['start'] / MB:6.0f} -> {rss['end'] / MB:6.0f} MB (peak {rss['peak'] / MB:6.0f})"
+                    f"  {s['label']}\n")
+        sites = {}
+        for s in summaries:
+            for site in s["allocation_sites"]:
+                sites[site["site"]] = sites.get(site["site"], 0) + site["size_diff"]
+        f.write("\nTop allocation sites by retained growth, all queries\n")
+        for site, size in sorted(sites.items(), key=lambda item: -item[1])[:top]:
+            f.write(f"  {size / 1024:10.1f} KB  {site}\n")
+    return path
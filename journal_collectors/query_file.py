@@ -0,0 +1,17 @@
+import csv
+from itertools import islice
+
+
+def read_queries(path: str, start: int = 0, stop: int = None, header_rows: int = 1):
+    """Stream input.csv rows as lists of strings, data rows `start` up to (not including) `stop`.
+
+    Rows shorter than the header are padded with "" so columns can be indexed like before; nothing
+    past `stop` is read.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = []
+        for _ in range(header_rows):
+            header = next(reader, [])
+        for row in islice(reader, start, stop):
+            yield row + [""] * (len(header) - len(row))
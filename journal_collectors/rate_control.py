@@ -0,0 +1,256 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from html import unescape
+from urllib.parse import urlparse
+
+from journal_collectors import metrics
+from journal_collectors.output_sink import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+RATE_STATE_DB = os.path.join(OUTPUT_DIR, "rate_control.sqlite3")
+
+# A page is a bot wall if it contains every string of one entry. Akamai's block page is matched on its
+# title and error reference together, since "Access Denied" alone turns up in articles and paywalls.
+BOT_WALL_MARKERS = (
+    ("captcha-delivery",),
+    ("Attention Required! | Cloudflare",),
+    ("cf-challenge",),
+    ("/cdn-cgi/challenge-platform",),
+    ("Just a moment...",),
+    ("Your browser is outdated",),
+    ("<title>Access Denied</title>", "errors.edgesuite.net"),
+)
+BLOCK_STATUSES = (403, 429, 503)
+
+# The start of the document and whether its body has any elements yet; read right after a navigation.
+PAGE_PROBE = """
+const root = document.documentElement;
+return [root ? root.outerHTML.slice(0, 20000) : "", document.body ? document.body.childElementCount : 0];
+"""
+
+
+def classify(status_code: int, html: str) -> str:
+    """Why a response looks like the site pushing back, or None if it looks healthy."""
+    if status_code in BLOCK_STATUSES:
+        return f"HTTP {status_code}"
+    head = html[:20000]
+    # Raw responses may spell a block page in capitals and with entity-escaped URLs; the DOM doesn't.
+    text = unescape(head).lower()
+    for marker in BOT_WALL_MARKERS:
+        if all(part.lower() in text for part in marker):
+            return f"bot wall ({marker[0]})"
+    if not head.strip():
+        return "empty page"
+    return None
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    # Rates are requests per second to one host, shared by every worker.
+    start: float = 1.0
+    minimum: float = 0.05
+    maximum: float = 10.0
+    increase: float = 0.02  # added per healthy response
+    decrease: float = 0.5  # multiplied in on every block
+    cooldown: float = 30.0  # no requests for this long after a block, doubling while blocks continue
+    max_cooldown: float = 600.0
+
+
+HOST_POLICIES = {
+    "dl.acm.org": RatePolicy(start=0.5, maximum=4),
+    "ieeexplore.ieee.org": RatePolicy(start=1.0),
+    "link.springer.com": RatePolicy(start=1.0),
+    # Used to be one article every 5 s plus the page load.
+    "www.sciencedirect.com": RatePolicy(start=0.2, maximum=2),
+}
+
+
+class RateState:
+    """Per-host AIMD pacing state in SQLite, so every worker process paces against the same numbers.
+
+    Without a `path` the state lives in memory and only paces this process.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or ":memory:"
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS hosts (
+                host TEXT PRIMARY KEY,
+                rate REAL NOT NULL,
+                next_at REAL NOT NULL DEFAULT 0,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                strikes INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                blocks INTEGER NOT NULL DEFAULT 0,
+                last_block TEXT
+            )
+        """)
+
+    def _update(self, host: str, policy: RatePolicy, change):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT OR IGNORE INTO hosts (host, rate) VALUES (?, ?)", (host, policy.start))
+                row = self._conn.execute("SELECT rate, next_at, blocked_until, strikes FROM hosts WHERE host = ?",
+                                         (host,)).fetchone()
+                result = change(*row)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def reserve(self, host: str, policy: RatePolicy) -> float:
+        # Takes the next request slot for `host`; returns how long to sleep until it.
+        def take(rate, next_at, blocked_until, strikes):
+            now = time.time()
+            slot = max(now, next_at, blocked_until)
+            self._conn.execute("UPDATE hosts SET next_at = ? WHERE host = ?", (slot + 1 / rate, host))
+            return slot - now
+        return self._update(host, policy, take)
+
+    def healthy(self, host: str, policy: RatePolicy) -> float:
+        def increase(rate, next_at, blocked_until, strikes):
+            rate = min(policy.maximum, rate + policy.increase)
+            self._conn.execute("UPDATE hosts SET rate = ?, strikes = 0, successes = successes + 1 WHERE host = ?",
+                               (rate, host))
+            return rate
+        return self._update(host, policy, increase)
+
+    def blocked(self, host: str, policy: RatePolicy, reason: str) -> tuple:
+        def back_off(rate, next_at, blocked_until, strikes):
+            rate = max(policy.minimum, rate * policy.decrease)
+            pause = min(policy.max_cooldown, policy.cooldown * 2 ** strikes)
+            self._conn.execute(
+                "UPDATE hosts SET rate = ?, blocked_until = ?, strikes = strikes + 1, blocks = blocks + 1, "
+                "last_block = ? WHERE host = ?", (rate, max(blocked_until, time.time() + pause), reason, host))
+            return rate, pause
+        return self._update(host, policy, back_off)
+
+    def rows(self) -> list:
+        with self._lock:
+            return self._conn.execute("SELECT host, rate, successes, blocks, last_block FROM hosts "
+                                      "ORDER BY host").fetchall()
+
+
+def _publisher(host: str) -> str:
+    from journal_collectors.scheduler import PUBLISHER_HOSTS
+    return next((publisher for publisher, known in PUBLISHER_HOSTS.items() if known == host), host)
+
+
+class HostRate:
+    # One host's pacing, as seen from this process.
+    def __init__(self, host: str, state: RateState, policy: RatePolicy = None):
+        self.host = host
+        self.state = state
+        self.policy = policy or HOST_POLICIES.get(host, RatePolicy())
+        self.publisher = _publisher(host)
+
+    def acquire(self):
+        delay = self.state.reserve(self.host, self.policy)
+        if delay > 0:
+            metrics.observe(self.publisher, "pacing", delay)
+            time.sleep(delay)
+
+    def report(self, reason: str = None):
+        # `reason` from classify(); None means the response was healthy.
+        if reason is None:
+            self.state.healthy(self.host, self.policy)
+            return
+        rate, pause = self.state.blocked(self.host, self.policy, reason)
+        metrics.increment(self.publisher, "blocks")
+        logger.warning(f"🧱 {self.host}: {reason}; down to {rate:.2f} req/s, pausing {pause:.0f}s")
+
+
+class Unpaced:
+    # Stand-in when rate control is off.
+    def acquire(self):
+        pass
+
+    def report(self, reason: str = None):
+        pass
+
+
+_UNPACED = Unpaced()
+# Library use paces each process on its own; main.py points every worker at RATE_STATE_DB.
+_settings = {"enabled": True, "path": None}
+_state = None
+_hosts = {}
+_lock = threading.Lock()
+
+
+def configure(enabled: bool = True, path: str = None):
+    global _state
+    with _lock:
+        if {"enabled": enabled, "path": path} != _settings:
+            _settings.update(enabled=enabled, path=path)
+            _state = None
+            _hosts.clear()
+
+
+def for_url(url: str):
+    global _state
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        if not _settings["enabled"] or not host:
+            return _UNPACED
+        if host not in _hosts:
+            if _state is None:
+                _state = RateState(_settings["path"])
+            _hosts[host] = HostRate(host, _state)
+        return _hosts[host]
+
+
+def check_page(driver, rate) -> str:
+    """Classify the page the driver is on and report it to `rate`; returns the block reason, if any."""
+    try:
+        head, children = driver.execute_script(PAGE_PROBE)
+    except Exception as e:
+        logger.debug(f"Page probe failed: {e}")
+        return None
+    reason = classify(None, head) if head else None
+    if reason is None and not children:
+        reason = "empty page"
+    rate.report(reason)
+    return reason
+
+
+class PacedDriver:
+    # Paces every navigation through the host's rate, and reports how the page came back.
+    # A page that looks blocked is loaded once more, after the back-off pause.
+    def __init__(self, driver, retries: int = 1):
+        self._driver = driver
+        self.retries = retries
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        rate = for_url(url)
+        for _ in range(self.retries + 1):
+            rate.acquire()
+            self._driver.get(url)
+            if check_page(self._driver, rate) is None:
+                return
+
+
+def print_rate_summary():
+    if not _settings["enabled"] or _state is None:
+        return
+    rows = _state.rows()
+    if not rows:
+        return
+    print(f"\n🚦 Request rates ({'this process' if _state.path == ':memory:' else f'shared via {_state.path}'})")
+    for host, rate, successes, blocks, last_block in rows:
+        print(f"  {host:<24} {rate:6.2f} req/s  ✅ {successes:>6}  🧱 {blocks:>4}"
+              f"{f'  last: {last_block}' if last_block else ''}")
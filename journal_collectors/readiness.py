@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from journal_collectors import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Each condition's start() returns a fresh check for one wait, so the same
+# condition can be shared between threads driving different browsers.
+
+@dataclass(frozen=True)
+class SelectorPresent:
+    css: str
+    minimum: int = 1
+
+    def start(self, driver):
+        return lambda: len(driver.find_elements(By.CSS_SELECTOR, self.css)) >= self.minimum
+
+
+@dataclass(frozen=True)
+class DocumentComplete:
+    def start(self, driver):
+        return lambda: driver.execute_script("return document.readyState") == "complete"
+
+
+class _Settled:
+    # True once `probe` has returned the same value for `quiet` seconds.
+    def __init__(self, probe, quiet: float):
+        self.probe = probe
+        self.quiet = quiet
+        self.last = None
+        self.since = time.monotonic()
+
+    def __call__(self) -> bool:
+        value = self.probe()
+        now = time.monotonic()
+        if value != self.last:
+            self.last, self.since = value, now
+            return False
+        return now - self.since >= self.quiet
+
+
+@dataclass(frozen=True)
+class NetworkIdle:
+    # No new resource requests for `quiet` seconds after the document finished loading.
+    quiet: float = 0.5
+
+    def start(self, driver):
+        return _Settled(lambda: driver.execute_script(
+            "return document.readyState === 'complete' ? performance.getEntriesByType('resource').length : -1;"
+        ), self.quiet)
+
+
+@dataclass(frozen=True)
+class DomStable:
+    quiet: float = 0.5
+
+    def start(self, driver):
+        return _Settled(lambda: driver.execute_script("return document.getElementsByTagName('*').length;"),
+                        self.quiet)
+
+
+@dataclass(frozen=True)
+class LazyLoaded:
+    # Keeps scrolling to the bottom until the page stops growing and no more `css` items appear.
+    css: str
+    quiet: float = 1.0
+
+    def start(self, driver):
+        def probe():
+            height = driver.execute_script(
+                "window.scrollTo(0, document.body.scrollHeight); return document.body.scrollHeight;")
+            return height, len(driver.find_elements(By.CSS_SELECTOR, self.css))
+        return _Settled(probe, self.quiet)
+
+
+@dataclass
+class WaitStats:
+    waits: int = 0
+    timeouts: int = 0
+    waited: float = 0.0
+    budget: float = 0.0
+
+    @property
+    def saved(self) -> float:
+        return self.budget - self.waited
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def wait_until(driver, label: str, conditions, timeout: float, poll: float = 0.2) -> bool:
+    """Block until every condition holds or `timeout` passes; returns whether the page got ready.
+
+    `timeout` is the fixed delay this wait replaced, so the time it saved is recorded under `label`.
+    """
+    started = time.monotonic()
+    checks = [condition.start(driver) for condition in conditions]
+    pending = list(checks)
+    ready = False
+    while True:
+        try:
+            pending = [check for check in pending if not check()]
+        except WebDriverException as e:
+            logger.debug(f"Readiness check '{label}' failed: {e}")
+        if not pending:
+            ready = True
+            break
+        # A replayed page never changes, so there is nothing to wait for.
+        if getattr(driver, "is_static", False) or time.monotonic() - started >= timeout:
+            break
+        time.sleep(poll)
+
+    record_wait(label, time.monotonic() - started, timeout, ready)
+    return ready
+
+
+def record_wait(label: str, elapsed: float, timeout: float, ready: bool):
+    # Also used by waits that poll several pages at once (tab_pipeline), outside wait_until.
+    metrics.observe(label.split(".")[0].upper(), "wait", elapsed)
+    with _stats_lock:
+        stats = _stats.setdefault(label, WaitStats())
+        stats.waits += 1
+        stats.timeouts += not ready
+        stats.waited += elapsed
+        stats.budget += timeout
+    if not ready:
+        logger.info(f"⏱️ '{label}' not ready after {elapsed:.1f}s, continuing")
+
+
+def wait_stats() -> dict:
+    with _stats_lock:
+        return {label: WaitStats(**vars(stats)) for label, stats in _stats.items()}
+
+
+def print_wait_summary(stats: dict = None):
+    stats = wait_stats() if stats is None else stats
+    if not stats:
+        return
+    print("\n⏱️ Page readiness waits")
+    for label, s in sorted(stats.items()):
+        print(f"  {label:<22} {s.waits:>5} waits  {s.timeouts:>4} timed out  "
+              f"waited {s.waited:8.1f}s  saved {s.saved:8.1f}s")
+    print(f"  Total saved vs fixed delays: {sum(s.saved for s in stats.values()):.1f}s")
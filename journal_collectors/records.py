@@ -0,0 +1,178 @@
+import csv
+import re
+import sys
+from dataclasses import dataclass, fields, replace
+from typing import NamedTuple
+
+# Placeholders the page markup uses for "no value".
+MISSING = {"", "N/A", "Unknown", "None"}
+
+YEAR = re.compile(r"\b(19\d{2}|20\d{2})\b")
+VOLUME = re.compile(r"Volume:\s*([^|/]+)")
+ISSUE = re.compile(r"Issue:\s*([^|/]+)")
+NUMBER = re.compile(r"(\d[\d,]*)")
+
+
+def text(value):
+    value = None if value is None else str(value).strip()
+    return None if value in MISSING else value
+
+
+def match(pattern, value):
+    found = pattern.search(str(value or ""))
+    return text(found.group(1)) if found else None
+
+
+def number(value):
+    found = match(NUMBER, value)
+    return int(found.replace(",", "")) if found else None
+
+
+def _intern(value):
+    # Publisher, journal and keyword strings repeat across thousands of records.
+    value = text(value)
+    return sys.intern(value) if value is not None else None
+
+
+class Reference(NamedTuple):
+    authors: str
+    title: str
+    host: str
+
+    def __str__(self):
+        return f"{self.authors} - {self.title} ({self.host})"
+
+
+@dataclass(slots=True, eq=False)
+class Record:
+    """One scraped article, with parsed numeric year, volume, issue and citation count.
+
+    get() and [] read it as the CSV row the scrapers used to build ("Year" -> "Year:2015"), plus
+    "url" and "source", so sinks and pipeline stages accept a Record or a plain dict alike.
+    """
+    title: str
+    authors: str = ""
+    publisher: str = None
+    year: int = None
+    abstract: str = ""
+    journal: str = None
+    volume: int = None
+    issue: int = None
+    cited_by: int = None
+    url: str = None
+    source: str = None
+    affiliation: str = None
+    publish_date: str = None
+    keywords: tuple = ()
+    references: tuple = ()
+
+    def __post_init__(self):
+        self.publisher = _intern(self.publisher)
+        self.journal = _intern(self.journal)
+        self.source = _intern(self.source)
+        self.keywords = tuple(sys.intern(k) for k in self.keywords)
+        self.references = tuple(r if isinstance(r, Reference) else Reference(*r) for r in self.references)
+
+    @classmethod
+    def from_row(cls, row: dict, url: str = None, source: str = None):
+        # Parses the decorated strings of a scraper row: "Year: 2015", "Volume: 12 | Issue: 3", "Cited by: Papers (5)".
+        volume_issue = row.get("Volume/Issue")
+        return cls(
+            title=row.get("Title") or "",
+            authors=row.get("Authors") or "",
+            publisher=row.get("Publisher"),
+            year=number(match(YEAR, row.get("Year") or row.get("Publish Date"))),
+            abstract=row.get("Abstract") or "",
+            journal=row.get("Journal"),
+            volume=number(match(VOLUME, volume_issue)),
+            issue=number(match(ISSUE, volume_issue)),
+            cited_by=number(row.get("Cited By")),
+            url=url if url is not None else row.get("url"),
+            source=source if source is not None else row.get("source"),
+            affiliation=text(row.get("Affiliation")),
+            publish_date=text(row.get("Publish Date")),
+            keywords=tuple(k for k in (row.get("Keywords") or "").split(", ") if k),
+        )
+
+    def normalized(self):
+        # Copy with runs of whitespace collapsed in every text field.
+        return replace(self, **{f.name: " ".join(value.split()) for f in fields(self)
+                                if isinstance(value := getattr(self, f.name), str)})
+
+    def get(self, key, default=None):
+        column = COLUMNS.get(key)
+        return column(self) if column else default
+
+    def __getitem__(self, key):
+        column = COLUMNS.get(key)
+        if column is None:
+            raise KeyError(key)
+        return column(self)
+
+
+def _label(label, value):
+    return f"{label}:{value}" if value is not None else "N/A"
+
+
+# Row view of a Record: the CSV columns, in the string form the CSV files have always used.
+COLUMNS = {
+    "Title": lambda r: r.title,
+    "Authors": lambda r: r.authors,
+    "Publisher": lambda r: r.publisher or "N/A",
+    "Year": lambda r: _label("Year", r.year),
+    "Abstract": lambda r: r.abstract,
+    "Journal": lambda r: r.journal or "N/A",
+    "Volume/Issue": lambda r: f"{_label('Volume', r.volume)}/{_label('Issue', r.issue)}",
+    "Cited By": lambda r: str(r.cited_by) if r.cited_by is not None else "N/A",
+    "Affiliation": lambda r: r.affiliation or "",
+    "Publish Date": lambda r: r.publish_date or "",
+    "Keywords": lambda r: ", ".join(r.keywords),
+    "References": lambda r: "; ".join([f"{a} - {t} ({h})" for a, t, h in r.references]),
+    "url": lambda r: r.url,
+    "source": lambda r: r.source,
+}
+
+
+def write_csv(file, records, fieldnames: list):
+    # Rows go out as lists through one csv.writer, skipping DictWriter's per-row key checks.
+    columns = [COLUMNS.get(field, lambda r: None) for field in fieldnames]
+    csv.writer(file).writerows(
+        [column(record) for column in columns] if isinstance(record, Record)
+        else [record.get(field, "") for field in fieldnames]
+        for record in records
+    )
+
+
+def _pyarrow():
+    # Imported on first use: pyarrow takes ~0.1s to import and only columnar output needs it.
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Columnar output needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _pyarrow()
+    reference = pa.struct([("authors", pa.string()), ("title", pa.string()), ("host", pa.string())])
+    types = {"year": pa.int16(), "volume": pa.int32(), "issue": pa.int32(), "cited_by": pa.int32(),
+             "keywords": pa.list_(pa.string()), "references": pa.list_(reference)}
+    return pa.schema([(f.name, types.get(f.name, pa.string())) for f in fields(Record)])
+
+
+def to_arrow(records: list, dictionary_encode: bool = True):
+    """Build a pyarrow Table from Records, one column at a time.
+
+    String columns with few distinct values (publisher, journal, source) are dictionary-encoded
+    unless `dictionary_encode` is off.
+    """
+    pa = _pyarrow()
+    schema = arrow_schema()
+    columns = {}
+    for field in schema:
+        # Reference tuples convert to structs directly.
+        columns[field.name] = pa.array([getattr(record, field.name) for record in records], type=field.type)
+    if dictionary_encode:
+        for name in ("publisher", "journal", "source"):
+            columns[name] = columns[name].dictionary_encode()
+    return pa.table(columns)
@@ -0,0 +1,132 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from journal_collectors.output_sink import OUTPUT_DIR
+from journal_collectors.seen_index import canonical_key
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DB = os.path.join(OUTPUT_DIR, "references.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    scraped_at REAL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    ordinal INTEGER NOT NULL,
+    authors TEXT,
+    title TEXT COLLATE NOCASE,
+    host_id INTEGER REFERENCES hosts (id),
+    PRIMARY KEY (article_id, ordinal)
+) WITHOUT ROWID;
+-- NOCASE on the column lets a case-insensitive LIKE 'prefix%' use this index.
+CREATE INDEX IF NOT EXISTS refs_title ON refs (title);
+CREATE VIEW IF NOT EXISTS article_references AS
+    SELECT a.url AS article_url, a.title AS article_title, r.ordinal, r.authors, r.title, h.name AS host
+    FROM refs r JOIN articles a ON a.id = r.article_id LEFT JOIN hosts h ON h.id = r.host_id;
+"""
+
+
+class ReferenceStore:
+    """Cited references of every scraped article, one row each, in SQLite.
+
+    Replaces the "; "-joined References cell: references are written as the article page is
+    parsed, hosts (journal names) are stored once, and titles are indexed for lookups.
+    """
+
+    def __init__(self, path: str = REFERENCE_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _host_id(self, name: str):
+        if not name:
+            return None
+        host_id = self._hosts.get(name)
+        if host_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO hosts (name) VALUES (?)", (name,))
+            host_id = self._hosts[name] = self._conn.execute("SELECT id FROM hosts WHERE name = ?",
+                                                             (name,)).fetchone()[0]
+        return host_id
+
+    def replace(self, url: str, title: str, references) -> int:
+        """Store `references` ((authors, title, host) tuples, any iterable) for the article at `url`.
+
+        A re-scraped article's old references are replaced. Returns how many were written.
+        """
+        key = canonical_key(url)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO articles (key, url, title, scraped_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET url = excluded.url, title = excluded.title, "
+                    "scraped_at = excluded.scraped_at", (key, url, title, time.time()))
+                article_id = self._conn.execute("SELECT id FROM articles WHERE key = ?", (key,)).fetchone()[0]
+                self._conn.execute("DELETE FROM refs WHERE article_id = ?", (article_id,))
+                self._conn.executemany(
+                    "INSERT INTO refs VALUES (?, ?, ?, ?, ?)",
+                    ((article_id, ordinal, authors, ref_title, self._host_id(host))
+                     for ordinal, (authors, ref_title, host) in enumerate(references, 1)))
+                written = self._conn.execute("SELECT COUNT(*) FROM refs WHERE article_id = ?",
+                                             (article_id,)).fetchone()[0]
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                # Host ids inserted in the rolled-back transaction are gone too.
+                self._hosts.clear()
+                raise
+            return written
+
+    def references_of(self, url: str) -> list:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT r.ordinal, r.authors, r.title, h.name FROM refs r JOIN articles a ON a.id = r.article_id "
+                "LEFT JOIN hosts h ON h.id = r.host_id WHERE a.key = ? ORDER BY r.ordinal",
+                (canonical_key(url),)).fetchall()
+
+    def citing(self, title: str, limit: int = 100) -> list:
+        # Articles citing a reference whose title starts with `title` (case-insensitive, via refs_title).
+        pattern = title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            return self._conn.execute(
+                "SELECT article_url, article_title, ordinal, authors, title, host FROM article_references "
+                "WHERE title LIKE ? ESCAPE '\\' LIMIT ?", (pattern, limit)).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_reference_store(path: str = REFERENCE_DB) -> ReferenceStore:
+    # Shared per process, like the seen index; detail threads write through the same connection.
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ReferenceStore(path)
+        return store
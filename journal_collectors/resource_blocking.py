@@ -0,0 +1,127 @@
+import json
+import logging
+import threading
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Chrome's Network.setBlockedURLs patterns; "*" matches any run of characters.
+IMAGES = ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*")
+FONTS = ("*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*")
+MEDIA = ("*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*")
+STYLESHEETS = ("*.css*",)
+TRACKERS = (
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*hotjar.com*", "*scorecardresearch.com*", "*newrelic.com*", "*nr-data.net*",
+    "*crazyegg.com*", "*optimizely.com*", "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*",
+    "*addthis.com*", "*altmetric.com*", "*plu.mx*", "*trendmd.com*", "*qualtrics.com*",
+)
+
+# Rough median transfer sizes per resource type (HTTP Archive), used to estimate what blocked requests would
+# have cost. Blocked requests are never sent, so their real size is unknowable.
+TYPICAL_BYTES = {
+    "Image": 20_000,
+    "Font": 30_000,
+    "Media": 250_000,
+    "Script": 25_000,
+    "Stylesheet": 12_000,
+}
+DEFAULT_TYPICAL_BYTES = 5_000
+
+
+def apply_blocking(driver, patterns):
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        logger.warning(f"⚠️ Could not enable resource blocking: {e}")
+
+
+@dataclass
+class ResourceStats:
+    pages: int = 0
+    transferred: int = 0
+    blocked: int = 0
+    estimated_saved: int = 0
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def read_performance_log(entries):
+    """Sum one page's performance log into (bytes transferred, requests blocked, estimated bytes saved)."""
+    types = {}
+    transferred = blocked = saved = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            types[params.get("requestId")] = params.get("type")
+        elif method == "Network.loadingFinished":
+            transferred += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+            resource_type = params.get("type") or types.get(params.get("requestId"))
+            saved += TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+    return transferred, blocked, saved
+
+
+class MeteredDriver:
+    # Reads Chrome's performance log whenever a new page is requested, so each
+    # page's transfer and blocked requests are reported once it has been used.
+    def __init__(self, driver, profile_name: str):
+        self._driver = driver
+        self._profile_name = profile_name
+        self._url = None
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        self.report()
+        self._url = url
+        self._driver.get(url)
+
+    def report(self):
+        try:
+            entries = self._driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"No performance log: {e}")
+            return
+        if self._url is None:
+            return
+        transferred, blocked, saved = read_performance_log(entries)
+        with _stats_lock:
+            stats = _stats.setdefault(self._profile_name, ResourceStats())
+            stats.pages += 1
+            stats.transferred += transferred
+            stats.blocked += blocked
+            stats.estimated_saved += saved
+        logger.info(f"📉 {self._url}: {transferred / 1024:.0f} KB transferred, {blocked} requests blocked "
+                    f"(~{saved / 1024:.0f} KB saved)")
+
+    def quit(self):
+        self.report()
+        self._driver.quit()
+
+
+def resource_stats() -> dict:
+    with _stats_lock:
+        return {name: ResourceStats(**vars(stats)) for name, stats in _stats.items()}
+
+
+def print_resource_summary(stats: dict = None):
+    stats = resource_stats() if stats is None else stats
+    if not stats:
+        return
+    print("\n📉 Browser traffic per page")
+    for name, s in sorted(stats.items()):
+        pages = max(s.pages, 1)
+        print(f"  {name:<9} {s.pages:>5} pages  {s.transferred / pages / 1024:8.0f} KB transferred  "
+              f"{s.blocked / pages:6.1f} blocked  ~{s.estimated_saved / pages / 1024:6.0f} KB saved")
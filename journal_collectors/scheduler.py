@@ -0,0 +1,234 @@
+import logging
+import multiprocessing.util
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from journal_collectors import job_queue, metrics, rate_control
+from journal_collectors.driver_pool import DriverPool
+from journal_collectors.log_config import configure_logging
+from journal_collectors.output_sink import close_all
+from journal_collectors.readiness import print_wait_summary
+from journal_collectors.resource_blocking import print_resource_summary
+
+logger = logging.getLogger(__name__)
+
+PUBLISHER_HOSTS = {
+    "ACM": "dl.acm.org",
+    "IEEE": "ieeexplore.ieee.org",
+    "SPRINGER": "link.springer.com",
+    "ELSEVIER": "www.sciencedirect.com",
+}
+
+# Max queries in flight per host, across all worker processes.
+HOST_LIMITS = {
+    "dl.acm.org": 1,
+    "ieeexplore.ieee.org": 2,
+    "link.springer.com": 2,
+    "www.sciencedirect.com": 1,
+}
+
+
+def publisher_key(publisher_name) -> str:
+    name = str(publisher_name).strip().upper()
+    if "SPRINGER" in name:
+        return "SPRINGER"
+    if "IEEE" in name:
+        return "IEEE"
+    if "ASSOC" in name or re.search(r"\bACM\b", name):
+        return "ACM"
+    if "ELSEVIER" in name:
+        return "ELSEVIER"
+    return None
+
+
+@dataclass
+class Job:
+    publisher: str
+    query: str
+    row: tuple
+
+    @property
+    def host(self) -> str:
+        return PUBLISHER_HOSTS[self.publisher]
+
+
+@dataclass
+class PublisherSummary:
+    publisher: str
+    succeeded: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    first_start: float = None
+    last_end: float = None
+    errors: list = field(default_factory=list)
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+
+_worker_pool = None
+
+
+def worker_metrics_path(path: str) -> str:
+    # Worker processes keep separate metrics, so each writes its own snapshot: metrics.json -> metrics-<pid>.json
+    root, ext = os.path.splitext(path)
+    return f"{root}-{os.getpid()}{ext}"
+
+
+def _init_worker(browsers_per_publisher: int, driver_overrides: dict = None, metrics_export: dict = None,
+                 workers: int = 1):
+    # One driver pool per worker process, so browser startup is paid once per worker.
+    global _worker_pool
+    configure_logging()
+    _worker_pool = DriverPool(max_per_profile=browsers_per_publisher, **(driver_overrides or {}))
+    # atexit hooks don't run in multiprocessing children; Finalize does.
+    multiprocessing.util.Finalize(None, _worker_pool.shutdown, exitpriority=10)
+    multiprocessing.util.Finalize(None, close_all, exitpriority=20)
+    multiprocessing.util.Finalize(None, print_wait_summary, exitpriority=5)
+    multiprocessing.util.Finalize(None, print_resource_summary, exitpriority=5)
+    multiprocessing.util.Finalize(None, metrics.print_metrics_summary, exitpriority=5)
+    multiprocessing.util.Finalize(None, rate_control.print_rate_summary, exitpriority=5)
+    if metrics_export:
+        json_path = metrics_export.get("json_path") and worker_metrics_path(metrics_export["json_path"])
+        metrics.start_export(metrics_export.get("port"), json_path, metrics_export.get("interval", 30.0),
+                             port_tries=workers, host=metrics_export.get("host", metrics.DEFAULT_HOST))
+        if json_path:
+            multiprocessing.util.Finalize(None, metrics.write_snapshot, args=(json_path,), exitpriority=5)
+
+
+def _run_job(runner, job: Job):
+    started = time.time()
+    try:
+        runner(job.row, _worker_pool)
+        return started, time.time(), None
+    except Exception as e:
+        logger.exception(f"❌ {job.publisher} query '{job.query}' failed")
+        return started, time.time(), f"{type(e).__name__}: {e}"
+
+
+def queue_limits(host_limits: dict = None) -> dict:
+    # HOST_LIMITS re-keyed by publisher, as JobQueue.lease() counts leases per publisher.
+    limits = dict(HOST_LIMITS)
+    limits.update(host_limits or {})
+    return {publisher: limits.get(host, 1) for publisher, host in PUBLISHER_HOSTS.items()}
+
+
+def _drain_queue(runner, queue_path: str, lease_seconds: float, retry_delay: float, limits: dict) -> dict:
+    queue = job_queue.JobQueue(queue_path, lease_seconds=lease_seconds, retry_delay=retry_delay)
+    try:
+        return job_queue.work(queue, lambda job: runner(job.row, _worker_pool), limits=limits)
+    finally:
+        queue.close()
+
+
+def run_queue_workers(runner, queue_path: str, workers: int, browsers_per_publisher: int = 1,
+                      driver_overrides: dict = None, metrics_export: dict = None, host_limits: dict = None,
+                      lease_seconds: float = 900, retry_delay: float = 60) -> dict:
+    """Run `workers` processes that each drain the job queue at `queue_path`, and total what they handled.
+
+    Other processes on this host pointed at the same queue file share the per-publisher limits. The
+    queue is SQLite in WAL mode, which needs shared memory on one host: never put the file on a
+    network filesystem to share it between machines.
+    """
+    handled = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(browsers_per_publisher, driver_overrides, metrics_export, workers)) as executor:
+        futures = [executor.submit(_drain_queue, runner, queue_path, lease_seconds, retry_delay,
+                                   queue_limits(host_limits)) for _ in range(workers)]
+        for future in futures:
+            try:
+                for state, n in future.result().items():
+                    handled[state] = handled.get(state, 0) + n
+            except Exception:
+                # Whatever the dead worker had leased expires and is retried by the next worker to poll.
+                logger.exception("❌ Queue worker died")
+    return handled
+
+
+class Scheduler:
+    def __init__(self, runner, workers: int = None, host_limits: dict = None, browsers_per_publisher: int = 1,
+                 driver_overrides: dict = None, metrics_export: dict = None):
+        self.runner = runner
+        self.workers = workers or os.cpu_count() or 1
+        self.browsers_per_publisher = browsers_per_publisher
+        self.driver_overrides = driver_overrides
+        # port / json_path / interval / host for metrics.start_export() in every worker
+        self.metrics_export = metrics_export
+        self.host_limits = dict(HOST_LIMITS)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self._queues = {}
+        self._order = deque()
+
+    def submit(self, job: Job):
+        if job.publisher not in self._queues:
+            self._queues[job.publisher] = deque()
+            self._order.append(job.publisher)
+        self._queues[job.publisher].append(job)
+
+    def _next_job(self, in_flight: dict):
+        # Round-robin over publishers so one long backlog can't starve the others.
+        for _ in range(len(self._order)):
+            publisher = self._order[0]
+            self._order.rotate(-1)
+            queue = self._queues[publisher]
+            host = PUBLISHER_HOSTS[publisher]
+            if queue and in_flight.get(host, 0) < self.host_limits.get(host, 1):
+                return queue.popleft()
+        return None
+
+    def run(self) -> dict:
+        summaries = {p: PublisherSummary(p) for p in self._queues}
+        in_flight = {}
+        futures = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.browsers_per_publisher, self.driver_overrides, self.metrics_export,
+                                           self.workers)) as executor:
+            while futures or any(self._queues.values()):
+                while len(futures) < self.workers:
+                    job = self._next_job(in_flight)
+                    if job is None:
+                        break
+                    in_flight[job.host] = in_flight.get(job.host, 0) + 1
+                    futures[executor.submit(_run_job, self.runner, job)] = job
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = futures.pop(future)
+                    in_flight[job.host] -= 1
+                    summary = summaries[job.publisher]
+                    try:
+                        started, ended, error = future.result()
+                    except Exception as e:
+                        # The worker process itself died (e.g. Chrome took it down).
+                        started = ended = time.time()
+                        error = f"{type(e).__name__}: {e}"
+                    summary.busy_seconds += ended - started
+                    summary.first_start = min(started, summary.first_start or started)
+                    summary.last_end = max(ended, summary.last_end or ended)
+                    if error:
+                        summary.failed += 1
+                        summary.errors.append((job.query, error))
+                    else:
+                        summary.succeeded += 1
+        return summaries
+
+
+def print_summary(summaries: dict, wall_seconds: float):
+    print("\n📊 Per-publisher summary")
+    for summary in summaries.values():
+        print(
+            f"  {summary.publisher:<9} ✅ {summary.succeeded:>4}  ❌ {summary.failed:>4}  "
+            f"busy {summary.busy_seconds:8.1f}s  wall {summary.wall_seconds:8.1f}s"
+        )
+        for query, error in summary.errors:
+            print(f"      ⚠️ {query}: {error}")
+    print(f"  Total wall time: {wall_seconds:.1f}s")
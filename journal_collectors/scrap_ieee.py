@@ -1,69 +1,155 @@
-import os
-import csv
-import time
+import html
+import json
+import re
+import sys
 import threading
-from selenium import webdriver
+import time
+from functools import partial
+from urllib.parse import quote, urljoin
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
 import logging
+from journal_collectors.driver_pool import PROFILES, create_driver
+from journal_collectors import metrics, pipeline, rate_control
+from journal_collectors.detail_fetcher import DetailFetcher
+from journal_collectors.html_parser import Subtrees, make_soup
+from journal_collectors.http_fetch import HttpFetcher
+from journal_collectors.output_sink import HEADERS, SCRAPED_DATA_CSV, get_sink
+from journal_collectors.pagination import PageFetchError, fetch_pages, last_page, parse_hit_count
+from journal_collectors.readiness import DomStable, SelectorPresent, wait_until
+from journal_collectors.records import Record
+from journal_collectors.tab_pipeline import TabPipeline
 
+logger = logging.getLogger(__name__)
 
+RESULTS_READY = (SelectorPresent(".List-results-items"), DomStable())
+ABSTRACT_READY = (SelectorPresent(".abstract-text"),)
+RESULTS_SUBTREES = Subtrees((None, {"class": "List-results-items"}))
+DASHBOARD_SUBTREES = Subtrees((None, {"class": "Dashboard-header"}))
+RESULT_COUNT = re.compile(r"of\s+([\d,]+)\s+result")
+NO_RESULTS = "No results found"
+# [status, abstract, start of the page] per link, so rate_control can classify each response.
+IN_PAGE_ABSTRACTS = """
+const done = arguments[arguments.length - 1];
+const metadata = /xplGlobal\\.document\\.metadata\\s*=\\s*(\\{.*?\\});\\s*\\n/s;
+Promise.all(arguments[0].map(link => fetch(link, {credentials: "include"})
+    .then(response => response.text().then(html => {
+        const m = html.match(metadata);
+        return [response.status, m ? JSON.parse(m[1]).abstract || null : null, html.slice(0, 20000)];
+    }))
+    .catch(() => [0, null, ""])
+)).then(done);
+"""
+SEARCH_API_URL = "https://ieeexplore.ieee.org/rest/search"
+MARKUP = re.compile(r"<[^>]+>")
+DOCUMENT_METADATA = re.compile(r"xplGlobal\.document\.metadata\s*=\s*(\{.*?\});\s*\n", re.S)
+# A batch of journals is searched as one query; main.py carries it in a single input row's title cell.
+BATCH_SEPARATOR = " | "
+MAX_BATCH_QUERY_CHARS = 1500
 
-logging.basicConfig(
-    filename='debug.log',  # or use 'logs/ieee_scraper.log' in a logs folder
-    filemode='a',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
 
-class IEEEScraper:
+def query_text(query) -> str:
+    # A single title is matched anywhere in the metadata and in the publication title; a batch
+    # (tuple of titles) matches any of its publication titles as a phrase.
+    if isinstance(query, str):
+        return f'("All Metadata":{query}) AND ("Publication Title":{query})'
+    return " OR ".join(f'("Publication Title":"{title.replace(chr(34), "")}")' for title in query)
+
+
+def batch_queries(titles, size: int, max_chars: int = MAX_BATCH_QUERY_CHARS) -> list:
+    """Group journal titles into batches of up to `size`, keeping each batch's query under `max_chars`."""
+    batches = []
+    for title in titles:
+        if batches and len(batches[-1]) < size and len(query_text((*batches[-1], title))) <= max_chars:
+            batches[-1].append(title)
+        else:
+            batches.append([title])
+    return batches
+
+
+def journal_key(title) -> str:
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", str(title or "").lower().replace("&", " and ")).split())
+
+
+def source_journal(publication_title, titles):
+    """Which of the batch's `titles` a record's publication title belongs to, or None.
+
+    Titles are compared case- and punctuation-insensitively; failing an exact match, the longest
+    batch title contained in the publication title wins.
+    """
+    key = journal_key(publication_title)
+    keys = {journal_key(title): title for title in titles}
+    if key in keys:
+        return keys[key]
+    contained = [k for k in keys if k and f" {k} " in f" {key} "]
+    return keys[max(contained, key=len)] if contained else None
+
+
+class IEEEScraper(pipeline.RecordSource):
     stop_scraping = False
 
-    def __init__(self, queries, total_items_to_scrape=100000, items_per_page=20):
-        chrome_options = Options()
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
-        self.csv_filename = "/home/darkside/PycharmProjects/journal-collectors/output/scraped_data.csv"
+    def __init__(self, queries, total_items_to_scrape=100000, items_per_page=25, driver=None,
+                 fetch_mode="browser", detail_concurrency=8, sink=None, seen_index=None, checkpoints=None,
+                 backend="ui", api_url=SEARCH_API_URL, tabs=1, batch_size=1):
+        # "api" asks the JSON search endpoint behind searchresult.jsp directly and needs no browser
+        self.backend = backend
+        self.api_url = api_url
+        self._owns_driver = driver is None and backend != "api"
+        self.driver = driver or (None if backend == "api" else create_driver(PROFILES["IEEE"]))
+        # "http" reads abstracts from the document pages' embedded metadata, several at a time
+        self.fetch_mode = fetch_mode
+        self.http = HttpFetcher(pool_size=detail_concurrency) if fetch_mode == "http" or backend == "api" else None
+        self.details = DetailFetcher(self.fetch_abstract_http, concurrency=detail_concurrency, per_host=detail_concurrency,
+                                     publisher="IEEE")
+        self.wait = WebDriverWait(self.driver, 10) if self.driver else None
+        # With tabs > 1, browser abstract fetches share `tabs` tabs and the next results page loads ahead.
+        self.tab_pipeline = TabPipeline(self.driver, ABSTRACT_READY, tabs=tabs, timeout=10, publisher="IEEE",
+                                        label="ieee.abstract") if self.driver and tabs > 1 else None
+        self._next_results_tab = None
+        self.csv_filename = SCRAPED_DATA_CSV
+        self._sink = sink
+        self.seen_index = seen_index
+        self.checkpoints = checkpoints
+        self.checkpoint = None
+        self.current_page = 1
+        self.total_hits = None
+        self._prefetched = {}
         self.original_window = None
         self.total_items_to_scrape = total_items_to_scrape
         self.items_per_page = items_per_page
         self.queries = queries
-        self.create_csv_file()
-        threading.Thread(target=self.wait_for_key, daemon=True).start()
+        # With batch_size > 1, up to that many journal titles share one search (see batch_queries).
+        self.batch_size = batch_size
+        # Scheduler worker processes have no console to read ENTER from.
+        if sys.stdin and sys.stdin.isatty():
+            threading.Thread(target=self.wait_for_key, daemon=True).start()
 
     def wait_for_key(self):
         input("🔴 Press ENTER anytime to stop scraping...\n")
         IEEEScraper.stop_scraping = True
 
-    def create_csv_file(self):
-        if not os.path.exists(self.csv_filename):
-            with open(self.csv_filename, mode="w", newline="", encoding="utf-8") as file:
-                writer = csv.DictWriter(file, fieldnames=["Title", "Authors", "Publisher", "Year", "Abstract", "Journal", "Volume/Issue", "Cited By"])
-                writer.writeheader()
-
-    def save_data_to_csv(self, data):
-        with open(self.csv_filename, mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=["Title", "Authors", "Publisher", "Year", "Abstract", "Journal", "Volume/Issue", "Cited By"])
-            writer.writerow({
-                "Title": data[0],
-                "Authors": data[1],
-                "Publisher": data[2],
-                "Year": data[3],
-                "Abstract": data[4],
-                "Journal": data[5],
-                "Volume/Issue": data[6],
-                "Cited By": data[7]
-            })
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = get_sink(self.csv_filename, HEADERS)
+        return self._sink
+
+    @staticmethod
+    def to_record(data, link):
+        return Record.from_row(dict(zip(HEADERS, data)), url=link, source="IEEE")
+
+    def already_seen(self, link, title):
+        if self.seen_index and self.seen_index.seen(url=link, title=title):
+            logger.info(f"⏭️ Already scraped: {link}")
+            return True
+        return False
 
     def open_site(self, url):
-        self.driver.get(url)
+        with metrics.timed("IEEE", "search_load"):
+            self.driver.get(url)
+        wait_until(self.driver, "ieee.results", RESULTS_READY, timeout=5)
         self.original_window = self.driver.current_window_handle
 
     def safe_find(self, parent, by, value, default="N/A", script_remove_class=False):
@@ -76,6 +162,10 @@ class IEEEScraper:
             return default
 
     def extract_abstract(self, link):
+        with metrics.timed("IEEE", "detail_load"):
+            return self._extract_abstract_in_tab(link)
+
+    def _extract_abstract_in_tab(self, link):
         self.driver.execute_script("window.open(arguments[0]);", link)
         self.wait.until(EC.number_of_windows_to_be(2))
         new_window = [w for w in self.driver.window_handles if w != self.original_window][0]
@@ -89,7 +179,38 @@ class IEEEScraper:
         self.driver.switch_to.window(self.original_window)
         return abstract
 
+    @staticmethod
+    def read_abstract(driver):
+        elements = driver.find_elements(By.CLASS_NAME, "abstract-text")
+        return elements[0].text.strip() if elements else "N/A"
+
+    def extract_abstracts(self, links):
+        # Browser fallback for the abstracts a bulk pass missed; None where even that failed.
+        if self.tab_pipeline is not None:
+            return self.tab_pipeline.map(links, self.read_abstract)
+        abstracts = []
+        for link in links:
+            try:
+                abstracts.append(None if IEEEScraper.stop_scraping else self.extract_abstract(link))
+            except Exception as e:
+                logger.warning(f"❌ Failed to read the abstract of {link}: {e}")
+                abstracts.append(None)
+        return abstracts
+
+    def fetch_abstract_http(self, link):
+        with metrics.timed("IEEE", "detail_load"):
+            page_source = self.http.get(link)
+        with metrics.timed("IEEE", "parse"):
+            match = DOCUMENT_METADATA.search(page_source)
+            abstract = json.loads(match.group(1)).get("abstract") if match else None
+        return abstract or None
+
     def extract_item_data(self, item):
+        data, link = self.extract_item_fields(item)
+        data[4] = self.extract_abstract(link)
+        return data
+
+    def extract_item_fields(self, item):
         title_element = item.find_element(By.CSS_SELECTOR, "h3 a")
         title = title_element.text.strip()
         link = title_element.get_attribute("href")
@@ -102,70 +223,384 @@ class IEEEScraper:
         publisher = self.safe_find(item, By.XPATH, ".//span[contains(text(), 'Publisher')]//following-sibling::span")
         cited_by = self.safe_find(item, By.XPATH, ".//a[contains(@href, '/citations')]")
 
-        abstract = self.extract_abstract(link)
+        return [title, authors, publisher, year, "N/A", journal, f"{volume} | {issue}", cited_by], link
+
+    @staticmethod
+    def parse_results(page_source, base_url):
+        # One parse of the results page replaces ~8 WebDriver lookups per item.
+        def text(tag):
+            return " ".join(tag.get_text().split()) if tag else "N/A"
 
-        return [title, authors, publisher, year, abstract, journal, f"{volume} | {issue}", cited_by]
+        def containing(item, name, needle):
+            return item.find(lambda tag: tag.name == name and any(
+                needle in s for s in tag.find_all(string=True, recursive=False)))
+
+        items = []
+        for item in make_soup(page_source, RESULTS_SUBTREES).select(".List-results-items"):
+            title_tag = item.select_one("h3 a")
+            if title_tag is None:
+                items.append(None)
+                continue
+            publisher_label = containing(item, "span", "Publisher")
+            volume, issue = text(containing(item, "span", "Volume")), text(containing(item, "a", "Issue"))
+            items.append(([
+                text(title_tag),
+                text(item.select_one(".author")),
+                text(publisher_label.find_next_sibling("span") if publisher_label else None),
+                text(containing(item, "span", "Year")),
+                "N/A",
+                text(item.select_one(".description a")),
+                f"{volume} | {issue}",
+                text(item.select_one("a[href*='/citations']")),
+            ], urljoin(base_url, title_tag.get("href", ""))))
+        return items
+
+    def read_results(self, results):
+        page_source, url = self.driver.page_source, self.driver.current_url
+        with metrics.timed("IEEE", "parse"):
+            items = self.parse_results(page_source, url)
+        if len(items) == len(results):
+            return items
+        logger.warning(f"⚠️ Parsed {len(items)} of {len(results)} results, reading them element by element")
+        items = []
+        for item in results:
+            try:
+                items.append(self.extract_item_fields(item))
+            except Exception as e:
+                logger.warning(f"❌ Failed to read result item: {e}")
+                items.append(None)
+        return items
+
+    def fetch_abstracts_in_page(self, links):
+        # The document pages are same-origin, so the results tab fetches them itself, at most
+        # per_host at a time, each after taking a slot from the host's rate.
+        abstracts = []
+        for start in range(0, len(links), self.details.per_host):
+            chunk = links[start:start + self.details.per_host]
+            rate = rate_control.for_url(chunk[0])
+            for _ in chunk:
+                rate.acquire()
+            try:
+                with metrics.timed("IEEE", "detail_load"):
+                    responses = self.driver.execute_async_script(IN_PAGE_ABSTRACTS, chunk)
+            except Exception as e:
+                logger.warning(f"⚠️ In-page abstract fetch failed: {e}")
+                responses = None
+            if not isinstance(responses, list) or len(responses) != len(chunk):
+                abstracts += [None] * len(chunk)
+                continue
+            for status, abstract, head in responses:
+                # Status 0 is a fetch that never got a response.
+                if status:
+                    rate.report(rate_control.classify(status, head))
+                abstracts.append(abstract)
+        return abstracts
 
     def extract_results(self, limit):
-        scraped_count = 0
         try:
-            results = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, "List-results-items")))
-            for item in results:
-                if scraped_count >= limit or IEEEScraper.stop_scraping:
-                    return scraped_count
-                try:
-                    data = self.extract_item_data(item)
-                    self.save_data_to_csv(data)
-                    scraped_count += 1
-                    print(f"✅ Scraped item {scraped_count}")
-                except Exception as e:
-                    logger.warning(f"❌ Failed on item {scraped_count + 1}: {e}")
-        except:
+            with metrics.timed("IEEE", "wait"):
+                results = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, "List-results-items")))
+        except TimeoutException as e:
+            if self.results_ended() or NO_RESULTS in self.driver.page_source:
+                logger.warning("⚠️ No results found on this page.")
+                return None
+            raise PageFetchError(self.current_page, e) from e
+
+        if self.fetch_mode == "http":
+            fetch_abstracts = lambda rows, links: self.details.run(links)
+        else:
+            fetch_abstracts = lambda rows, links: self.fetch_abstracts_in_page(links)
+        # Anything the bulk pass couldn't read still gets the browser tab treatment.
+        return self.result_records(self.read_results(results), limit, fetch_abstracts, self.extract_abstracts)
+
+    def result_records(self, items, limit, fetch_abstracts, fallback=None):
+        indexes, rows, links = [], [], []
+        last_seen = None
+        for index, item in enumerate(items):
+            if len(rows) >= limit:
+                break
+            if index < self.skip_items() or item is None:
+                continue
+            data, link = item
+            if self.already_seen(link, data[0]):
+                last_seen = index
+                continue
+            indexes.append(index)
+            rows.append(data)
+            links.append(link)
+
+        abstracts = list(fetch_abstracts(rows, links))
+        missing = [i for i, abstract in enumerate(abstracts) if not abstract]
+        if fallback and missing:
+            for i, abstract in zip(missing, fallback([links[i] for i in missing])):
+                abstracts[i] = abstract
+        for index, data, link, abstract in zip(indexes, rows, links, abstracts):
+            if IEEEScraper.stop_scraping:
+                break
+            data[4] = abstract or "N/A"
+            yield self.to_record(data, link)
+            self.item_done(index)
+        else:
+            # Seen items are covered by the next record's item_done; any after the last record are marked
+            # here, once every record before them has been taken.
+            if last_seen is not None and (not indexes or last_seen > indexes[-1]):
+                self.item_done(last_seen)
+
+    @staticmethod
+    def search_payload(query, page, rows_per_page):
+        return {
+            "action": "search",
+            "matchBoolean": True,
+            "queryText": query_text(query),
+            "ranges": ["2000_2022_Year"],
+            "highlight": False,
+            "returnFacets": ["ALL"],
+            "returnType": "SEARCH",
+            "matchPubs": True,
+            "refinements": ["ContentType:Journals"],
+            "rowsPerPage": rows_per_page,
+            "pageNumber": page,
+        }
+
+    @staticmethod
+    def record_to_row(record, base_url):
+        # Same 8 columns, and the same "Year: ..." style labels, as a row read from the results page.
+        def clean(value):
+            return " ".join(html.unescape(MARKUP.sub("", str(value))).split()) if value not in (None, "") else "N/A"
+
+        def labelled(label, value):
+            return f"{label}: {clean(value)}" if value not in (None, "") else "N/A"
+
+        authors = "; ".join(clean(a.get("preferredName") or a.get("normalizedName"))
+                            for a in record.get("authors") or [])
+        cited = record.get("citationCount")
+        link = record.get("documentLink") or f"/document/{record.get('articleNumber')}/"
+        return [
+            clean(record.get("articleTitle")),
+            authors or "N/A",
+            clean(record.get("publisher")),
+            labelled("Year", record.get("publicationYear")),
+            clean(record.get("abstract")),
+            clean(record.get("publicationTitle")),
+            f"{labelled('Volume', record.get('volume'))} | {labelled('Issue', record.get('issue'))}",
+            f"Cited by: Papers ({cited})" if cited else "N/A",
+        ], urljoin(base_url, link)
+
+    def api_abstracts(self, rows, links):
+        # Search records usually carry the abstract; only the gaps cost a document page fetch.
+        missing = [i for i, row in enumerate(rows) if row[4] == "N/A"]
+        abstracts = [row[4] for row in rows]
+        for i, abstract in zip(missing, self.details.run([links[i] for i in missing])):
+            abstracts[i] = abstract
+        return abstracts
+
+    def search_api(self, query, page, limit):
+        site = urljoin(self.api_url, "/")
+        with metrics.timed("IEEE", "search_load"):
+            return self.http.post_json(self.api_url, self.search_payload(query, page, limit),
+                                       headers={"Origin": site.rstrip("/"),
+                                                "Referer": urljoin(site, "search/searchresult.jsp")})
+
+    def extract_api_results(self, query, limit):
+        response = self._prefetched.pop(self.current_page, None)
+        if response is None:
+            try:
+                response = self.search_api(query, self.current_page, limit)
+            except Exception as e:
+                logger.warning(f"⚠️ IEEE search API failed on page {self.current_page}: {e}")
+                raise PageFetchError(self.current_page, e) from e
+        if self.total_hits is None:
+            self.total_hits = parse_hit_count(response.get("totalRecords"))
+        records = response.get("records") or []
+        if not records:
+            if not self.results_ended():
+                raise PageFetchError(self.current_page, ValueError(f"no records, {self.total_hits} hits reported"))
             logger.warning("⚠️ No results found on this page.")
             return None
-        return scraped_count
+        self.prefetch_api_pages(query, limit)
+        with metrics.timed("IEEE", "parse"):
+            rows = [self.record_to_row(record, urljoin(self.api_url, "/")) for record in records]
+        return self.result_records(rows, limit, self.api_abstracts)
+
+    def prefetch_api_pages(self, query, limit):
+        # Once the page set is known, the next few pages are requested together while this one is saved.
+        if self._prefetched or self.total_hits is None:
+            return
+        end = min(last_page(self.total_hits, limit), self.current_page + self.details.concurrency)
+        pages = range(self.current_page + 1, end + 1)
+        for page, response in zip(pages, fetch_pages(partial(self.search_api, query, limit=limit), pages,
+                                                     self.details.concurrency, publisher="IEEE")):
+            if not isinstance(response, PageFetchError):
+                self._prefetched[page] = response
+
+    def ui_page_url(self, query, page):
+        if isinstance(query, str):
+            encoded_query = self.encode_spaces(query)
+            query_param = f"(%22All%20Metadata%22:{encoded_query})%20AND%20(%22Publication%20Title%22:{encoded_query})"
+        else:
+            query_param = quote(query_text(query), safe=":()")
+        # url = f"https://ieeexplore.ieee.org/search/searchresult.jsp?contentType=periodicals&queryText={encoded_query}&highlight=true&returnType=SEARCH&matchPubs=true&rowsPerPage={self.items_per_page}&returnFacets=ALL&ranges=2001_2020_Year&refinements=ContentType:Journals&pageNumber={current_page}"
+        url = (
+            f"https://ieeexplore.ieee.org/search/searchresult.jsp?"
+            f"action=search&matchBoolean=true&"
+            f"queryText={query_param}&"
+            f"ranges=2000_2022_Year&highlight=true&returnFacets=ALL&returnType=SEARCH&"
+            f"matchPubs=true&refinements=ContentType:Journals&"
+            f"rowsPerPage={self.items_per_page}&pageNumber={page}"
+        )
+        return url
+
+    def scrape_ui_page(self, query):
+        url = self.ui_page_url(query, self.current_page)
+        print(f"\n🔍 Query: {self.query_label(query)} — Page {self.current_page} — {url}")
+        tab, self._next_results_tab = self._next_results_tab, None
+        if tab is not None and tab.url == url:
+            self.open_prefetched_site(tab)
+        else:
+            if tab is not None:
+                self.tab_pipeline.close(tab)
+                self.driver.switch_to.window(self.original_window)
+            self.open_site(url)
+        if self.total_hits is None:
+            header = make_soup(self.driver.page_source, DASHBOARD_SUBTREES).select_one(".Dashboard-header")
+            self.total_hits = parse_hit_count(header.get_text(" ") if header else None, RESULT_COUNT)
+        self.prefetch_results_page(query)
+        return self.extract_results(self.items_per_page)
+
+    def prefetch_results_page(self, query):
+        # The next results page renders in a background tab while this page's abstracts are read.
+        final_page = last_page(self.total_hits, self.items_per_page)
+        if self.tab_pipeline is None or final_page is None or self.current_page >= final_page:
+            return
+        try:
+            self._next_results_tab = self.tab_pipeline.open(self.ui_page_url(query, self.current_page + 1))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not prefetch page {self.current_page + 1}: {e}")
+        self.driver.switch_to.window(self.original_window)
+
+    def open_prefetched_site(self, tab):
+        # The prefetched tab becomes the results window; the previous one is closed.
+        self.driver.switch_to.window(self.original_window)
+        self.driver.close()
+        self.driver.switch_to.window(tab.handle)
+        metrics.observe("IEEE", "search_load", time.monotonic() - tab.opened)
+        wait_until(self.driver, "ieee.results", RESULTS_READY, timeout=5)
+        self.original_window = tab.handle
+
+    def discard_prefetched_results(self):
+        tab, self._next_results_tab = self._next_results_tab, None
+        if tab is not None:
+            self.tab_pipeline.close(tab)
+            self.driver.switch_to.window(self.original_window)
+
+    def results_ended(self) -> bool:
+        # An empty page only ends the query once the hit count says nothing is left; otherwise the
+        # page failed to load, and the query must not be checkpointed as done.
+        final_page = last_page(self.total_hits, self.items_per_page)
+        return final_page is not None and self.current_page > final_page
+
+    def skip_items(self):
+        return self.checkpoint.skip_items(self.current_page) if self.checkpoint else 0
+
+    def item_done(self, index):
+        if self.checkpoint:
+            self.checkpoint.item_done(self.current_page, index + 1)
 
     def encode_spaces(self, text: str) -> str:
         return text.replace(" ", "%20")
 
     def scrape(self):
-        for query in self.queries:
+        scraped_count = 0
+        try:
+            for _ in pipeline.compose(self.iter_records(), pipeline.write_to(self.sink, self.seen_index)):
+                scraped_count += 1
+                print(f"✅ Scraped item {scraped_count}")
+        finally:
+            self.close()
+        logger.info("✅ Done scraping all queries.")
+
+    def search_queries(self) -> list:
+        if self.batch_size <= 1:
+            return list(self.queries)
+        return [tuple(batch) for batch in batch_queries(self.queries, self.batch_size)]
+
+    @staticmethod
+    def query_label(query) -> str:
+        return query if isinstance(query, str) else BATCH_SEPARATOR.join(query)
+
+    def split_batch(self, records, titles):
+        # Keeps the records of a batched search that belong to one of its journals, counted per journal.
+        counts = dict.fromkeys(titles, 0)
+        unmatched = 0
+        for record in records:
+            title = source_journal(record.journal, titles)
+            if title is None:
+                unmatched += 1
+                logger.debug(f"Dropping '{record.title}' from '{record.journal}', not in the batch")
+                continue
+            counts[title] += 1
+            yield record
+        if unmatched:
+            metrics.increment("IEEE", "unmatched", amount=unmatched)
+        logger.info(f"📚 Page {self.current_page} by journal: {', '.join(f'{t} {n}' for t, n in counts.items())}"
+                    f"{f', {unmatched} from other publications dropped' if unmatched else ''}")
+
+    def iter_records(self):
+        for query in self.search_queries():
             if IEEEScraper.stop_scraping:
                 logger.info("🛑 Scraping manually stopped by user.")
                 break
 
-            encoded_query = self.encode_spaces(query)
-            logger.info(f"\n🔍 Query: {query}")
-            current_page = 1
+            label = self.query_label(query)
+            logger.info(f"\n🔍 Query: {label}")
+            self.checkpoint = self.checkpoints.for_query("IEEE", label, self.sink) if self.checkpoints else None
+            if self.checkpoint and self.checkpoint.done:
+                logger.info(f"⏭️ Query '{label}' already completed")
+                continue
+            self.current_page = self.checkpoint.next_page if self.checkpoint else 1
+            self.total_hits = None
+            self._prefetched = {}
             scraped_count = 0
 
-            while scraped_count < self.total_items_to_scrape:
-                if IEEEScraper.stop_scraping:
-                    logger.info("🛑 Scraping manually stopped by user.")
-                    break
-
-                # url = f"https://ieeexplore.ieee.org/search/searchresult.jsp?contentType=periodicals&queryText={encoded_query}&highlight=true&returnType=SEARCH&matchPubs=true&rowsPerPage={self.items_per_page}&returnFacets=ALL&ranges=2001_2020_Year&refinements=ContentType:Journals&pageNumber={current_page}"
-                url = (
-                    f"https://ieeexplore.ieee.org/search/searchresult.jsp?"
-                    f"action=search&matchBoolean=true&"
-                    f"queryText=(%22All%20Metadata%22:{encoded_query})%20AND%20(%22Publication%20Title%22:{encoded_query})&"
-                    f"ranges=2000_2022_Year&highlight=true&returnFacets=ALL&returnType=SEARCH&"
-                    f"matchPubs=true&refinements=ContentType:Journals"
-                )
-
-                print(f"\n🔍 Query: {query} — Page {current_page} — {url}")
-                self.open_site(url)
-                scraped_now = self.extract_results(self.items_per_page)
-
-                if scraped_now is None:
-                    logger.warning("⚠️ No results found, moving to next query.")
-                    break
-
-                scraped_count += scraped_now
-                current_page += 1
-                time.sleep(5)
-        self.close()
-        logger.info("✅ Done scraping all queries.")
+            try:
+                while scraped_count < self.total_items_to_scrape:
+                    if IEEEScraper.stop_scraping:
+                        logger.info("🛑 Scraping manually stopped by user.")
+                        break
+
+                    if self.backend == "api":
+                        print(f"\n🔍 Query: {label} — Page {self.current_page} — {self.api_url}")
+                        records = self.extract_api_results(query, self.items_per_page)
+                    else:
+                        records = self.scrape_ui_page(query)
+
+                    # An empty page ends the query; a failed one raised PageFetchError, so the checkpoint
+                    # is left unfinished and --resume starts again from it.
+                    if records is None:
+                        logger.warning("⚠️ No results found, moving to next query.")
+                        break
+                    if not isinstance(query, str):
+                        records = self.split_batch(records, query)
+                    for record in records:
+                        scraped_count += 1
+                        yield record
+
+                    if self.checkpoint and not IEEEScraper.stop_scraping:
+                        self.checkpoint.page_done(self.current_page)
+                    final_page = last_page(self.total_hits, self.items_per_page)
+                    if final_page is not None and self.current_page >= final_page:
+                        logger.info(f"📄 Reached last page {final_page} of {self.total_hits} hits for '{label}'")
+                        break
+                    self.current_page += 1
+            finally:
+                self.discard_prefetched_results()
+            if self.checkpoint and not IEEEScraper.stop_scraping:
+                self.checkpoint.finish()
 
     def close(self):
-        self.driver.quit()
+        if self._sink:
+            self._sink.flush()
+        if self.http:
+            self.http.close()
+        if self._owns_driver:
+            self.driver.quit()
@@ -0,0 +1,111 @@
+import csv
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from journal_collectors.output_sink import OUTPUT_DIR, SCRAPED_DATA_CSV
+
+logger = logging.getLogger(__name__)
+
+SEEN_INDEX_DB = os.path.join(OUTPUT_DIR, "seen_articles.sqlite3")
+BOOTSTRAP_FILES = [SCRAPED_DATA_CSV, os.path.join(OUTPUT_DIR, "articles.csv")]
+
+DOI_PATTERN = re.compile(r"10\.\d{4,9}/[^\s?#]+")
+# Short titles ("Editorial", "Guest Editorial", ...) repeat across articles, so they never count as seen.
+MIN_TITLE_KEY_LENGTH = 20
+
+
+def canonical_key(url: str) -> str:
+    if not url:
+        return None
+    doi = DOI_PATTERN.search(url)
+    if doi:
+        return f"doi:{doi.group(0).rstrip('/').lower()}"
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().removeprefix("www.")
+    return f"url:{host}{parsed.path.rstrip('/')}"
+
+
+def title_key(title: str) -> str:
+    if not title:
+        return None
+    normalized = " ".join(re.sub(r"[^0-9a-z]+", " ", title.lower()).split())
+    if len(normalized) < MIN_TITLE_KEY_LENGTH:
+        return None
+    return f"title:{normalized}"
+
+
+class SeenIndex:
+    def __init__(self, path: str = SEEN_INDEX_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.created = not os.path.exists(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, publisher TEXT, seen_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _keys(url=None, title=None):
+        return [key for key in (canonical_key(url), title_key(title)) if key]
+
+    def seen(self, url: str = None, title: str = None) -> bool:
+        keys = self._keys(url, title)
+        if not keys:
+            return False
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            row = self._conn.execute(f"SELECT 1 FROM seen WHERE key IN ({placeholders}) LIMIT 1", keys).fetchone()
+        return row is not None
+
+    def add(self, url: str = None, title: str = None, publisher: str = None):
+        self.add_many([(url, title, publisher)])
+
+    def add_many(self, entries):
+        now = time.time()
+        rows = [(key, publisher, now) for url, title, publisher in entries for key in self._keys(url, title)]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def bootstrap_from_csv(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        before = len(self)
+        with open(path, newline="", encoding="utf-8") as f:
+            self.add_many((None, row.get("Title"), row.get("Publisher")) for row in csv.DictReader(f))
+        added = len(self) - before
+        logger.info(f"Seeded seen index with {added} titles from {path}")
+        return added
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def open_seen_index(path: str = SEEN_INDEX_DB) -> SeenIndex:
+    # Shared per process; a brand-new index is seeded from whatever output already exists.
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = SeenIndex(path)
+            if index.created:
+                for csv_path in BOOTSTRAP_FILES:
+                    index.bootstrap_from_csv(csv_path)
+        return index
@@ -1,51 +1,71 @@
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
-import os
-import csv
-from webdriver_manager.chrome import ChromeDriverManager
 import sys
 import signal
 import logging
+from urllib.parse import urljoin
+from journal_collectors import metrics, pipeline
+from journal_collectors.driver_pool import PROFILES, create_driver
+from journal_collectors.detail_fetcher import DetailFetcher
+from journal_collectors.http_fetch import HttpFetcher
+from journal_collectors.html_parser import Subtrees, make_soup
+from journal_collectors.output_sink import HEADERS, SCRAPED_DATA_CSV, get_sink
+from journal_collectors.readiness import DomStable, SelectorPresent, wait_until
+from journal_collectors.records import YEAR, Record, match, number
+from journal_collectors.tab_pipeline import TabPipeline
 
+logger = logging.getLogger(__name__)
 
-logging.basicConfig(
-    filename='debug.log',  # or use 'logs/ieee_scraper.log' in a logs folder
-    filemode='a',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+SEARCH_SUBTREES = Subtrees(("li", {"class": "app-card-open"}))
+SEARCH_READY = (SelectorPresent("li.app-card-open"), DomStable())
+DETAIL_SUBTREES = Subtrees(
+    ("div", {"data-test": "darwin-journal-homepage-promo-text"}),
+    ("dl", {}),
 )
-logger = logging.getLogger(__name__)
+DETAIL_READY = (SelectorPresent("dl > dt[data-test]"),)
+
 
 
+class SpringerScraper(pipeline.RecordSource):
+    BASE_URL = "https://link.springer.com"
 
-class SpringerScraper:
-    def __init__(self, queries):
+    def __init__(self, queries, driver=None, fetch_mode="browser", detail_concurrency=8, sink=None, seen_index=None,
+                 checkpoints=None, tabs=1):
         self.queries = queries
-        self.driver = self._setup_driver()
+        self.checkpoints = checkpoints
+        self.seen_index = seen_index
+        self._sink = sink
+        self._owns_driver = driver is None
+        self.driver = driver or self._setup_driver()
+        # "http" fetches the (server-rendered) detail pages concurrently without opening tabs
+        self.fetch_mode = fetch_mode
+        self.http = HttpFetcher(pool_size=detail_concurrency) if fetch_mode == "http" else None
+        self.details = DetailFetcher(self._fetch_detail_http, self._parse_detail_timed,
+                                     concurrency=detail_concurrency, per_host=detail_concurrency, publisher="SPRINGER")
+        # With tabs > 1, browser detail pages load `tabs` at a time and are parsed as each one is ready.
+        self.tab_pipeline = TabPipeline(self.driver, DETAIL_READY, tabs=tabs, timeout=10, publisher="SPRINGER",
+                                        label="springer.detail") if tabs > 1 else None
+
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = get_sink(SCRAPED_DATA_CSV, HEADERS)
+        return self._sink
 
     def _setup_driver(self):
-        options = webdriver.ChromeOptions()
-        options.add_argument("--blink-settings=imagesEnabled=false")
-        options.add_argument('--headless=new')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-
-        # ✅ Auto-manage chromedriver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        return driver
+        # ✅ Auto-manage chromedriver (resolved once per process by the pool module)
+        return create_driver(PROFILES["SPRINGER"])
 
     def _get_search_results(self, search_query):
         formatted_query = search_query.replace(' ', '+')
         url = f'https://link.springer.com/search?new-search=true&query={formatted_query}&content-type=journal&dateFrom=&dateTo=&sortBy=relevance'
-        self.driver.get(url)
-        time.sleep(3)
+        with metrics.timed("SPRINGER", "search_load"):
+            self.driver.get(url)
+        wait_until(self.driver, "springer.search", SEARCH_READY, timeout=3)
 
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-        return soup.find_all('li', class_='app-card-open')
+        page_source = self.driver.page_source
+        with metrics.timed("SPRINGER", "parse"):
+            soup = make_soup(page_source, SEARCH_SUBTREES)
+            return soup.find_all('li', class_='app-card-open')
 
     def _extract_details_from_item(self, item):
         title_tag = item.find('h3', class_='app-card-open__heading')
@@ -58,12 +78,53 @@ class SpringerScraper:
         published = published.get_text(strip=True) if published else 'N/A'
         return title, detail_link, content_type, published
 
+    def _already_seen(self, detail_link, title):
+        if self.seen_index and self.seen_index.seen(url=urljoin(self.BASE_URL, detail_link), title=title):
+            logger.info(f"⏭️ Already scraped: {detail_link}")
+            return True
+        return False
+
     def _get_detail_page_info(self, detail_link):
         self.driver.execute_script("window.open('');")
         self.driver.switch_to.window(self.driver.window_handles[1])
-        self.driver.get(detail_link)
-
-        detail_soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        with metrics.timed("SPRINGER", "detail_load"):
+            self.driver.get(detail_link)
+        page_source = self.driver.page_source
+        self.driver.close()
+        self.driver.switch_to.window(self.driver.window_handles[0])
+        return self._parse_detail_timed(page_source)
+
+    def _fetch_detail_http(self, detail_link):
+        with metrics.timed("SPRINGER", "detail_load"):
+            return self.http.get(urljoin(self.BASE_URL, detail_link))
+
+    def _parse_detail_timed(self, page_source):
+        with metrics.timed("SPRINGER", "parse"):
+            return self.parse_detail_page(page_source)
+
+    def _read_detail_tab(self, driver):
+        return self._parse_detail_timed(driver.page_source)
+
+    def _get_detail_pages_in_browser(self, detail_links):
+        if self.tab_pipeline is None:
+            return [self._get_detail_page_info(link) for link in detail_links]
+        details = self.tab_pipeline.map([urljoin(self.BASE_URL, link) for link in detail_links], self._read_detail_tab)
+        return [info or self._get_detail_page_info(link) for link, info in zip(detail_links, details)]
+
+    def _get_detail_pages(self, detail_links):
+        if self.fetch_mode != "http":
+            return self._get_detail_pages_in_browser(detail_links)
+        details = self.details.run(detail_links)
+        missing = [i for i, info in enumerate(details) if info is None]
+        if missing:
+            metrics.increment("SPRINGER", "retries", "detail_load", len(missing))
+            for i, info in zip(missing, self._get_detail_pages_in_browser([detail_links[i] for i in missing])):
+                details[i] = info
+        return details
+
+    @staticmethod
+    def parse_detail_page(page_source):
+        detail_soup = make_soup(page_source, DETAIL_SUBTREES)
 
         overview = detail_soup.find('div', {'data-test': 'darwin-journal-homepage-promo-text'})
         overview_text = overview.get_text(strip=True, separator=' ') if overview else 'N/A'
@@ -71,61 +132,75 @@ class SpringerScraper:
         editor = detail_soup.find('dl', {'data-test': 'journal-editor-links'})
         editor_name = editor.find('li').get_text(strip=True) if editor else 'N/A'
 
-        metrics = {}
+        journal_metrics = {}
         metric_labels = detail_soup.select('dl > dt[data-test]')
         for label in metric_labels:
             key = label.get_text(strip=True)
             value_tag = label.find_next_sibling('dd')
-            metrics[key] = value_tag.get_text(strip=True) if value_tag else 'N/A'
-
-        return overview_text, editor_name, metrics
+            journal_metrics[key] = value_tag.get_text(strip=True) if value_tag else 'N/A'
+
+        return overview_text, editor_name, journal_metrics
+
+    def iter_records(self):
+        for search_query in self.queries:
+            logger.info(f"\n🔍 Searching for: {search_query}")
+            checkpoint = self.checkpoints.for_query("SPRINGER", search_query, self.sink) if self.checkpoints else None
+            if checkpoint and checkpoint.done:
+                logger.info(f"⏭️ Query '{search_query}' already completed")
+                continue
+            skip = checkpoint.skip_items(1) if checkpoint else 0
+
+            results = self._get_search_results(search_query)
+            items = [(index, *self._extract_details_from_item(item))
+                     for index, item in enumerate(results) if index >= skip]
+            items = [item for item in items if not self._already_seen(item[2], item[1])]
+            detail_pages = self._get_detail_pages([item[2] for item in items])
+
+            for (index, title, detail_link, content_type, published), detail_info in zip(items, detail_pages):
+                overview_text, editor_name, journal_metrics = detail_info
+
+                yield Record(
+                    title=title,
+                    authors=editor_name,  # You can parse actual authors if needed
+                    publisher='SPRINGER',  # Assuming editor is considered publisher
+                    year=number(match(YEAR, published)),
+                    abstract=overview_text,
+                    journal=content_type,
+                    url=urljoin(self.BASE_URL, detail_link),
+                    source="SPRINGER",
+                )
+                if checkpoint:
+                    checkpoint.item_done(1, index + 1)
+
+            if checkpoint:
+                checkpoint.page_done(1)
+                checkpoint.finish()
 
     def scrape(self):
-        output_file = "/home/darkside/PycharmProjects/journal-collectors/output/scraped_data.csv"
-        file_exists = os.path.isfile(output_file)
-
+        # Errors are logged and re-raised, so the scheduler and the job queue see the query fail.
         try:
-            with open(output_file, mode='a', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ["Title", "Authors", "Publisher", "Year", "Abstract", "Journal", "Volume/Issue", "Cited By"]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                if not file_exists:
-                    writer.writeheader()
-
-                for search_query in self.queries:
-                    logger.info(f"\n🔍 Searching for: {search_query}")
-                    results = self._get_search_results(search_query)
-
-                    for item in results:
-                        title, detail_link, content_type, published = self._extract_details_from_item(item)
-                        overview_text, editor_name, metrics = self._get_detail_page_info(detail_link)
-
-                        writer.writerow({
-                            "Title": title,
-                            "Authors": editor_name,  # You can parse actual authors if needed
-                            "Publisher": 'SPRINGER',  # Assuming editor is considered publisher
-                            "Year": f"Year:{published}",
-                            "Abstract": overview_text,
-                            "Journal": content_type,
-                            "Volume/Issue": "N/A",  # Placeholder, you can extract if available
-                            "Cited By": "N/A"  # Placeholder, you can extract if available
-                        })
-
-                        self.driver.close()
-                        self.driver.switch_to.window(self.driver.window_handles[0])
+            pipeline.drain(pipeline.compose(self.iter_records(), pipeline.write_to(self.sink, self.seen_index)))
+            self.sink.flush()
 
         except PermissionError as e:
             logger.error(f"PermissionError: {e}. Please close the file if it's open in another program.")
+            raise
         except ConnectionResetError as e:
             logger.error(f"ConnectionResetError: {e}. The connection was forcibly closed by the remote host.")
+            raise
         except KeyboardInterrupt:
             logger.info("\nProcess interrupted by the user. Exiting gracefully...")
             self.cleanup()
             sys.exit(0)
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
+            raise
 
     def cleanup(self):
+        if self.http:
+            self.http.close()
+        if not self._owns_driver:
+            return
         try:
             self.driver.quit()
         except Exception as e:
@@ -0,0 +1,126 @@
+import logging
+import time
+from collections import deque
+
+from selenium.common.exceptions import WebDriverException
+
+from journal_collectors import metrics, rate_control
+from journal_collectors.readiness import record_wait
+
+logger = logging.getLogger(__name__)
+
+
+def page_source(driver):
+    return driver.page_source
+
+
+class Tab:
+    # A page loading in a background tab of the pipeline's driver.
+    def __init__(self, handle: str, url: str, checks: list):
+        self.handle = handle
+        self.url = url
+        self.checks = checks
+        self.opened = time.monotonic()
+
+
+class TabPipeline:
+    """Keeps up to `tabs` pages loading at once in one browser, and reads each as soon as it is ready.
+
+    Chrome loads background tabs in parallel, so while one page is read (and parsed by the caller)
+    the others keep loading. `ready` holds readiness conditions, checked once per poll on each open
+    tab; a tab still not ready after `timeout` seconds is read anyway, like wait_until does.
+    """
+
+    def __init__(self, driver, ready=(), tabs: int = 4, timeout: float = 10, publisher: str = None,
+                 label: str = "tab", poll: float = 0.1):
+        self.driver = driver
+        self.ready = ready
+        self.tabs = max(1, tabs)
+        self.timeout = timeout
+        self.publisher = publisher
+        self.label = label
+        self.poll = poll
+
+    def open(self, url: str) -> Tab:
+        # Opened with window.open so the driver returns at once instead of waiting for the load.
+        rate_control.for_url(url).acquire()
+        before = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        handle = next(h for h in self.driver.window_handles if h not in before)
+        self.driver.switch_to.window(handle)
+        return Tab(handle, url, [condition.start(self.driver) for condition in self.ready])
+
+    def _is_ready(self, tab: Tab) -> bool:
+        if getattr(self.driver, "is_static", False):
+            return True
+        try:
+            tab.checks = [check for check in tab.checks if not check()]
+        except WebDriverException as e:
+            logger.debug(f"Readiness check on {tab.url} failed: {e}")
+        return not tab.checks
+
+    def close(self, tab: Tab):
+        try:
+            self.driver.switch_to.window(tab.handle)
+            self.driver.close()
+        except WebDriverException as e:
+            logger.debug(f"Closing tab for {tab.url} failed: {e}")
+
+    def harvest(self, tab: Tab, read=page_source, ready: bool = True):
+        """Read `tab` with `read(driver)` and close it; the caller switches back to its own window."""
+        elapsed = time.monotonic() - tab.opened
+        record_wait(self.label, elapsed, self.timeout, ready)
+        metrics.observe(self.publisher, "detail_load", elapsed)
+        try:
+            self.driver.switch_to.window(tab.handle)
+            if not getattr(self.driver, "is_static", False):
+                rate_control.check_page(self.driver, rate_control.for_url(tab.url))
+            return read(self.driver)
+        finally:
+            self.close(tab)
+
+    def _ready_tab(self, loading: list):
+        # The first open tab that is ready (or out of time), checked oldest first.
+        for entry in loading:
+            tab = entry[1]
+            self.driver.switch_to.window(tab.handle)
+            if self._is_ready(tab):
+                return entry, True
+            if time.monotonic() - tab.opened >= self.timeout:
+                return entry, False
+        return None, False
+
+    def map(self, urls, read=page_source) -> list:
+        """`read(driver)` on every url's page; results keep the order of `urls`, with None for failures."""
+        urls = list(urls)
+        results = [None] * len(urls)
+        if not urls:
+            return results
+        home = self.driver.current_window_handle
+        waiting = deque(enumerate(urls))
+        loading = []
+        try:
+            while waiting or loading:
+                while waiting and len(loading) < self.tabs:
+                    index, url = waiting.popleft()
+                    try:
+                        loading.append((index, self.open(url)))
+                    except WebDriverException as e:
+                        logger.warning(f"⚠️ Could not open a tab for {url}: {e}")
+                        metrics.increment(self.publisher, "failures", "detail_load")
+                entry, ready = self._ready_tab(loading)
+                if entry is None:
+                    time.sleep(self.poll)
+                    continue
+                loading.remove(entry)
+                index, tab = entry
+                try:
+                    results[index] = self.harvest(tab, read, ready)
+                except WebDriverException as e:
+                    logger.warning(f"⚠️ Reading tab for {tab.url} failed: {e}")
+                    metrics.increment(self.publisher, "failures", "detail_load")
+        finally:
+            for _, tab in loading:
+                self.close(tab)
+            self.driver.switch_to.window(home)
+        return results
@@ -1,45 +1,366 @@
-import pandas as pd
-from journal_collectors.scrap_ieee import IEEEScraper
-from journal_collectors.springer_scrap import SpringerScraper
-from journal_collectors.acm_scrap import AcmScraper
+import argparse
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import partial
+# Publisher modules (selenium, undetected_chromedriver, ...) are imported by process_query only
+# when a row needs them, so startup and --dry-run stay fast.
+from journal_collectors import html_parser, job_queue, metrics, output_sink, page_cache, profiling, rate_control
+from journal_collectors.driver_pool import DriverPool
+from journal_collectors.readiness import print_wait_summary
+from journal_collectors.reference_store import REFERENCE_DB, open_reference_store
+from journal_collectors.resource_blocking import print_resource_summary
+from journal_collectors.checkpoint import CHECKPOINT_DIR, CheckpointStore
+from journal_collectors.log_config import configure_logging
+from journal_collectors.query_file import read_queries
+from journal_collectors.seen_index import SEEN_INDEX_DB, open_seen_index
+from journal_collectors.scheduler import (
+    PUBLISHER_HOSTS, Job, Scheduler, print_summary, publisher_key, queue_limits, run_queue_workers,
+)
+
+logger = logging.getLogger(__name__)
 
 QUERY_FILE = "/home/darkside/PycharmProjects/journal-collectors/input.csv"
-SUPPORTED_PUBLISHERS = ["SPRINGER", "IEEE", "ASSOC"]
+SUPPORTED_PUBLISHERS = ["SPRINGER", "IEEE", "ASSOC", "ELSEVIER"]
+
 
+def load_queries(file_path: str, rows: str = "4:20"):
+    start, _, stop = rows.partition(":")
+    return read_queries(file_path, int(start or 0), int(stop) if stop else None)
 
-def load_queries(file_path: str) -> pd.DataFrame:
-    return pd.read_csv(file_path, skiprows=1)
 
+def process_query(row, pool: DriverPool, options=None):
+    options = options or parse_args([])
+    if options.profile:
+        with profiling.profile(f"{row[4]} {row[1]}", options.profile_dir, top=options.profile_top):
+            return _process_query(row, pool, options)
+    return _process_query(row, pool, options)
 
-def process_query(row):
-    journal_name = row[0] if not pd.isna(row[0]) else "Unknown Journal"
+
+def _process_query(row, pool: DriverPool, options):
+    page_cache.configure(options.page_cache, options.page_cache_dir,
+                         ttl=options.page_cache_ttl_days * 24 * 3600,
+                         max_bytes=options.page_cache_max_mb * 1024 * 1024)
+    html_parser.set_backend(options.parser)
+    rate_control.configure(not options.no_rate_control, options.rate_state)
+    output_sink.configure(options.output_format, options.parquet_dir)
+    journal_name = row[0] or "Unknown Journal"
     query = row[1]
     publisher = str(row[4]).strip().upper()
+    seen_index = None if options.rescrape else open_seen_index(options.seen_index)
+    checkpoints = CheckpointStore(options.checkpoint_dir, resume=options.resume)
 
     if "SPRINGER" in publisher:
         print(f"\n🔍 Springer Query: {query}")
-        scraper = SpringerScraper([query])
-        scraper.scrape()
-        scraper.cleanup()
+        from journal_collectors.springer_scrap import SpringerScraper
+        with pool.borrow("SPRINGER") as driver:
+            scraper = SpringerScraper([query], driver=driver, fetch_mode=options.fetch_mode,
+                                      detail_concurrency=options.detail_concurrency, seen_index=seen_index,
+                                      checkpoints=checkpoints, tabs=options.tabs)
+            try:
+                scraper.scrape()
+            finally:
+                scraper.cleanup()
 
     elif "IEEE" in publisher:
         print(f"\n🔍 IEEE Query: {query}")
-        scraper = IEEEScraper(queries=[query])
-        scraper.scrape()
+        from journal_collectors.scrap_ieee import BATCH_SEPARATOR, SEARCH_API_URL, IEEEScraper
+        # A row from batch_ieee_rows carries several journal titles, searched together.
+        queries = query.split(BATCH_SEPARATOR)
+        if options.ieee_backend == "api":
+            scraper = IEEEScraper(queries=queries, items_per_page=options.ieee_api_rows, fetch_mode="http",
+                                  detail_concurrency=options.detail_concurrency, seen_index=seen_index,
+                                  checkpoints=checkpoints, backend="api",
+                                  api_url=options.ieee_api_url or SEARCH_API_URL, batch_size=len(queries))
+            scraper.scrape()
+        else:
+            with pool.borrow("IEEE") as driver:
+                scraper = IEEEScraper(queries=queries, driver=driver, fetch_mode=options.fetch_mode,
+                                      detail_concurrency=options.detail_concurrency, seen_index=seen_index,
+                                      checkpoints=checkpoints, tabs=options.tabs, batch_size=len(queries))
+                scraper.scrape()
 
     elif "ASSOC" in publisher:
         print(f"\n🔍 ACM Query: {query}")
-        scraper = AcmScraper(queries=[query])
-        scraper.scrape()
-        scraper.cleanup()
+        from journal_collectors.acm_scrap import AcmScraper
+        with pool.borrow("ACM") as driver:
+            scraper = AcmScraper(queries=[query], driver=driver, fetch_mode=options.fetch_mode,
+                                 detail_concurrency=options.detail_concurrency, seen_index=seen_index,
+                                 checkpoints=checkpoints)
+            try:
+                scraper.scrape()
+            finally:
+                scraper.cleanup()
+
+    elif "ELSEVIER" in publisher and options.elsevier:
+        print(f"\n🔍 Elsevier Query: {query}")
+        from journal_collectors.elsevier_scrap import ScienceDirectScraper
+        with pool.borrow("ELSEVIER") as driver:
+            # Every extra pooled browser can work on one article page while the search driver is busy.
+            scraper = ScienceDirectScraper(journal=query, start_year=2000, end_year=2020, show=100, driver=driver,
+                                           detail_pool=pool, detail_concurrency=options.browsers_per_publisher - 1,
+                                           seen_index=seen_index, checkpoints=checkpoints,
+                                           reference_store=open_reference_store(options.reference_store))
+            scraper.run()
     else:
         print(f"⏭️ Skipping {journal_name} - Publisher '{publisher}' not supported")
 
 
-def main():
-    df= pd.read_csv(QUERY_FILE)
-    for _, row in df[4:20].iterrows():
-        process_query(row)
+def batch_ieee_rows(rows, size: int) -> list:
+    """Merge IEEE rows into one row per batch of journals, placed where the batch's first journal was."""
+    ieee = [row for row in rows if publisher_key(row[4]) == "IEEE"]
+    if size <= 1 or len(ieee) < 2:
+        return rows
+    from journal_collectors.scrap_ieee import BATCH_SEPARATOR, batch_queries
+    merged, start = {}, 0
+    for titles in batch_queries([row[1] for row in ieee], size):
+        first = ieee[start]
+        merged[id(first)] = [first[0], BATCH_SEPARATOR.join(titles), *first[2:]]
+        start += len(titles)
+    return [merged.get(id(row), row) for row in rows if publisher_key(row[4]) != "IEEE" or id(row) in merged]
+
+
+def parse_host_limits(values) -> dict:
+    limits = {}
+    for value in values or []:
+        publisher, _, limit = value.partition("=")
+        key = publisher_key(publisher) or publisher.strip().upper()
+        if key not in PUBLISHER_HOSTS or not limit.isdigit() or int(limit) < 1:
+            raise argparse.ArgumentTypeError(f"Invalid --host-limit '{value}', expected e.g. IEEE=2")
+        limits[PUBLISHER_HOSTS[key]] = int(limit)
+    return limits
+
+
+def driver_overrides(options) -> dict:
+    overrides = {}
+    if options.no_resource_blocking:
+        overrides.update(blocked_urls=(), page_load_strategy="normal")
+    if options.resource_report:
+        overrides.update(report_resources=True)
+    return overrides
+
+
+def metrics_export(options) -> dict:
+    return {"port": options.metrics_port, "json_path": options.metrics_json, "interval": options.metrics_interval,
+            "host": options.metrics_host}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape journal articles listed in input.csv")
+    parser.add_argument("--input", default=QUERY_FILE, help="CSV of journals to scrape")
+    parser.add_argument("--rows", default="4:20", metavar="START:STOP",
+                        help="slice of input rows to run, e.g. 7:8 for a single journal")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="list the queries that would run, without starting a browser")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; >1 runs publishers in parallel")
+    parser.add_argument("--queue", nargs="?", const=job_queue.JOB_QUEUE_DB, metavar="DB",
+                        help="load the input rows into a shared SQLite job queue and work it; start more "
+                             "processes on this host with the same --queue to scale out (local disk only)")
+    parser.add_argument("--queue-status", action="store_true",
+                        help="print job counts and dead-lettered jobs of --queue, then exit")
+    parser.add_argument("--requeue-dead", action="store_true",
+                        help="move dead-lettered jobs of --queue back to pending, then exit")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="attempts per queued job before it is dead-lettered")
+    parser.add_argument("--lease-seconds", type=float, default=900,
+                        help="a queued job whose worker misses heartbeats this long goes back to the queue")
+    parser.add_argument("--retry-delay", type=float, default=60,
+                        help="seconds before a failed queued job is retried, doubling per attempt")
+    parser.add_argument("--elsevier", action="store_true",
+                        help="also scrape ELSEVIER rows with the ScienceDirect scraper (skipped by default)")
+    parser.add_argument("--host-limit", action="append", metavar="PUBLISHER=N",
+                        help="max concurrent queries against one publisher host (repeatable)")
+    parser.add_argument("--fetch-mode", choices=["http", "browser"], default="http",
+                        help="how ACM/IEEE/Springer detail pages are fetched; 'http' falls back to the browser")
+    parser.add_argument("--detail-concurrency", type=int, default=8,
+                        help="detail pages fetched at once per results page in http mode")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="Springer/IEEE pages each browser keeps loading in parallel tabs; >1 also loads "
+                             "the next IEEE results page ahead")
+    parser.add_argument("--browsers-per-publisher", type=int, default=1,
+                        help="Chrome instances each worker may keep per publisher")
+    parser.add_argument("--seen-index", default=SEEN_INDEX_DB,
+                        help="SQLite index of already-scraped articles (seeded from existing output on first use)")
+    parser.add_argument("--rescrape", action="store_true",
+                        help="ignore the seen index and revisit every article")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue each query from its last checkpoint instead of page 1")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR,
+                        help="where per-query progress checkpoints are written")
+    parser.add_argument("--reference-store", default=REFERENCE_DB,
+                        help="SQLite store the Elsevier scraper writes cited references to, one row each")
+    parser.add_argument("--find-reference", metavar="TITLE",
+                        help="list stored articles citing a reference whose title starts with TITLE, then exit")
+    parser.add_argument("--page-cache", choices=page_cache.CACHE_MODES, default="off",
+                        help="'record' stores every fetched page; 'replay' serves pages from the cache with no browser")
+    parser.add_argument("--page-cache-dir", default=page_cache.PAGE_CACHE_DIR)
+    parser.add_argument("--page-cache-ttl-days", type=float, default=30)
+    parser.add_argument("--page-cache-max-mb", type=int, default=2048)
+    parser.add_argument("--ieee-backend", choices=["ui", "api"], default="ui",
+                        help="'api' reads IEEE results from the JSON search endpoint instead of rendering pages")
+    parser.add_argument("--ieee-api-url",
+                        help="IEEE search endpoint, default IEEE Xplore's (point at a local stand-in server for testing)")
+    parser.add_argument("--ieee-batch", type=int, default=1, metavar="N",
+                        help="search up to N IEEE journals per query (OR-ed publication titles), splitting "
+                             "the results back to each journal")
+    parser.add_argument("--ieee-api-rows", type=int, default=100,
+                        help="records requested per IEEE API page")
+    parser.add_argument("--no-rate-control", action="store_true",
+                        help="send requests as fast as the scrapers issue them, without adaptive per-host pacing")
+    parser.add_argument("--rate-state", default=rate_control.RATE_STATE_DB,
+                        help="SQLite file holding each host's current request rate, shared by all workers")
+    parser.add_argument("--no-resource-blocking", action="store_true",
+                        help="let browsers load images, fonts, stylesheets and trackers, and wait for full page loads")
+    parser.add_argument("--resource-report", action="store_true",
+                        help="log bytes transferred and requests blocked for every browser page")
+    parser.add_argument("--output-format", choices=output_sink.OUTPUT_FORMATS, default="csv",
+                        help="'parquet' writes typed, zstd-compressed files partitioned by source and year "
+                             "(needs pyarrow)")
+    parser.add_argument("--parquet-dir", default=output_sink.PARQUET_DIR)
+    parser.add_argument("--compact-parquet", action="store_true",
+                        help="merge the small Parquet files in every partition, then exit")
+    parser.add_argument("--parser", choices=html_parser.available_backends(), default=html_parser.get_backend(),
+                        help="HTML parser backend used to read result and article pages")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on /metrics (workers take consecutive ports from here)")
+    parser.add_argument("--metrics-host", default=metrics.DEFAULT_HOST,
+                        help="address the metrics server listens on; 0.0.0.0 exposes it to the network")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="write a JSON metrics snapshot here periodically (one file per worker process)")
+    parser.add_argument("--metrics-interval", type=float, default=30.0,
+                        help="seconds between JSON metrics snapshots")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile every query (CPU, Python allocations, Chrome RSS) and write a ranked report")
+    parser.add_argument("--profile-dir", default=profiling.PROFILE_DIR,
+                        help="each --profile run writes its artifacts to a new timestamped folder here")
+    parser.add_argument("--profile-top", type=int, default=25,
+                        help="functions and allocation sites listed per report")
+    return parser.parse_args(argv)
+
+
+def row_publisher(row, options) -> str:
+    # Elsevier rows are only scraped with --elsevier; without it they are skipped, as they always were.
+    publisher = publisher_key(row[4])
+    if publisher == "ELSEVIER" and not options.elsevier:
+        return None
+    return publisher
+
+
+def jobs_for(rows, options):
+    for row in rows:
+        publisher = row_publisher(row, options)
+        if publisher is None:
+            print(f"⏭️ Skipping {row[0]} - Publisher '{row[4]}' not supported")
+            continue
+        yield Job(publisher=publisher, query=row[1], row=tuple(row))
+
+
+def run_queue(rows, options):
+    queue = job_queue.JobQueue(options.queue, lease_seconds=options.lease_seconds, retry_delay=options.retry_delay)
+    try:
+        queue.enqueue(jobs_for(rows, options), max_attempts=options.max_attempts)
+        if options.workers > 1:
+            run_queue_workers(partial(process_query, options=options), options.queue, options.workers,
+                              options.browsers_per_publisher, driver_overrides(options), metrics_export(options),
+                              parse_host_limits(options.host_limit), options.lease_seconds, options.retry_delay)
+        else:
+            with local_pool(options) as pool:
+                job_queue.work(queue, lambda job: process_query(job.row, pool, options),
+                               limits=queue_limits(parse_host_limits(options.host_limit)))
+        job_queue.print_queue_status(queue)
+    finally:
+        queue.close()
+
+
+def manage_queue(options):
+    queue = job_queue.JobQueue(options.queue or job_queue.JOB_QUEUE_DB)
+    try:
+        if options.requeue_dead:
+            print(f"🔁 {queue.requeue_dead()} dead jobs back to pending")
+        job_queue.print_queue_status(queue)
+    finally:
+        queue.close()
+
+
+def run_parallel(rows, options):
+    runner = partial(process_query, options=options)
+    scheduler = Scheduler(runner, workers=options.workers, host_limits=parse_host_limits(options.host_limit),
+                          browsers_per_publisher=options.browsers_per_publisher,
+                          driver_overrides=driver_overrides(options), metrics_export=metrics_export(options))
+    for job in jobs_for(rows, options):
+        scheduler.submit(job)
+
+    started = time.time()
+    summaries = scheduler.run()
+    print_summary(summaries, time.time() - started)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compact_parquet:
+        from journal_collectors.parquet_sink import compact_all
+        print(f"🗜️ Merged away {compact_all(args.parquet_dir)} files")
+        return
+
+    if args.find_reference:
+        for url, title, ordinal, authors, reference, host in open_reference_store(args.reference_store).citing(
+                args.find_reference):
+            print(f"{title} ({url})\n    [{ordinal}] {authors} - {reference} ({host or 'N/A'})")
+        return
+
+    configure_logging()
+    if args.queue_status or args.requeue_dead:
+        manage_queue(args)
+        return
+    rows = batch_ieee_rows(list(load_queries(args.input, args.rows)), args.ieee_batch)
+    if args.dry_run:
+        for row in rows:
+            print(f"{row_publisher(row, args) or 'SKIP':<9} {row[1]}")
+        return
+    if args.profile:
+        args.profile_dir = os.path.join(args.profile_dir, time.strftime("%Y%m%d-%H%M%S"))
+
+    try:
+        if args.queue:
+            run_queue(rows, args)
+        elif args.workers > 1:
+            run_parallel(rows, args)
+        else:
+            run_sequential(rows, args)
+    finally:
+        if args.profile:
+            report = profiling.write_summary(args.profile_dir, top=args.profile_top)
+            if report:
+                print(f"\n🔬 Profile summary: {report}")
+
+
+@contextmanager
+def local_pool(args):
+    # A driver pool in this process, with the end-of-run summaries the scheduler workers print too.
+    pool = DriverPool(max_per_profile=args.browsers_per_publisher, **driver_overrides(args))
+    metrics.start_export(args.metrics_port, args.metrics_json, args.metrics_interval, host=args.metrics_host)
+    try:
+        yield pool
+    finally:
+        pool.shutdown()
+        print_wait_summary()
+        print_resource_summary()
+        metrics.print_metrics_summary()
+        rate_control.print_rate_summary()
+        if args.metrics_json:
+            metrics.write_snapshot(args.metrics_json)
+
+
+def run_sequential(rows, args):
+    with local_pool(args) as pool:
+        for row in rows:
+            try:
+                process_query(row, pool, args)
+            except Exception:
+                # Like a scheduler worker: the failed query keeps its checkpoint and the run moves on.
+                logger.exception(f"❌ {row[4]} query '{row[1]}' failed")
 
 
 if __name__ == "__main__":
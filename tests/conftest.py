@@ -0,0 +1,232 @@
+import json
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlparse
+from urllib.request import Request, urlopen
+
+import pytest
+
+from journal_collectors import page_cache, rate_control
+from journal_collectors.acm_scrap import AcmScraper
+from journal_collectors.checkpoint import CheckpointStore
+from journal_collectors.output_sink import HEADERS, CsvSink
+from journal_collectors.page_cache import ReplayDriver
+
+# Sent by StubBrowser, so a route can answer the browser differently from plain HTTP.
+BROWSER_HEADER = "X-Stub-Browser"
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: dict
+    body: dict
+    browser: bool
+
+
+class StubSite:
+    """A local stand-in for a publisher site, served on 127.0.0.1 by a ThreadingHTTPServer.
+
+    `routes` maps a path to `handler(request)`, which returns a body or a (status, body) tuple;
+    dict bodies are sent as JSON. Every request is kept in `requests`.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site._handle(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                site._handle(self, json.loads(self.rfile.read(length) or b"{}"))
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _handle(self, handler, body):
+        parsed = urlparse(handler.path)
+        request = StubRequest(handler.command, parsed.path, {k: v[0] for k, v in parse_qs(parsed.query).items()},
+                              body, handler.headers.get(BROWSER_HEADER) == "1")
+        with self._lock:
+            self.requests.append(request)
+        route = self.routes.get(parsed.path)
+        result = route(request) if route else (404, "<html><body>Not Found</body></html>")
+        status, content = result if isinstance(result, tuple) else (200, result)
+        content_type = "application/json" if isinstance(content, dict) else "text/html; charset=utf-8"
+        data = (json.dumps(content) if isinstance(content, dict) else content).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def requested(self, path: str = None, browser: bool = None) -> list:
+        with self._lock:
+            return [r for r in self.requests
+                    if (path is None or r.path.startswith(path)) and (browser is None or r.browser == browser)]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class BrowserLoader:
+    # Loads a page the way a browser shows it: whatever the status, the body is what ends up on screen.
+    def get(self, url):
+        try:
+            with urlopen(Request(url, headers={BROWSER_HEADER: "1"}), timeout=10) as response:
+                return response.read().decode("utf-8")
+        except HTTPError as e:
+            return e.read().decode("utf-8")
+
+
+class StubBrowser(ReplayDriver):
+    # A browser stand-in for the stub site: ReplayDriver's DOM lookups over live pages.
+    def __init__(self):
+        super().__init__(BrowserLoader())
+
+
+@pytest.fixture
+def stub():
+    site = StubSite()
+    yield site
+    site.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_state():
+    # Pacing the stub like a real host would only slow the tests down, and no test may share a page cache.
+    rate_control.configure(enabled=False)
+    page_cache.configure("off")
+    yield
+    rate_control.configure()
+    page_cache.configure("off")
+
+
+@pytest.fixture
+def sink(tmp_path):
+    csv_sink = CsvSink(str(tmp_path / "scraped_data.csv"), HEADERS)
+    yield csv_sink
+    csv_sink.close()
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"), resume=True)
+
+
+class AcmSite:
+    """ACM Digital Library search and article pages on the stub, `hits` articles in all.
+
+    A page number in `failing_pages` answers 500, and so does an article number in `failing_articles`;
+    with `bot_wall`, article pages show a bot wall to anything but the browser.
+    """
+
+    def __init__(self, stub: StubSite, hits: int = 45, page_size: int = 20):
+        self.hits = hits
+        self.page_size = page_size
+        self.failing_pages = set()
+        self.failing_articles = set()
+        self.bot_wall = False
+        stub.routes["/action/doSearch"] = self.search
+        for n in range(1, hits + 1):
+            stub.routes[self.article_path(n)] = lambda request, n=n: self.article(request, n)
+
+    @staticmethod
+    def article_path(n: int) -> str:
+        return f"/doi/10.1145/3000{n:03d}"
+
+    @staticmethod
+    def title(n: int) -> str:
+        return f"Stub article {n} on graph layouts"
+
+    def search(self, request):
+        page = int(request.query["startPage"])
+        if page in self.failing_pages:
+            return 500, "<html><body><h1>Internal Server Error</h1></body></html>"
+        first = (page - 1) * self.page_size + 1
+        items = "".join(f'<h3 class="issue-item__title"><a href="{self.article_path(n)}">{self.title(n)}</a></h3>'
+                        for n in range(first, min(first + self.page_size, self.hits + 1)))
+        return f'<html><body><span class="hitsLength">{self.hits}</span>{items}</body></html>'
+
+    def article(self, request, n: int):
+        if n in self.failing_articles:
+            return 500, "<html><body><h1>Internal Server Error</h1></body></html>"
+        if self.bot_wall and not request.browser:
+            return "<html><head><title>Just a moment...</title></head><body></body></html>"
+        return f"""<html><body>
+            <h1 property="name">{self.title(n)}</h1>
+            <span property="author"><span property="givenName">Ada</span> <span property="familyName">Lovelace</span></span>
+            <section id="abstract"><div role="paragraph">Abstract of article {n}.</div></section>
+            <div class="core-published"><span class="core-date-published">12 March 2015</span></div>
+            <div class="core-enumeration"><a><span property="name">ACM TODAES</span>
+                <span property="volumeNumber">20</span><span property="issueNumber">{n % 4 + 1}</span></a></div>
+        </body></html>"""
+
+
+@pytest.fixture
+def acm_site(stub, monkeypatch):
+    monkeypatch.setattr(AcmScraper, "BASE_URL", stub.url)
+    return AcmSite(stub)
+
+
+class IeeeSite:
+    """IEEE Xplore's JSON search endpoint and document pages on the stub, `hits` documents in all.
+
+    Every fifth search record leaves out its abstract, which only the document page carries. A
+    page number in `failing_pages` answers 500.
+    """
+
+    def __init__(self, stub: StubSite, hits: int = 25):
+        self.hits = hits
+        self.failing_pages = set()
+        self.api_url = f"{stub.url}/rest/search"
+        stub.routes["/rest/search"] = self.search
+        for n in range(1, hits + 1):
+            stub.routes[f"/document/{n}/"] = lambda request, n=n: self.document(n)
+
+    @staticmethod
+    def title(n: int) -> str:
+        return f"Stub document {n} on signal processing"
+
+    def record(self, n: int) -> dict:
+        record = {
+            "articleNumber": str(n), "documentLink": f"/document/{n}/", "articleTitle": self.title(n),
+            "authors": [{"preferredName": "Grace Hopper"}], "publisher": "IEEE", "publicationYear": "2018",
+            "publicationTitle": "IEEE Transactions on Stubs", "volume": "12", "issue": str(n % 4 + 1),
+            "citationCount": n,
+        }
+        if n % 5:
+            record["abstract"] = f"Abstract of document {n}."
+        return record
+
+    def search(self, request):
+        page, rows = request.body["pageNumber"], request.body["rowsPerPage"]
+        if page in self.failing_pages:
+            return 500, {"error": "Internal Server Error"}
+        first = (page - 1) * rows + 1
+        return {"totalRecords": self.hits,
+                "records": [self.record(n) for n in range(first, min(first + rows, self.hits + 1))]}
+
+    @staticmethod
+    def document(n: int):
+        return (f'<html><script>xplGlobal.document.metadata={{"abstract":"Abstract of document {n}."}};\n'
+                f"</script></html>")
+
+
+@pytest.fixture
+def ieee_site(stub):
+    return IeeeSite(stub)
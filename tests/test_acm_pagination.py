@@ -0,0 +1,98 @@
+import csv
+import json
+
+import pytest
+
+from conftest import StubBrowser
+from journal_collectors.acm_scrap import AcmScraper
+from journal_collectors.pagination import PageFetchError, plan_pages
+
+
+def scraped_titles(path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["Title"] for row in csv.DictReader(f)]
+
+
+def load_checkpoint(checkpoints, query) -> dict:
+    with open(checkpoints.path_for("ACM", query), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run(scraper):
+    try:
+        scraper.scrape()
+    finally:
+        scraper.cleanup()
+
+
+def test_plan_pages():
+    assert list(plan_pages(45, 20)) == [1, 2, 3]
+    assert list(plan_pages(40, 20, start_page=2)) == [2]
+    assert list(plan_pages(None, 20, max_pages=5)) == [1, 2, 3, 4, 5]
+    assert list(plan_pages(10_000, 20, max_pages=3)) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("fetch_mode", ["http", "browser"])
+def test_walks_every_results_page(acm_site, stub, sink, fetch_mode):
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode=fetch_mode, sink=sink))
+
+    assert scraped_titles(sink.path) == [acm_site.title(n) for n in range(1, acm_site.hits + 1)]
+    pages = sorted(int(r.query["startPage"]) for r in stub.requested("/action/doSearch"))
+    assert pages == [1, 2, 3]
+
+
+def test_records_are_typed(acm_site, sink):
+    scraper = AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink)
+    try:
+        record = next(scraper.iter_records())
+    finally:
+        scraper.cleanup()
+    assert (record.title, record.source, record.year, record.volume, record.issue) == \
+        (acm_site.title(1), "ACM", 2015, 20, 2)
+    assert record.url.endswith(acm_site.article_path(1))
+
+
+@pytest.mark.parametrize("fetch_mode", ["http", "browser"])
+def test_resume_after_a_failed_page(acm_site, stub, sink, checkpoints, fetch_mode):
+    acm_site.failing_pages = {2}
+    with pytest.raises(PageFetchError) as failure:
+        run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode=fetch_mode, sink=sink, checkpoints=checkpoints))
+    assert failure.value.page == 2
+    # Page 3 may have been fetched alongside page 2, but nothing past the failure is written.
+    assert scraped_titles(sink.path) == [acm_site.title(n) for n in range(1, 21)]
+    assert load_checkpoint(checkpoints, "graphs") | {"updated_at": None} == {
+        "publisher": "ACM", "query": "graphs", "page": 1, "item": 0, "done": False, "failed": [], "updated_at": None}
+
+    acm_site.failing_pages = set()
+    searched = len(stub.requested("/action/doSearch"))
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode=fetch_mode, sink=sink, checkpoints=checkpoints))
+
+    assert scraped_titles(sink.path) == [acm_site.title(n) for n in range(1, acm_site.hits + 1)]
+    assert sorted(int(r.query["startPage"]) for r in stub.requested("/action/doSearch")[searched:]) == [2, 3]
+    assert load_checkpoint(checkpoints, "graphs")["done"] is True
+
+
+def test_finished_query_is_skipped(acm_site, stub, sink, checkpoints):
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, checkpoints=checkpoints))
+    before = len(stub.requests)
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, checkpoints=checkpoints))
+    assert len(stub.requests) == before
+    assert len(scraped_titles(sink.path)) == acm_site.hits
+
+
+def test_resume_retries_a_failed_article(acm_site, stub, sink, checkpoints):
+    acm_site.failing_articles = {5}
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, checkpoints=checkpoints))
+    assert acm_site.title(5) not in scraped_titles(sink.path)
+    assert len(scraped_titles(sink.path)) == acm_site.hits - 1
+    checkpoint = load_checkpoint(checkpoints, "graphs")
+    assert checkpoint["done"] is True
+    assert checkpoint["failed"] == [stub.url + acm_site.article_path(5)]
+
+    acm_site.failing_articles = set()
+    before = len(stub.requests)
+    run(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, checkpoints=checkpoints))
+    # Only the failed article is fetched again; the finished walk is not repeated.
+    assert [r.path for r in stub.requests[before:]] == [acm_site.article_path(5)]
+    assert sorted(scraped_titles(sink.path)) == sorted(acm_site.title(n) for n in range(1, acm_site.hits + 1))
+    assert load_checkpoint(checkpoints, "graphs")["failed"] == []
@@ -0,0 +1,47 @@
+import threading
+
+from journal_collectors import driver_pool
+from journal_collectors.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_hung_health_check_does_not_block_the_pool(monkeypatch):
+    hung, unblock = threading.Event(), threading.Event()
+
+    def is_healthy(driver):
+        if driver.name == "hung":
+            hung.set()
+            unblock.wait(10)
+        return driver.name != "dead"
+
+    monkeypatch.setattr(driver_pool, "is_healthy", is_healthy)
+    pool = DriverPool(max_per_profile=3)
+    pool._created["ACM"] = 3
+    for name in ("ok", "dead", "hung"):
+        pool.release("ACM", FakeDriver(name))
+
+    results = {}
+    stuck = threading.Thread(target=lambda: results.setdefault("stuck", pool.acquire("ACM")))
+    stuck.start()
+    assert hung.wait(5)
+
+    # While one thread waits on a hung browser, the others still borrow, and retire, drivers.
+    other = threading.Thread(target=lambda: results.setdefault("other", pool.acquire("ACM", timeout=5)))
+    other.start()
+    other.join(5)
+    assert not other.is_alive()
+    assert results["other"].name == "ok"
+    assert pool._created["ACM"] == 2
+
+    unblock.set()
+    stuck.join(5)
+    assert results["stuck"].name == "hung"
+    pool.shutdown()
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+
+from conftest import StubBrowser
+from journal_collectors.acm_scrap import AcmScraper
+from journal_collectors.http_fetch import BlockedError, HttpFetcher
+
+
+def test_get_returns_the_page(stub):
+    stub.routes["/page"] = lambda request: "<html><body>hello</body></html>"
+    http = HttpFetcher()
+    try:
+        assert "hello" in http.get(f"{stub.url}/page")
+    finally:
+        http.close()
+
+
+@pytest.mark.parametrize("response", [
+    (403, "<html><body>Forbidden</body></html>"),
+    (200, "<html><head><title>Just a moment...</title></head><body></body></html>"),
+])
+def test_blocked_responses_raise(stub, response):
+    stub.routes["/page"] = lambda request: response
+    http = HttpFetcher()
+    try:
+        with pytest.raises(BlockedError):
+            http.get(f"{stub.url}/page")
+    finally:
+        http.close()
+
+
+def test_blocked_articles_fall_back_to_the_browser(acm_site, stub, sink):
+    acm_site.bot_wall = True
+    scraper = AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink)
+    try:
+        scraper.scrape()
+    finally:
+        scraper.cleanup()
+
+    with open(sink.path, newline="", encoding="utf-8") as f:
+        titles = {row["Title"] for row in csv.DictReader(f)}
+    assert titles == {acm_site.title(n) for n in range(1, acm_site.hits + 1)}
+    # Search pages were not walled, so only the articles needed the browser, each of them once.
+    assert not stub.requested("/action/doSearch", browser=True)
+    assert len(stub.requested("/doi/", browser=False)) == acm_site.hits
+    assert len(stub.requested("/doi/", browser=True)) == acm_site.hits
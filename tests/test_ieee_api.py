@@ -0,0 +1,71 @@
+import csv
+import json
+
+import pytest
+
+from journal_collectors.pagination import PageFetchError
+from journal_collectors.scrap_ieee import IEEEScraper
+
+
+def scraped_rows(path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def api_scraper(site, sink, checkpoints=None) -> IEEEScraper:
+    return IEEEScraper(["Stub Transactions"], items_per_page=10, backend="api", api_url=site.api_url, sink=sink,
+                       checkpoints=checkpoints)
+
+
+def searched_pages(stub) -> list:
+    return sorted(r.body["pageNumber"] for r in stub.requested("/rest/search"))
+
+
+def test_search_payload_pages():
+    payload = IEEEScraper.search_payload("Stub Transactions", 3, 10)
+    assert (payload["pageNumber"], payload["rowsPerPage"]) == (3, 10)
+    assert payload["queryText"] == '("All Metadata":Stub Transactions) AND ("Publication Title":Stub Transactions)'
+
+
+def test_walks_every_results_page(ieee_site, stub, sink):
+    api_scraper(ieee_site, sink).scrape()
+
+    rows = scraped_rows(sink.path)
+    assert [row["Title"] for row in rows] == [ieee_site.title(n) for n in range(1, ieee_site.hits + 1)]
+    assert all(row["Abstract"] == f"Abstract of document {n}." for n, row in enumerate(rows, 1))
+    # 25 hits at 10 a page is 3 pages, each asked for once; only abstracts missing from the search cost a fetch.
+    assert searched_pages(stub) == [1, 2, 3]
+    assert sorted(r.path for r in stub.requested("/document/")) == \
+        sorted(f"/document/{n}/" for n in (5, 10, 15, 20, 25))
+
+
+def test_resume_after_a_failed_page(ieee_site, stub, sink, checkpoints):
+    ieee_site.failing_pages = {2}
+    with pytest.raises(PageFetchError) as failure:
+        api_scraper(ieee_site, sink, checkpoints).scrape()
+    assert failure.value.page == 2
+    assert [row["Title"] for row in scraped_rows(sink.path)] == [ieee_site.title(n) for n in range(1, 11)]
+    with open(checkpoints.path_for("IEEE", "Stub Transactions"), encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    assert (checkpoint["page"], checkpoint["item"], checkpoint["done"]) == (1, 0, False)
+
+    ieee_site.failing_pages = set()
+    searched = len(stub.requested("/rest/search"))
+    api_scraper(ieee_site, sink, checkpoints).scrape()
+
+    assert [row["Title"] for row in scraped_rows(sink.path)] == \
+        [ieee_site.title(n) for n in range(1, ieee_site.hits + 1)]
+    assert sorted(r.body["pageNumber"] for r in stub.requested("/rest/search")[searched:]) == [2, 3]
+    with open(checkpoints.path_for("IEEE", "Stub Transactions"), encoding="utf-8") as f:
+        assert json.load(f)["done"] is True
+
+
+def test_empty_page_before_the_last_one_fails(ieee_site, stub, sink, checkpoints):
+    # A page that comes back without records while the hit count says more are left is a failure, not the end.
+    search = ieee_site.search
+    stub.routes["/rest/search"] = lambda request: \
+        {"totalRecords": ieee_site.hits, "records": []} if request.body["pageNumber"] == 2 else search(request)
+    with pytest.raises(PageFetchError):
+        api_scraper(ieee_site, sink, checkpoints).scrape()
+    with open(checkpoints.path_for("IEEE", "Stub Transactions"), encoding="utf-8") as f:
+        assert json.load(f)["done"] is False
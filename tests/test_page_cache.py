@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from conftest import StubBrowser
+from journal_collectors import page_cache
+from journal_collectors.acm_scrap import AcmScraper
+from journal_collectors.http_fetch import BlockedError, HttpFetcher
+from journal_collectors.page_cache import PageCache, ReplayDriver, normalize_url
+
+
+def scrape(scraper) -> list:
+    try:
+        return [(record.title, record.abstract, record.volume, record.issue) for record in scraper.iter_records()]
+    finally:
+        scraper.cleanup()
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.org/a/?b=2&utm_source=x&a=1") == "https://example.org/a?a=1&b=2"
+
+
+def test_cache_round_trip(tmp_path):
+    cache = PageCache(str(tmp_path / "cache"))
+    cache.put("https://example.org/a?b=2&a=1", "<html>a</html>")
+    assert cache.get("https://example.org/a/?a=1&b=2&utm_medium=y") == "<html>a</html>"
+    assert cache.get("https://example.org/b") is None
+    cache.close()
+
+
+def test_expired_pages_are_misses(tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path / "cache"), ttl=60)
+    cache.put("https://example.org/a", "<html>a</html>")
+    assert cache.get("https://example.org/a") == "<html>a</html>"
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("https://example.org/a") is None
+    assert cache.get("https://example.org/a", max_age=600) == "<html>a</html>"
+    cache.close()
+
+
+@pytest.mark.parametrize("replay_mode", ["http", "browser"])
+def test_replay_round_trip(acm_site, stub, sink, tmp_path, replay_mode):
+    page_cache.configure("record", str(tmp_path / "page_cache"))
+    recorded = scrape(AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink))
+    assert len(recorded) == acm_site.hits
+
+    # Replay needs nothing but the cache: the site is gone.
+    stub.close()
+    page_cache.configure("replay", str(tmp_path / "page_cache"))
+    driver = ReplayDriver(page_cache.get_cache())
+    assert scrape(AcmScraper(["graphs"], driver=driver, fetch_mode=replay_mode, sink=sink)) == recorded
+
+
+def test_replay_miss_is_blocked(tmp_path):
+    page_cache.configure("replay", str(tmp_path / "page_cache"))
+    http = HttpFetcher()
+    try:
+        with pytest.raises(BlockedError):
+            http.get("https://dl.acm.org/doi/10.1145/0000000")
+    finally:
+        http.close()
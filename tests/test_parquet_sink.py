@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from journal_collectors.records import Record
+
+pq = pytest.importorskip("pyarrow.parquet")
+from journal_collectors.parquet_sink import ParquetSink, compact  # noqa: E402
+
+
+def read_back(path) -> list:
+    rows = pq.read_table(path).to_pylist()
+    return sorted(({key: row[key] for key in ("title", "publisher", "source", "year", "volume")} for row in rows),
+                  key=lambda row: row["title"])
+
+
+def test_publisher_and_source_survive(tmp_path):
+    sink = ParquetSink(str(tmp_path / "scraped_data"), [])
+    sink.write(Record(title="An IET article found through IEEE", publisher="IET", source="IEEE", year=2019, volume=3))
+    sink.write(Record(title="An IEEE article", publisher="IEEE", source="IEEE", year=2019, volume=4))
+    sink.write(Record(title="An undated ACM article", publisher="ACM", source="ACM"))
+    sink.close()
+
+    assert sorted(os.listdir(tmp_path / "scraped_data")) == ["source=ACM", "source=IEEE"]
+    expected = [
+        {"title": "An IEEE article", "publisher": "IEEE", "source": "IEEE", "year": 2019, "volume": 4},
+        {"title": "An IET article found through IEEE", "publisher": "IET", "source": "IEEE", "year": 2019,
+         "volume": 3},
+        {"title": "An undated ACM article", "publisher": "ACM", "source": "ACM", "year": None, "volume": None},
+    ]
+    assert read_back(tmp_path / "scraped_data") == expected
+
+    compact(str(tmp_path / "scraped_data"), min_files=1)
+    assert read_back(tmp_path / "scraped_data") == expected
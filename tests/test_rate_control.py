@@ -0,0 +1,34 @@
+from journal_collectors.rate_control import classify
+
+AKAMAI_BLOCK = """<HTML><HEAD>
+<TITLE>Access Denied</TITLE>
+</HEAD><BODY>
+<H1>Access Denied</H1>
+You don't have permission to access "http&#58;&#47;&#47;www&#46;sciencedirect&#46;com&#47;" on this server.<P>
+Reference&#32;&#35;18&#46;5c2d3e17&#46;1712345678&#46;1a2b3c4d
+<P>https&#58;&#47;&#47;errors&#46;edgesuite&#46;net&#47;18&#46;5c2d3e17&#46;1712345678&#46;1a2b3c4d</P>
+</BODY></HTML>"""
+
+AKAMAI_BLOCK_PLAIN = ("<html><head><title>Access Denied</title></head><body><h1>Access Denied</h1>"
+                      "Reference #18.5c2d3e17 https://errors.edgesuite.net/18.5c2d3e17</body></html>")
+
+
+def test_healthy_page():
+    assert classify(200, "<html><body><h1>An article</h1></body></html>") is None
+
+
+def test_article_mentioning_access_denied_is_healthy():
+    article = ("<html><head><title>Access control in distributed systems</title></head><body>"
+               "<h1>Access control in distributed systems</h1><section id='abstract'>Requests that fail the "
+               "policy check return Access Denied to the client.</section>"
+               "<div class='paywall'>Access Denied: purchase this article to read the full text.</div>"
+               "</body></html>")
+    assert classify(200, article) is None
+
+
+def test_block_pages():
+    assert classify(200, AKAMAI_BLOCK) == "bot wall (<title>Access Denied</title>)"
+    assert classify(200, AKAMAI_BLOCK_PLAIN) == "bot wall (<title>Access Denied</title>)"
+    assert classify(200, "<html><title>Just a moment...</title></html>") == "bot wall (Just a moment...)"
+    assert classify(429, "<html><body>slow down</body></html>") == "HTTP 429"
+    assert classify(200, "   ") == "empty page"
@@ -0,0 +1,28 @@
+from journal_collectors import pipeline
+from journal_collectors.elsevier_scrap import ARTICLE_HEADERS
+from journal_collectors.output_sink import CsvSink
+from journal_collectors.records import Record
+from journal_collectors.reference_store import ReferenceStore
+
+REFERENCES = (("A. Turing", "On computable numbers", "Proc. London Math. Soc."),
+              ("C. Shannon", "A mathematical theory of communication", "Bell Syst. Tech. J."))
+
+
+def test_references_are_stored_once_the_written_row_is_flushed(tmp_path):
+    store = ReferenceStore(str(tmp_path / "references.sqlite3"))
+    sink = CsvSink(str(tmp_path / "articles.csv"), ARTICLE_HEADERS, flush_interval=3600)
+    records = [
+        Record(title="An article on graph layouts", url="https://example.org/a/1", source="ELSEVIER",
+               references=REFERENCES),
+        Record(title="An article on graph layouts", url="https://example.org/a/1/", source="ELSEVIER",
+               references=REFERENCES[:1]),
+    ]
+    written = list(pipeline.compose(records, pipeline.dedup(), pipeline.write_to(sink, reference_store=store)))
+    assert len(written) == 1 and written[0].references == ()
+    # Nothing is on disk yet, so neither are its references.
+    assert len(store) == 0
+
+    sink.close()
+    assert [tuple(row[1:]) for row in store.references_of("https://example.org/a/1")] == list(REFERENCES)
+    assert len(store) == 2
+    store.close()
@@ -0,0 +1,56 @@
+from conftest import StubBrowser
+from journal_collectors import pipeline
+from journal_collectors.acm_scrap import AcmScraper
+from journal_collectors.records import Record
+from journal_collectors.seen_index import SeenIndex, canonical_key, title_key
+
+
+def test_keys():
+    assert canonical_key("https://dl.acm.org/doi/10.1145/3000001/") == "doi:10.1145/3000001"
+    assert canonical_key("https://www.example.org/a/b/") == "url:example.org/a/b"
+    assert title_key("Graph  Layouts: A Survey!") == "title:graph layouts a survey"
+
+
+def test_seen_by_url_or_title(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"))
+    index.add(url="https://dl.acm.org/doi/10.1145/3000001", title="Stub article 1 on graph layouts", publisher="ACM")
+    assert index.seen(url="http://127.0.0.1:1/doi/10.1145/3000001")
+    assert index.seen(title="STUB ARTICLE 1 ON GRAPH LAYOUTS")
+    assert not index.seen(url="https://dl.acm.org/doi/10.1145/3000002", title="Stub article 2 on graph layouts")
+    index.close()
+
+
+def test_dedup_stage(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"))
+    index.add(title="An article scraped by an earlier run")
+    records = [
+        Record(title="An article scraped by an earlier run", url="https://example.org/a/1"),
+        Record(title="A new article on graph layouts", url="https://example.org/a/2"),
+        Record(title="A new article on graph layouts", url="https://example.org/a/3"),
+        Record(title="Another new article on graphs", url="https://example.org/a/2/"),
+        Record(title="A third new article on graphs", url="https://example.org/a/4"),
+    ]
+    kept = list(pipeline.compose(records, pipeline.dedup(index)))
+    assert [record.url for record in kept] == ["https://example.org/a/2", "https://example.org/a/4"]
+    index.close()
+
+
+def test_second_run_skips_scraped_articles(acm_site, stub, sink, tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"))
+    first = AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, seen_index=index)
+    try:
+        first.scrape()
+    finally:
+        first.cleanup()
+    assert first.scraped_count == acm_site.hits
+    assert index.seen(title=acm_site.title(acm_site.hits))
+
+    articles = len(stub.requested("/doi/"))
+    second = AcmScraper(["graphs"], driver=StubBrowser(), fetch_mode="http", sink=sink, seen_index=index)
+    try:
+        second.scrape()
+    finally:
+        second.cleanup()
+    assert second.scraped_count == 0
+    assert len(stub.requested("/doi/")) == articles
+    index.close()